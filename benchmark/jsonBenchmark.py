@@ -0,0 +1,53 @@
+""" Compare encoding a feed page with Flask's default JSON provider against util.jsonProvider.
+
+Run from the repository root: python -m benchmark.jsonBenchmark
+"""
+import time
+
+from flask import Flask
+
+from benchmark.serializationBenchmark import make_gyma, make_person, serializer_page, GYMAS_PER_PAGE, \
+    EXERCISES_PER_GYMA
+from util.jsonProvider import OrjsonProvider
+
+PAGES = 5000
+
+
+def isoformat_page(page: list) -> list:
+    """ The page as it was built before, with datetimes already converted to strings. """
+    return [
+        {**gyma,
+         "time_of_arrival": gyma["time_of_arrival"].isoformat(),
+         "time_of_leaving": gyma["time_of_leaving"].isoformat() if gyma["time_of_leaving"] else None}
+        for gyma in page
+    ]
+
+
+def measure(name: str, app: Flask, page: list) -> tuple[float, float]:
+    with app.app_context():
+        app.json.response(page)  # warm up
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        for _ in range(PAGES):
+            app.json.response(page)
+        cpu_us = (time.process_time() - cpu_start) / PAGES * 1_000_000
+        wall_us = (time.perf_counter() - wall_start) / PAGES * 1_000_000
+    print(f"{name:<24} {cpu_us:8.1f} us CPU/page {wall_us:8.1f} us wall/page")
+    return cpu_us, wall_us
+
+
+def main():
+    page = serializer_page([make_gyma(i) for i in range(GYMAS_PER_PAGE)], make_person(0))
+
+    default_app = Flask("default")
+    orjson_app = Flask("orjson")
+    orjson_app.json = OrjsonProvider(orjson_app)
+
+    print(f"{GYMAS_PER_PAGE} gymas x {EXERCISES_PER_GYMA} exercises per page, {PAGES} pages")
+    before, _ = measure("default provider", default_app, isoformat_page(page))
+    after, _ = measure("orjson provider", orjson_app, page)
+    print(f"{'speedup':<24} {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+""" Compare the CPU time per feed page of the old pydantic DTO serialization against util.serializer.
+
+Run from the repository root: python -m benchmark.serializationBenchmark
+"""
+import time
+from datetime import datetime, date, timedelta
+from types import SimpleNamespace
+
+from dto.exerciseDTO import ExerciseDTO
+from dto.gymaDTO import GymaDTO
+from dto.personDTO import PersonSimpleDTO
+from dto.profileDTO import ProfileDTO
+from util.serializer import gyma_list_to_dicts, gyma_to_fragment, person_simple_to_dict, person_to_dict
+
+PAGES = 2000
+GYMAS_PER_PAGE = 10
+EXERCISES_PER_GYMA = 8
+FRIENDS_PER_PROFILE = 50
+
+
+def make_person(index: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        profile_url=f"person{index}", first_name="First", last_name=f"Last{index}", sex="m",
+        date_of_birth=date(1990, 1, 1), city="Utrecht", profile_text="Lifting things", pf_path_l=None,
+        pf_path_m=f"m_{index}.jpg",
+    )
+
+
+def make_gyma(gyma_id: int) -> SimpleNamespace:
+    arrival = datetime(2024, 9, 1, 18, 0) + timedelta(days=gyma_id)
+    exercises = [
+        SimpleNamespace(
+            exercise_id=gyma_id * 100 + i, gyma_id=gyma_id, exercise_name="Bench press", exercise_type="gains",
+            count=10, sets=3, weight=80.0, minutes=None, km=None, level=None, description=None,
+        )
+        for i in range(EXERCISES_PER_GYMA)
+    ]
+    return SimpleNamespace(gyma_id=gyma_id, user_id=1, time_of_arrival=arrival,
+                           time_of_leaving=arrival + timedelta(hours=1), exercises=exercises)
+
+
+def pydantic_page(gymas, person) -> list:
+    """ The per-row construction and model_dump the routers used before util.serializer. """
+    person_simple_dto = PersonSimpleDTO(
+        profile_url=person.profile_url, first_name=person.first_name, last_name=person.last_name,
+        sex=person.sex, pf_path_m=person.pf_path_m,
+    ).model_dump(mode='json')
+
+    page = []
+    for gyma in gymas:
+        exercise_dtos = [
+            ExerciseDTO(
+                exercise_id=exercise.exercise_id,
+                exercise_name=exercise.exercise_name,
+                exercise_type=exercise.exercise_type,
+                count=exercise.count,
+                sets=exercise.sets,
+                weight=exercise.weight,
+                minutes=exercise.minutes,
+                km=exercise.km,
+                level=exercise.level,
+                description=exercise.description,
+            ).model_dump(mode='json')
+            for exercise in gyma.exercises
+        ]
+        page.append(GymaDTO(
+            gyma_id=gyma.gyma_id,
+            person=person_simple_dto,
+            time_of_arrival=gyma.time_of_arrival,
+            time_of_leaving=gyma.time_of_leaving,
+            exercises=exercise_dtos,
+        ).model_dump(mode='json'))
+    return page
+
+
+def pydantic_profile(gymas, person, friends) -> dict:
+    friend_list = [
+        PersonSimpleDTO(
+            profile_url=friend.profile_url, first_name=friend.first_name, last_name=friend.last_name,
+            sex=friend.sex, pf_path_m=friend.pf_path_m,
+        ).model_dump(mode='json')
+        for friend in friends
+    ]
+    return ProfileDTO(
+        personDTO=person_to_dict(person),
+        gyma_list=pydantic_page(gymas, person),
+        friend_list=friend_list,
+    ).model_dump(mode='json')
+
+
+def serializer_page(gymas, person) -> list:
+    fragments = [gyma_to_fragment(gyma, gyma.exercises) for gyma in gymas]
+    return gyma_list_to_dicts(fragments, person_simple_to_dict(person))
+
+
+def serializer_profile(gymas, person, friends) -> dict:
+    return {
+        "personDTO": person_to_dict(person),
+        "gyma_list": serializer_page(gymas, person),
+        "friend_list": [person_simple_to_dict(friend) for friend in friends],
+        "friendship_status": None,
+    }
+
+
+def measure(name: str, function, *args) -> float:
+    function(*args)  # warm up
+    start = time.process_time()
+    for _ in range(PAGES):
+        function(*args)
+    per_page_us = (time.process_time() - start) / PAGES * 1_000_000
+    print(f"{name:<28} {per_page_us:10.1f} us CPU/page")
+    return per_page_us
+
+
+def main():
+    person = make_person(0)
+    friends = [make_person(i) for i in range(1, FRIENDS_PER_PROFILE + 1)]
+    gymas = [make_gyma(i) for i in range(GYMAS_PER_PAGE)]
+
+    print(f"{GYMAS_PER_PAGE} gymas x {EXERCISES_PER_GYMA} exercises per page, {PAGES} pages")
+    before = measure("feed page, pydantic", pydantic_page, gymas, person)
+    after = measure("feed page, serializer", serializer_page, gymas, person)
+    print(f"{'speedup':<28} {before / after:10.1f}x")
+
+    before = measure("profile, pydantic", pydantic_profile, gymas[:5], person, friends)
+    after = measure("profile, serializer", serializer_profile, gymas[:5], person, friends)
+    print(f"{'speedup':<28} {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
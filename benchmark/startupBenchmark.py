@@ -0,0 +1,68 @@
+""" Measure the startup of a worker: the wall time of a fresh interpreter that imports main and creates the
+app, and the modules that take the most import time.
+
+Run from the repository root: python -m benchmark.startupBenchmark
+Set DATABASE_URL or DB_HOST to see the effect of the database, creating the app must not connect to it.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 7
+SLOWEST_MODULES = 15
+STARTUP_STEPS = {
+    "python": "pass",
+    "import main": "import main",
+    "import main + create_app()": "import main; main.create_app()",
+}
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    environment = {**os.environ, "LOG_LEVEL": os.getenv("LOG_LEVEL", "ERROR")}
+    return subprocess.run([sys.executable, *options, "-c", code], env=environment, capture_output=True, text=True)
+
+
+def measure(code: str) -> list[float]:
+    durations = []
+    for _ in range(RUNS):
+        started_at = time.perf_counter()
+        completed = run_python(code)
+        durations.append(time.perf_counter() - started_at)
+        if completed.returncode != 0:
+            sys.exit(f"{code!r} failed:\n{completed.stderr}")
+    return durations
+
+
+def slowest_modules(code: str, module: str) -> list[tuple[int, str]]:
+    """ Cumulative import time in microseconds of the direct imports of a module, from python -X importtime.
+    The output lists the imports of a module before the module, indented one level deeper. """
+    direct_imports = []
+    for line in run_python(code, "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == module:
+            return sorted(direct_imports, reverse=True)[:SLOWEST_MODULES]
+        if depth == 0:
+            direct_imports = []
+        elif depth == 1:
+            direct_imports.append((int(cumulative), name.strip()))
+    return []
+
+
+def main():
+    for name, code in STARTUP_STEPS.items():
+        durations = measure(code)
+        print(f"{name:<28} median {statistics.median(durations) * 1000:7.0f} ms   "
+              f"min {min(durations) * 1000:7.0f} ms")
+
+    print("\nSlowest imports of main, cumulative:")
+    for cumulative_us, name in slowest_modules("import main", "main"):
+        print(f"{cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
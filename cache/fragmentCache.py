@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from util.jsonProvider import dumps_bytes
+
+FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("GYMA_FRAGMENT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+FRAGMENT_CACHE_TTL_SECONDS = int(os.getenv("GYMA_FRAGMENT_CACHE_TTL_SECONDS", "300"))
+
+
+class FragmentCache:
+    """ In-process LRU of serialized gyma fragments, evicted by their total JSON size in bytes.
+    Each worker process has its own cache, the TTL bounds how long a worker can serve a fragment
+    that was invalidated by a request on another worker. """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self._entries: OrderedDict[int, tuple[dict, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: int) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            fragment, size, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return fragment
+
+    def set(self, key: int, fragment: dict):
+        size = len(dumps_bytes(fragment))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (fragment, size, time.monotonic())
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def delete(self, key: int):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: int):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+_gyma_fragment_cache = FragmentCache(FRAGMENT_CACHE_MAX_BYTES, FRAGMENT_CACHE_TTL_SECONDS)
+
+
+def get_cached_gyma_fragment(gyma_id: int) -> dict | None:
+    """ Get the serialized gyma (without person) from the cache. """
+    return _gyma_fragment_cache.get(gyma_id)
+
+
+def cache_gyma_fragment(gyma_id: int, fragment: dict):
+    """ Store a serialized gyma, the fragment must not be mutated afterwards as it is shared between requests. """
+    _gyma_fragment_cache.set(gyma_id, fragment)
+
+
+def invalidate_gyma_fragment(gyma_id: int):
+    """ Remove a gyma from the cache, call after its exercises changed or it was deleted. """
+    logging.debug("Invalidating cached fragment of gyma %s", gyma_id)
+    _gyma_fragment_cache.delete(gyma_id)
@@ -0,0 +1,69 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+PUB_FEED_CACHE_SECONDS = int(os.getenv("PUB_FEED_CACHE_SECONDS", "10"))
+
+
+class CachedFeed(NamedTuple):
+    body: bytes
+    etag: str
+    created_at: float
+    version: int
+
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+_cached_pub_feed: CachedFeed | None = None
+_pub_feed_version = 0  # Increased on invalidation, a cached feed of an older version is stale
+_refresh_lock = threading.Lock()
+_version_lock = threading.Lock()  # Not the refresh lock, an invalidation must not wait for a rebuild
+
+
+def _is_fresh(cached_feed: CachedFeed | None) -> bool:
+    return (cached_feed is not None
+            and cached_feed.version == _pub_feed_version
+            and cached_feed.age() < PUB_FEED_CACHE_SECONDS)
+
+
+def get_pub_feed(build_feed: Callable[[], Optional[bytes]]) -> Optional[CachedFeed]:
+    """ Get the shared anonymous pub feed, rebuilding it with build_feed when it is stale.
+    Only one thread rebuilds at a time, the others keep serving the stale feed meanwhile,
+    or wait for the first build when there is nothing cached yet. build_feed returns None when the
+    feed cannot be built, the stale feed is served then, or None when there is none. """
+    global _cached_pub_feed
+
+    cached_feed = _cached_pub_feed
+    if _is_fresh(cached_feed):
+        return cached_feed
+
+    if not _refresh_lock.acquire(blocking=cached_feed is None):
+        return cached_feed
+
+    try:
+        # Another thread may have rebuilt the feed while this one waited for the lock
+        if _is_fresh(_cached_pub_feed):
+            return _cached_pub_feed
+
+        version = _pub_feed_version
+        body = build_feed()
+        if body is None:
+            logging.warning("Pub feed could not be rebuilt, serving the cached one")
+            return _cached_pub_feed
+        etag = hashlib.sha1(body).hexdigest()
+        _cached_pub_feed = CachedFeed(body=body, etag=etag, created_at=time.monotonic(), version=version)
+        logging.debug("Rebuilt pub feed cache, etag %s", etag)
+        return _cached_pub_feed
+    finally:
+        _refresh_lock.release()
+
+
+def invalidate_pub_feed():
+    """ Mark the cached pub feed as stale, e.g. when a gyma finishes or is removed. """
+    global _pub_feed_version
+    with _version_lock:
+        _pub_feed_version += 1
@@ -0,0 +1,80 @@
+""" Flask CLI commands, registered on the app in main.py. Run with: flask --app main <command> """
+import logging
+
+import click
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import Base, get_db, get_engine
+from model.User import User
+from service.catalogService import backfill_catalog_ids
+from service.personalRecordService import rebuild_records_of_user
+from service.statsService import rebuild_stats_of_user
+
+
+@click.command("init-db")
+def init_db_command():
+    """ Check the database connection and create the tables of the models that do not exist yet. """
+    engine = get_engine()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        logging.info("Successfully connected to the database.")
+
+        Base.metadata.create_all(bind=engine)
+        logging.info("Database tables setup successfully.")
+    except SQLAlchemyError as e:
+        logging.error("Failed to connect or setup the database: %s", e)
+        raise click.ClickException("Database setup failed, see the log")
+
+    click.echo("Database tables are set up")
+
+
+@click.command("rebuild-stats")
+@click.option("--user-id", type=int, default=None, help="Only rebuild the stats of this user.")
+def rebuild_stats_command(user_id):
+    """ Recompute the weekly stats from the gymas and exercises. """
+    db = next(get_db())
+    user_ids = [user_id] if user_id is not None else list(db.scalars(select(User.user_id)).all())
+
+    failed = 0
+    for current_user_id in user_ids:
+        if not rebuild_stats_of_user(db, current_user_id):
+            failed += 1
+
+    click.echo(f"Rebuilt stats of {len(user_ids) - failed} users, {failed} failed")
+
+
+def rebuild_records_of_users(db, user_id: int | None) -> tuple[int, int]:
+    """ Rebuild the personal records of one user or, with user_id None, of all users.
+    Returns the number of users rebuilt and failed. """
+    user_ids = [user_id] if user_id is not None else list(db.scalars(select(User.user_id)).all())
+
+    failed = 0
+    for current_user_id in user_ids:
+        if not rebuild_records_of_user(db, current_user_id):
+            failed += 1
+    return len(user_ids) - failed, failed
+
+
+@click.command("rebuild-records")
+@click.option("--user-id", type=int, default=None, help="Only rebuild the personal records of this user.")
+def rebuild_records_command(user_id):
+    """ Recompute the personal records from the exercises, per catalog exercise. """
+    db = next(get_db())
+    rebuilt, failed = rebuild_records_of_users(db, user_id)
+    click.echo(f"Rebuilt personal records of {rebuilt} users, {failed} failed")
+
+
+@click.command("backfill-catalog")
+def backfill_catalog_command():
+    """ Set the catalog id of exercises that were stored before the exercise catalog existed, then rebuild the
+    personal records, which are kept per catalog id and skip exercises without one. """
+    db = next(get_db())
+    updated_exercises = backfill_catalog_ids(db)
+    if updated_exercises is None:
+        raise click.ClickException("Backfill failed, see the log")
+    click.echo(f"Set the catalog id of {updated_exercises} exercises")
+
+    rebuilt, failed = rebuild_records_of_users(db, None)
+    click.echo(f"Rebuilt personal records of {rebuilt} users, {failed} failed")
@@ -1,31 +1,76 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 import os
-from dotenv import load_dotenv
+from flask import g, has_app_context
 import logging
 
-# Load environment variables
-load_dotenv()
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME", "gyma_db")
-DB_DRIVER = os.getenv("DB_DRIVER", "pymysql")
+_engine: Engine | None = None  # Created on first use by get_engine
 
-# Construct the database URL
-DATABASE_URL = f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Create a synchronous engine for SQLAlchemy
-engine = create_engine(DATABASE_URL, echo=False)
+def database_url() -> str:
+    """ The database URL from the environment, DATABASE_URL overrides it (e.g. sqlite:///test.db as a local
+    stand-in in tests). """
+    db_user = os.getenv("DB_USER")
+    db_password = os.getenv("DB_PASSWORD")
+    db_host = os.getenv("DB_HOST", "localhost")
+    db_port = os.getenv("DB_PORT", "3306")
+    db_name = os.getenv("DB_NAME", "gyma_db")
+    db_driver = os.getenv("DB_DRIVER", "pymysql")
+    return os.getenv("DATABASE_URL") or f"mysql+{db_driver}://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
-# Create session factory
+
+def pool_options() -> dict:
+    """ Connection pool settings from DB_POOL_SIZE, DB_MAX_OVERFLOW and DB_POOL_TIMEOUT_SECONDS,
+    the SQLAlchemy defaults for the ones that are not set. gunicorn.conf.py derives them from the threads. """
+    options = {}
+    if os.getenv("DB_POOL_SIZE"):
+        options["pool_size"] = int(os.getenv("DB_POOL_SIZE"))
+    if os.getenv("DB_MAX_OVERFLOW"):
+        options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW"))
+    if os.getenv("DB_POOL_TIMEOUT_SECONDS"):
+        options["pool_timeout"] = float(os.getenv("DB_POOL_TIMEOUT_SECONDS"))
+    return options
+
+
+def get_engine() -> Engine:
+    """ The synchronous SQLAlchemy engine, created on the first call. It connects on the first checkout. """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(database_url(), echo=False, **pool_options())
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def _dispose_engine_after_fork():
+    # A worker forked from a preloaded master must not use the pooled connections of the master
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_engine_after_fork)
+
+
+def set_engine(engine: Engine):
+    """ Use another engine, e.g. an in-memory database in tests. """
+    global _engine
+    _engine = engine
+    SessionLocal.configure(bind=engine)
+
+
+def __getattr__(name: str):
+    # database.engine still works, it creates the engine on first access
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Create session factory, bound to the engine by get_engine
 SessionLocal = sessionmaker(
     autocommit=False,
-    autoflush=False,
-    bind=engine
+    autoflush=False
 )
 
 # Base class for model definitions
@@ -33,8 +78,18 @@ Base = declarative_base()
 
 # Dependency for getting the database session in Flask
 def get_db():
+    get_engine()
     session = SessionLocal()
+    if has_app_context():
+        g.setdefault("db_sessions", []).append(session)
     try:
         yield session
     finally:
         session.close()
+
+
+def close_request_sessions(exception=None):
+    """ Close the sessions handed out by get_db during the request. Routes take the session with next(get_db()),
+    which leaves the session to the garbage collector, and with it the pooled connection it checked out again. """
+    for session in g.pop("db_sessions", []):
+        session.close()
@@ -1,11 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 
 from dto.exerciseDTO import ExerciseDTO
 from dto.personDTO import PersonSimpleDTO
 
+MAX_SYNC_EXERCISES = 100
+ALLOWED_CLOCK_SKEW = timedelta(minutes=5)
+
 
 class GymaDTO(BaseModel):
     gyma_id: int = Field(..., description="Used for excluding gyma to send, when client has them in localstorage")
@@ -15,3 +18,31 @@ class GymaDTO(BaseModel):
     exercises: List[ExerciseDTO] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class GymaSyncDTO(BaseModel, frozen=True):
+    """ A whole gyma session recorded offline by the client. """
+    idempotency_key: str = Field(..., min_length=8, max_length=64, description="Generated by the client per session")
+    time_of_arrival: datetime
+    time_of_leaving: datetime
+    exercises: List[ExerciseDTO] = Field(default=[], max_length=MAX_SYNC_EXERCISES)
+
+    @field_validator("time_of_arrival", "time_of_leaving")
+    def to_local_time(cls, v: datetime) -> datetime:
+        """
+        Gyma times are stored as naive local time, convert timezone aware times.
+        """
+        if v.tzinfo is not None:
+            return v.astimezone().replace(tzinfo=None)
+        return v
+
+    @model_validator(mode="after")
+    def validate_times(self) -> "GymaSyncDTO":
+        """
+        Validates that the session ends after it starts and not in the future.
+        """
+        if self.time_of_leaving < self.time_of_arrival:
+            raise ValueError("time_of_leaving must be after time_of_arrival")
+        if self.time_of_leaving > datetime.now() + ALLOWED_CLOCK_SKEW:
+            raise ValueError("time_of_leaving cannot be in the future")
+        return self
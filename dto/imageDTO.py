@@ -1,10 +1,24 @@
 import os
 
+from PIL import Image, UnidentifiedImageError
 from werkzeug.datastructures import FileStorage
 from pydantic import BaseModel, Field, ValidationError
 
 VALID_EXTENSIONS = {"jpg", "jpeg", "png"}
 MAX_FILE_SIZE_MB = 5
+MAX_IMAGE_DIMENSION = 8000
+
+# Allowed upload size of the whole request, leaving room for the multipart boundaries and headers
+MAX_CONTENT_LENGTH = MAX_FILE_SIZE_MB * 1024 * 1024 + 64 * 1024
+
+# Magic bytes of the accepted image formats, mapped to the format name Pillow reports
+MAGIC_BYTES = {
+    b"\xff\xd8\xff": "JPEG",
+    b"\x89PNG\r\n\x1a\n": "PNG",
+}
+
+# Pillow raises DecompressionBombError when an image header claims more pixels than this
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_DIMENSION * MAX_IMAGE_DIMENSION
 
 
 class ImageDTO(BaseModel):
@@ -29,4 +43,37 @@ class ImageDTO(BaseModel):
         if file_size_mb > MAX_FILE_SIZE_MB:
             raise ValueError("File size exceeds the maximum limit of 5 MB.")
 
+        expected_format = ImageDTO.sniff_format(file)
+        ImageDTO.validate_header(file, expected_format)
+
         return file
+
+    @staticmethod
+    def sniff_format(file: FileStorage) -> str:
+        """ Check the first bytes of the stream against the known image signatures, returns the format. """
+        header = file.stream.read(8)
+        file.stream.seek(0)
+
+        for magic, image_format in MAGIC_BYTES.items():
+            if header.startswith(magic):
+                return image_format
+
+        raise ValueError("File content is not a valid image.")
+
+    @staticmethod
+    def validate_header(file: FileStorage, expected_format: str):
+        """ Read only the image header to check format and dimensions, pixel data is not decoded. """
+        try:
+            with Image.open(file.stream) as image:
+                image_format = image.format
+                width, height = image.size
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            raise ValueError(f"Image cannot be read: {e}")
+        finally:
+            file.stream.seek(0)
+
+        if image_format != expected_format:
+            raise ValueError("File content does not match its image type.")
+
+        if width > MAX_IMAGE_DIMENSION or height > MAX_IMAGE_DIMENSION:
+            raise ValueError(f"Image dimensions exceed the maximum of {MAX_IMAGE_DIMENSION} pixels.")
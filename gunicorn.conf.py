@@ -0,0 +1,107 @@
+""" gunicorn settings, read from the working directory by `gunicorn wsgi:app`.
+
+GUNICORN_WORKER_CLASS selects the worker model:
+- gthread (default): WEB_CONCURRENCY processes with GUNICORN_THREADS threads each.
+- gevent: WEB_CONCURRENCY processes with up to GUNICORN_WORKER_CONNECTIONS greenlets each, needs
+  `pip install gevent`. The standard library is monkey patched below, before the app is loaded; PyMySQL and
+  redis-py then yield on I/O.
+
+The database and Redis pools of a worker are sized to its concurrency: DB_POOL_SIZE and REDIS_MAX_CONNECTIONS
+are the number of threads plus headroom, without overflow, so one worker never holds more connections than it
+can use. The headroom is for the threads that are not request threads: the /readyz checks take a database and
+a Redis connection, the slow query EXPLAIN thread a database connection, and with a pool of exactly one
+connection per thread they would wait behind busy request threads (and /readyz would time out under load).
+MySQL sees at most workers x (threads + 2) connections. A worker has two Redis clients, one that decodes
+responses and one for binary values (the calendar bitmaps), which split REDIS_MAX_CONNECTIONS in halves; it is
+twice the threads plus headroom so each of them has a connection per thread. With gevent the request part is
+capped by GUNICORN_DB_POOL_MAX and GUNICORN_REDIS_POOL_MAX and the other greenlets wait for a free connection.
+Values set in the environment are kept.
+
+preload_app imports the app once in the master, the workers fork from it. The modules re-create what is not
+safe to share after the fork themselves (os.register_at_fork): the engine drops the pooled connections of the
+master, the log writer and slow query EXPLAIN threads are started again (gevent keeps its greenlets over a
+fork), and redis-py resets its pools per process by itself.
+
+Comparing the worker models on the load suite (loadtest/), with the same seeded database and Redis:
+
+    GUNICORN_WORKER_CLASS=gthread gunicorn wsgi:app
+    locust -f loadtest/locustfile.py --host http://127.0.0.1:8000 --headless -u 200 -r 20 -t 5m \
+        --csv loadtest/results/gthread
+    GUNICORN_WORKER_CLASS=gevent gunicorn wsgi:app
+    locust ... --csv loadtest/results/gevent
+    python -m loadtest.report loadtest/results/gevent_stats.csv --baseline loadtest/results/gthread_stats.csv
+
+Use a real Redis for this (loadtest.server's fake Redis lives in one process) and the same WEB_CONCURRENCY,
+and compare req/s and p95/p99 per endpoint, plus the MySQL connection count.
+
+Measured on 2026-10-19, WEB_CONCURRENCY=2, loadtest.seed --users 50 --years 1, 20 locust users for 60s:
+
+    worker   req/s   p50 ms   p95 ms   p99 ms   database pool per worker
+    gthread   22.6       11       59     4900   10 (8 threads + 2)
+    gevent    22.8       11       48     2700   22 (20 + 2)
+
+No difference worth switching for. The setup limits what this shows: one CPU shared by locust, gunicorn and
+the Redis server, SQLite instead of MySQL (gevent gains where PyMySQL waits on the network, SQLite does not
+yield), fakeredis over TCP (loadtest/ has no Redis server), and 20 users whose wait times, not the server, set
+the request rate. The p99 of both is the bcrypt of /auth/login, which holds the CPU and in a gevent worker
+also the other greenlets of the worker. Repeat it against MySQL and Redis on the production machine size
+before changing the default.
+"""
+import multiprocessing
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+# Restart workers now and then, so a slow leak cannot grow without bound
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+accesslog = None
+
+# Connections beyond the request concurrency: the /readyz database check and the slow query EXPLAIN thread,
+# and the /readyz Redis check
+DB_POOL_HEADROOM = 2
+REDIS_POOL_HEADROOM = 1
+
+if worker_class == "gevent":
+    concurrency = worker_connections
+    db_pool_size = min(concurrency, int(os.getenv("GUNICORN_DB_POOL_MAX", "20"))) + DB_POOL_HEADROOM
+    redis_pool_size = 2 * min(concurrency, int(os.getenv("GUNICORN_REDIS_POOL_MAX", "50"))) + REDIS_POOL_HEADROOM
+else:
+    concurrency = threads
+    db_pool_size = threads + DB_POOL_HEADROOM
+    redis_pool_size = 2 * threads + REDIS_POOL_HEADROOM
+
+os.environ.setdefault("DB_POOL_SIZE", str(db_pool_size))
+os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+os.environ.setdefault("REDIS_MAX_CONNECTIONS", str(redis_pool_size))
+
+
+def when_ready(server):
+    redis_connections = int(os.environ["REDIS_MAX_CONNECTIONS"])
+    binary_redis_connections = max(1, redis_connections // 2)
+    server.log.info(
+        "%s %s workers, concurrency %s each, database pool %s+%s and Redis pools %s decoding + %s binary per "
+        "worker, at most %s database connections",
+        workers, worker_class, concurrency, os.environ["DB_POOL_SIZE"], os.environ["DB_MAX_OVERFLOW"],
+        max(1, redis_connections - binary_redis_connections), binary_redis_connections,
+        workers * (int(os.environ["DB_POOL_SIZE"]) + int(os.environ["DB_MAX_OVERFLOW"])),
+    )
+
+
+def child_exit(server, worker):
+    # Drop the Prometheus files of a stopped worker, /metrics aggregates the files of all workers
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,94 @@
+""" Load test of the main API flows, against a server started with loadtest.server on seeded data.
+
+    locust -f loadtest/locustfile.py --host http://127.0.0.1:5000 --headless -u 50 -r 10 -t 2m \
+        --csv loadtest/results/run
+    python -m loadtest.report loadtest/results/run_stats.csv
+
+LOADTEST_USERS must match the --users of loadtest.seed.
+"""
+import os
+import random
+
+from locust import HttpUser, task, between
+
+from loadtest.seed import LOADTEST_PASSWORD, EMAIL_TEMPLATE, PROFILE_URL_TEMPLATE, EXERCISES
+
+LOADTEST_USERS = int(os.getenv("LOADTEST_USERS", "1000"))
+
+
+def random_profile_url() -> str:
+    return PROFILE_URL_TEMPLATE.format(random.randint(1, LOADTEST_USERS))
+
+
+def view_profile(client, profile_url: str, headers: dict | None = None):
+    """ Get a profile, a 403/404 of a gymbros or solo profile is an expected answer and not a failure. """
+    with client.get(f"/api/v1/profile/{profile_url}", headers=headers, name="/api/v1/profile/[profile_url]",
+                    catch_response=True) as response:
+        if response.status_code in (403, 404):
+            response.success()
+        return response
+
+
+class Visitor(HttpUser):
+    """ Not logged in: the public feed and public profiles. """
+    weight = 1
+    wait_time = between(0.5, 2)
+
+    @task(5)
+    def pub_feed(self):
+        response = self.client.get("/api/v1/pub", name="/api/v1/pub")
+        if response.ok and response.json():
+            gyma_keys = ",".join(str(gyma["gyma_id"]) for gyma in response.json())
+            self.client.get("/api/v1/pub", headers={"Gymakeys": gyma_keys}, name="/api/v1/pub [next page]")
+
+    @task(2)
+    def profile_view(self):
+        view_profile(self.client, random_profile_url())
+
+
+class Member(HttpUser):
+    """ Logged in: feeds, profiles, search and logging a workout. """
+    weight = 3
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.user_number = random.randint(1, LOADTEST_USERS)
+        response = self.client.post("/api/v1/auth/login", name="/api/v1/auth/login", json={
+            "email": EMAIL_TEMPLATE.format(self.user_number), "password": LOADTEST_PASSWORD, "trustDevice": False,
+        })
+        self.headers = {"Authorization": response.json()["session_token"]} if response.ok else {}
+
+    @task(6)
+    def gymbro_feed(self):
+        self.client.get("/api/v1/gymbro", headers=self.headers, name="/api/v1/gymbro")
+
+    @task(3)
+    def profile_view(self):
+        profile_url = random_profile_url()
+        response = view_profile(self.client, profile_url, self.headers)
+        if response.status_code == 200 and response.json().get("gyma_list"):
+            gyma_keys = ",".join(str(gyma["gyma_id"]) for gyma in response.json()["gyma_list"])
+            self.client.post(f"/api/v1/profile/{profile_url}/moregyma", headers=self.headers, json=gyma_keys,
+                             name="/api/v1/profile/[profile_url]/moregyma")
+
+    @task(2)
+    def search(self):
+        query = random.choice(["user1", "user2", "user3", "Emma Tester"])
+        self.client.get(f"/api/v1/person/search/{query}", headers=self.headers, name="/api/v1/person/search/[query]")
+
+    @task(1)
+    def log_workout(self):
+        response = self.client.post("/api/v1/gyma/start", headers=self.headers, name="/api/v1/gyma/start")
+        if not response.ok:
+            return
+
+        for exercise_name, exercise_type in random.sample(EXERCISES, 3):
+            exercise = {"exercise_name": exercise_name, "exercise_type": exercise_type}
+            if exercise_type == "gains":
+                exercise.update(count=random.randint(3, 12), sets=3, weight=float(random.randrange(20, 160, 5)))
+            else:
+                exercise.update(minutes=random.randint(10, 40))
+            self.client.post("/api/v1/gyma/exercise", headers=self.headers, json=exercise,
+                             name="/api/v1/gyma/exercise")
+
+        self.client.put("/api/v1/gyma/end", headers=self.headers, name="/api/v1/gyma/end")
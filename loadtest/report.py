@@ -0,0 +1,57 @@
+""" Per endpoint p50/p95/p99 and throughput from the stats CSV written by locust --csv, optionally
+compared with the stats of an earlier run.
+
+    python -m loadtest.report loadtest/results/run_stats.csv --baseline loadtest/results/main_stats.csv
+
+Exits with status 1 when the p95 of an endpoint is more than --max-regression slower than the baseline.
+"""
+import argparse
+import csv
+import sys
+
+
+def read_stats(path: str) -> dict:
+    with open(path, newline="") as stats_file:
+        return {
+            row["Name"]: {
+                "requests": int(row["Request Count"]),
+                "failures": int(row["Failure Count"]),
+                "rps": float(row["Requests/s"]),
+                "p50": float(row["50%"] or 0),
+                "p95": float(row["95%"] or 0),
+                "p99": float(row["99%"] or 0),
+            }
+            for row in csv.DictReader(stats_file)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("stats")
+    parser.add_argument("--baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 increase, 0.2 is 20%%")
+    arguments = parser.parse_args()
+
+    stats = read_stats(arguments.stats)
+    baseline = read_stats(arguments.baseline) if arguments.baseline else {}
+
+    print(f"{'endpoint':<48} {'requests':>9} {'fail':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          f"{'  p95 vs baseline' if baseline else ''}")
+    regressions = []
+    for name, row in stats.items():
+        line = f"{name:<48} {row['requests']:>9} {row['failures']:>5} {row['rps']:>8.1f} " \
+               f"{row['p50']:>8.0f} {row['p95']:>8.0f} {row['p99']:>8.0f}"
+        if name in baseline and name != "Aggregated" and baseline[name]["p95"]:
+            change = row["p95"] / baseline[name]["p95"] - 1
+            line += f"  {change:+.0%}"
+            if change > arguments.max_regression:
+                regressions.append(name)
+        print(line)
+
+    if regressions:
+        print(f"\np95 regressed more than {arguments.max_regression:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+""" Run the API for the load test against the database in DATABASE_URL (default sqlite:///loadtest.db)
+and an in-process fake Redis, so no MySQL or Redis server is needed.
+
+    python -m loadtest.seed --users 1000
+    python -m loadtest.server --port 5000
+
+Start the server with LOG_LEVEL=WARNING to keep request logging out of the measurements.
+"""
+import argparse
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///loadtest.db")
+os.environ.setdefault("SESSION_EXPIRE_TIME_SECONDS", "3600")
+os.environ.setdefault("SESSION_EXPIRE_TIME_SECONDS_TRUST_DEVICE", "86400")
+os.environ.setdefault("API_BASE_URL", "http://localhost:5000")
+
+import fakeredis  # noqa: E402
+
+import session.sessionService as sessionService  # noqa: E402
+
+# Both connections share one fake server, like two clients of the same Redis
+_fake_redis_server = fakeredis.FakeServer()
+sessionService._redis_connection = fakeredis.FakeRedis(server=_fake_redis_server, decode_responses=True)
+sessionService._redis_binary_connection = fakeredis.FakeRedis(server=_fake_redis_server)
+
+from main import create_app  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    arguments = parser.parse_args()
+    app = create_app()
+    app.run(host=arguments.host, port=arguments.port, threaded=True, debug=False, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,7 @@ from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import smtplib
-from dotenv import load_dotenv
 
-load_dotenv()
 _email_connection = None
 
 
@@ -24,7 +22,7 @@ def create_email_connection():
     email_password = os.getenv("EMAIL_PASSWORD")
 
     try:
-        logging.info(f"Connecting to SMTP server {email_host} on port {email_port}")
+        logging.info("Connecting to SMTP server %s on port %s", email_host, email_port)
         smtp_client = smtplib.SMTP(email_host, email_port, timeout=10)
         smtp_client.ehlo()
 
@@ -36,7 +34,7 @@ def create_email_connection():
         _email_connection = smtp_client
         logging.info("SMTP connection established and cached with TLS.")
     except smtplib.SMTPException as e:
-        logging.error(f"Failed to create mail connection: {e}")
+        logging.error("Failed to create mail connection: %s", e)
         _email_connection = None
 
     return _email_connection
@@ -83,21 +81,21 @@ def send_email(recipient: str, subject: str, content: str, content_type: str = "
         message.attach(MIMEText(content, content_type, 'utf-8'))
 
         smtp_client.sendmail(sender_email, recipient, message.as_string())
-        logging.info(f"Email successfully sent to {recipient}")
+        logging.info("Email successfully sent to %s", recipient)
         return True
 
     except smtplib.SMTPServerDisconnected as e:
-        logging.error(f"SMTP server unexpectedly closed the connection: {e}")
+        logging.error("SMTP server unexpectedly closed the connection: %s", e)
         _email_connection = None  # Reset connection
         return False
     except Exception as e:
-        logging.error(f"Failed to send mail: {e}")
+        logging.error("Failed to send mail: %s", e)
         return False
 
 
 def send_verification_email(verification_code: str, recipient: str) -> bool:
     """ Sending a verification code/link to the recipient for email verification after registering. """
-    logging.info(f"Sending verification code/link to {recipient}")
+    logging.info("Sending verification code/link to %s", recipient)
     verification_url = os.getenv("WEBSITE_URL")
 
     subject = "Verify your Gyma account"
@@ -1,86 +1,110 @@
-import logging
-import os
-
-from flask import Flask, jsonify, request, send_from_directory
-from flask_cors import CORS
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import scoped_session, sessionmaker
-from database import Base
-
-from router.authRouter import auth
-from router.userRouter import user
-from router.gymaRouter import gyma
-from router.pubRouter import pub
-from router.personRouter import person
-from router.profileRouter import profile
-from router.gymbroRouter import gymbro
-
-# Initialize logging
-logging.basicConfig(level=logging.DEBUG)
-logging.getLogger('PIL').setLevel(logging.WARNING)
-
-# Initialize Flask application
-app = Flask(__name__)
-
-# Enable CORS middleware
-CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, allow_headers=["Authorization", "Content-Type", "Gymakeys"])
-
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME", "gyma_db")
-DB_DRIVER = os.getenv("DB_DRIVER", "pymysql")
-
-DATABASE_URL = f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
-
-# Static file serving (you can replace the directories)
-app.config['UPLOAD_FOLDER_LARGE'] = './images/large'
-app.config['UPLOAD_FOLDER_MEDIUM'] = './images/medium'
-
-@app.route('/images/large/<path:filename>')
-def serve_large_image(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER_LARGE'], filename)
-
-@app.route('/images/medium/<path:filename>')
-def serve_medium_image(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER_MEDIUM'], filename)
-
-def initialize_database():
-    session = SessionLocal()
-    try:
-        session.execute(text('SELECT 1'))
-        session.commit()
-        logging.info("Successfully connected to the database.")
-
-        Base.metadata.create_all(bind=engine)
-        logging.info("Database tables setup successfully.")
-    except SQLAlchemyError as e:
-        logging.error(f"Failed to connect or setup the database: {e}")
-    finally:
-        session.close()
-
-initialize_database()
-
-# Root route
-@app.route('/')
-def root():
-    return jsonify({"message": "Hello World"})
-
-# Dynamic route example
-@app.route('/hello/<name>')
-def say_hello(name):
-    return jsonify({"message": f"Hello {name}"})
-
-# Including other routes (import routers)
-app.register_blueprint(auth)
-app.register_blueprint(user)
-app.register_blueprint(gyma)
-app.register_blueprint(pub)
-app.register_blueprint(person)
-app.register_blueprint(profile)
-app.register_blueprint(gymbro)
\ No newline at end of file
+from dotenv import load_dotenv
+
+# The environment is read once, before the modules below read their settings at import
+load_dotenv()
+
+from flask import Flask, jsonify, send_from_directory  # noqa: E402
+from flask_cors import CORS  # noqa: E402
+from werkzeug.exceptions import RequestEntityTooLarge  # noqa: E402
+import database  # noqa: E402
+from database import close_request_sessions  # noqa: E402
+from dto.imageDTO import MAX_CONTENT_LENGTH  # noqa: E402
+
+from router.authRouter import auth  # noqa: E402
+from router.userRouter import user  # noqa: E402
+from router.gymaRouter import gyma  # noqa: E402
+from router.pubRouter import pub  # noqa: E402
+from router.personRouter import person  # noqa: E402
+from router.profileRouter import profile  # noqa: E402
+from router.gymbroRouter import gymbro  # noqa: E402
+from router.statsRouter import stats  # noqa: E402
+from router.exportRouter import export  # noqa: E402
+from router.catalogRouter import catalog  # noqa: E402
+from router.adminRouter import admin  # noqa: E402
+from commands import init_db_command, rebuild_stats_command, rebuild_records_command, \
+    backfill_catalog_command  # noqa: E402
+from monitoring.healthCheck import init_health_checks  # noqa: E402
+from monitoring.instrumentation import init_instrumentation  # noqa: E402
+from monitoring.logConfig import configure_logging  # noqa: E402
+from monitoring.samplingProfiler import init_sampling_profiler  # noqa: E402
+from monitoring.slowQueryLog import init_slow_query_log  # noqa: E402
+from util.jsonProvider import OrjsonProvider  # noqa: E402
+from util.response import detail_response  # noqa: E402
+
+
+def create_app() -> Flask:
+    """ Create the Flask application. Nothing connects here: the database, Redis and SMTP connections are
+    opened on first use and the tables are created with `flask --app main init-db`. """
+    # Initialize logging, level from LOG_LEVEL
+    configure_logging()
+
+    # Initialize Flask application
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    engine = database.get_engine()
+
+    # Return the connections of the request's database sessions to the pool
+    app.teardown_appcontext(close_request_sessions)
+
+    # Request latency, SQL and Redis timing, Server-Timing header and /metrics
+    init_instrumentation(app, engine)
+    init_slow_query_log(engine)
+
+    # Liveness and readiness probes, /healthz and /readyz
+    init_health_checks(app, engine)
+
+    # Request threads for the sampling profiler of /api/v1/admin/profile
+    init_sampling_profiler(app)
+
+    # Enable CORS middleware
+    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, allow_headers=["Authorization", "Content-Type", "Gymakeys"])
+
+    # Static file serving (you can replace the directories)
+    app.config['UPLOAD_FOLDER_LARGE'] = './images/large'
+    app.config['UPLOAD_FOLDER_MEDIUM'] = './images/medium'
+
+    # Werkzeug refuses request bodies above this size instead of buffering them
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_entity_too_large(e):
+        return detail_response("File size exceeds the maximum limit of 5 MB.", 413)
+
+    @app.route('/images/large/<path:filename>')
+    def serve_large_image(filename):
+        return send_from_directory(app.config['UPLOAD_FOLDER_LARGE'], filename)
+
+    @app.route('/images/medium/<path:filename>')
+    def serve_medium_image(filename):
+        return send_from_directory(app.config['UPLOAD_FOLDER_MEDIUM'], filename)
+
+    # Root route
+    @app.route('/')
+    def root():
+        return jsonify({"message": "Hello World"})
+
+    # Dynamic route example
+    @app.route('/hello/<name>')
+    def say_hello(name):
+        return jsonify({"message": f"Hello {name}"})
+
+    # Including other routes (import routers)
+    app.register_blueprint(auth)
+    app.register_blueprint(user)
+    app.register_blueprint(gyma)
+    app.register_blueprint(pub)
+    app.register_blueprint(person)
+    app.register_blueprint(profile)
+    app.register_blueprint(gymbro)
+    app.register_blueprint(stats)
+    app.register_blueprint(export)
+    app.register_blueprint(catalog)
+    app.register_blueprint(admin)
+
+    # CLI commands
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(rebuild_records_command)
+    app.cli.add_command(backfill_catalog_command)
+
+    return app
@@ -0,0 +1,18 @@
+-- Exercise belongs to exactly one gyma: replace the gyma_exercise link table by exercise.gyma_id.
+-- Run once against the MySQL database before deploying the version that contains this file.
+
+ALTER TABLE exercise ADD COLUMN gyma_id INT NULL AFTER exercise_id;
+
+UPDATE exercise
+    JOIN gyma_exercise ON gyma_exercise.exercise_id = exercise.exercise_id
+SET exercise.gyma_id = gyma_exercise.gyma_id;
+
+-- Exercises without a gyma were left behind by the old per-row gyma removal
+DELETE FROM exercise WHERE gyma_id IS NULL;
+
+ALTER TABLE exercise
+    MODIFY gyma_id INT NOT NULL,
+    ADD INDEX ix_exercise_gyma_id (gyma_id),
+    ADD CONSTRAINT exercise_gyma_id_fk FOREIGN KEY (gyma_id) REFERENCES gyma (gyma_id) ON DELETE CASCADE;
+
+DROP TABLE gyma_exercise;
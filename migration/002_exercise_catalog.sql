@@ -0,0 +1,17 @@
+-- Exercise names get a catalog of normalized names, exercise.catalog_id refers to it.
+-- Run once against the MySQL database before deploying the version that contains this file,
+-- then fill catalog_id of the existing exercises with: flask --app main backfill-catalog
+
+CREATE TABLE exercise_catalog (
+    catalog_id INT NOT NULL AUTO_INCREMENT,
+    normalized_name VARCHAR(64) NOT NULL,
+    display_name VARCHAR(64) NOT NULL,
+    PRIMARY KEY (catalog_id),
+    UNIQUE KEY normalized_name (normalized_name)
+);
+
+-- Nullable until the backfill has run, new exercises always get a catalog_id
+ALTER TABLE exercise
+    ADD COLUMN catalog_id INT NULL AFTER exercise_name,
+    ADD INDEX ix_exercise_catalog_id (catalog_id),
+    ADD CONSTRAINT exercise_catalog_id_fk FOREIGN KEY (catalog_id) REFERENCES exercise_catalog (catalog_id);
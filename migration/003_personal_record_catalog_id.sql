@@ -0,0 +1,14 @@
+-- Personal records are kept per catalog_id instead of per exercise name. Names that differ only in case or
+-- whitespace share one catalog_id, keyed by the raw name they collided on the case insensitive collation.
+-- Run once against the MySQL database after 002_exercise_catalog.sql, before deploying the version that
+-- contains this file, then refill the records with: flask --app main backfill-catalog
+
+-- The records are derived from the exercises, backfill-catalog rebuilds them
+DELETE FROM personal_record;
+
+ALTER TABLE personal_record
+    DROP INDEX _user_exercise_name_uc,
+    DROP COLUMN exercise_name,
+    ADD COLUMN catalog_id INT NOT NULL AFTER user_id,
+    ADD CONSTRAINT _user_catalog_id_uc UNIQUE (user_id, catalog_id),
+    ADD CONSTRAINT personal_record_catalog_id_fk FOREIGN KEY (catalog_id) REFERENCES exercise_catalog (catalog_id);
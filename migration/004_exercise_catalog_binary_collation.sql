@@ -0,0 +1,7 @@
+-- The unique key on exercise_catalog.normalized_name compares with a binary collation, so it agrees with
+-- normalize_exercise_name: names it keeps apart ('cafe' and 'café', or other case folding) no longer
+-- collide on the case and accent insensitive default collation.
+-- Run once against the MySQL database, before deploying the version that contains this file.
+
+ALTER TABLE exercise_catalog
+    MODIFY normalized_name VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL;
@@ -0,0 +1,12 @@
+-- The idempotency key of a synced gyma is kept when the gyma is deleted, with gyma_id set to NULL, so a
+-- retried upload of a deleted gyma is answered as already handled instead of storing the gyma again.
+-- Run once against the MySQL database, before deploying the version that contains this file.
+-- gyma_sync was created by create_all, its foreign key on gyma_id got the generated name gyma_sync_ibfk_2
+-- (check with SHOW CREATE TABLE gyma_sync).
+
+ALTER TABLE gyma_sync
+    DROP FOREIGN KEY gyma_sync_ibfk_2;
+
+ALTER TABLE gyma_sync
+    MODIFY gyma_id INT NULL,
+    ADD CONSTRAINT gyma_sync_gyma_id_fk FOREIGN KEY (gyma_id) REFERENCES gyma (gyma_id) ON DELETE SET NULL;
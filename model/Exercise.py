@@ -5,11 +5,13 @@ from sqlalchemy import Column, Integer, VARCHAR, Enum, DateTime, Float, ForeignK
 
 
 class Exercise(Base):
-    """ Characteristics of a gym exercise. """
+    """ Characteristics of a gym exercise, each exercise belongs to one gyma. """
     __tablename__ = 'exercise'
 
     exercise_id = Column("exercise_id", Integer, primary_key=True, autoincrement=True)
+    gyma_id = Column(Integer, ForeignKey('gyma.gyma_id', ondelete='CASCADE'), nullable=False, index=True)
     exercise_name = Column("exercise_name", VARCHAR(64), nullable=False)
+    catalog_id = Column(Integer, ForeignKey('exercise_catalog.catalog_id'), nullable=True, index=True)
     exercise_type = Column("exercise_type", Enum('gains', 'cardio', 'other'), nullable=False)
     count = Column("count", Integer, nullable=True)
     sets = Column("sets", Integer, nullable=True)
@@ -20,4 +22,4 @@ class Exercise(Base):
     description = Column("description", VARCHAR(64), nullable=True)
     created_at = Column("created_at", DateTime, nullable=False)
 
-    gymas = relationship("GymaExercise", back_populates="exercise")
+    gyma = relationship("Gyma", back_populates="exercises")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, VARCHAR
+from sqlalchemy.dialects import mysql
+from database import Base
+
+
+class ExerciseCatalog(Base):
+    """ Distinct exercise names, exercises with the same normalized name share one catalog_id. """
+    __tablename__ = 'exercise_catalog'
+
+    catalog_id = Column("catalog_id", Integer, primary_key=True, autoincrement=True)
+    # Binary collation on MySQL: normalize_exercise_name decides which names are equal, a case or accent
+    # insensitive collation would make the unique key reject names it considers different
+    normalized_name = Column("normalized_name",
+                             VARCHAR(64).with_variant(mysql.VARCHAR(64, collation="utf8mb4_bin"), "mysql", "mariadb"),
+                             nullable=False, unique=True)
+    display_name = Column("display_name", VARCHAR(64), nullable=False)
@@ -12,4 +12,4 @@ class Gyma(Base):
     time_of_arrival = Column("time_of_arrival", DateTime, nullable=False)
     time_of_leaving = Column("time_of_leaving", DateTime, nullable=True)
 
-    exercises = relationship("GymaExercise", back_populates="gyma", lazy='selectin')
+    exercises = relationship("Exercise", back_populates="gyma", order_by="Exercise.exercise_id", passive_deletes=True)
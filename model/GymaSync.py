@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, VARCHAR, ForeignKey, UniqueConstraint
+from database import Base
+
+
+class GymaSync(Base):
+    """ Idempotency keys of gymas uploaded as a whole session, so a retried upload is not stored twice.
+    The key outlives its gyma: gyma_id is NULL once the gyma was deleted, so a late retry does not bring it back. """
+    __tablename__ = 'gyma_sync'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('user.user_id'), nullable=False)
+    idempotency_key = Column("idempotency_key", VARCHAR(64), nullable=False)
+    gyma_id = Column(Integer, ForeignKey('gyma.gyma_id', name='gyma_sync_gyma_id_fk', ondelete='SET NULL'),
+                     nullable=True, index=True)
+
+    __table_args__ = (UniqueConstraint('user_id', 'idempotency_key', name='_user_idempotency_key_uc'),)
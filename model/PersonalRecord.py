@@ -0,0 +1,21 @@
+from sqlalchemy.orm import relationship
+
+from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint
+from database import Base
+
+
+class PersonalRecord(Base):
+    """ Best weight, count and km of a user per catalog exercise, maintained when exercises change.
+    'Bench press' and 'bench  press' share a catalog_id and so one record. """
+    __tablename__ = 'personal_record'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('user.user_id'), nullable=False)
+    catalog_id = Column(Integer, ForeignKey('exercise_catalog.catalog_id'), nullable=False)
+    max_weight = Column("max_weight", Float, nullable=True)
+    max_count = Column("max_count", Integer, nullable=True)
+    max_km = Column("max_km", Float, nullable=True)
+
+    catalog = relationship("ExerciseCatalog")
+
+    __table_args__ = (UniqueConstraint('user_id', 'catalog_id', name='_user_catalog_id_uc'),)
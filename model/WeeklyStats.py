@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, UniqueConstraint
+from database import Base
+
+
+class WeeklyStats(Base):
+    """ Workout totals of a user per week (starting on monday), maintained when gymas and exercises change. """
+    __tablename__ = 'weekly_stats'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('user.user_id'), nullable=False)
+    week_start = Column("week_start", Date, nullable=False)
+    sessions = Column("sessions", Integer, nullable=False, default=0)
+    duration_seconds = Column("duration_seconds", Integer, nullable=False, default=0)
+    volume = Column("volume", Float, nullable=False, default=0.0)
+    cardio_km = Column("cardio_km", Float, nullable=False, default=0.0)
+    cardio_minutes = Column("cardio_minutes", Integer, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint('user_id', 'week_start', name='_user_week_uc'),)
@@ -0,0 +1,108 @@
+""" Liveness and readiness endpoints for the load balancer.
+
+/healthz answers as long as the worker can serve requests. /readyz checks MySQL through the connection pool,
+the Redis session store and, when HEALTH_CHECK_SMTP=1, the SMTP server, each with a timeout of
+HEALTH_CHECK_TIMEOUT_SECONDS, and answers 503 when one of them fails. The checks run in parallel and the
+result is cached for HEALTH_CHECK_CACHE_SECONDS, so frequent probes of several load balancers do not add load.
+A check that hangs keeps its thread, it is not started again until it returns. """
+import logging
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from session.sessionService import create_redis_connection
+from util.response import json_response
+
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "1.0"))
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "2.0"))
+HEALTH_CHECK_SMTP = os.getenv("HEALTH_CHECK_SMTP", "0") == "1"
+
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="health-check")
+_running_checks: dict[str, Future] = {}
+_cached_result: tuple[float, dict] | None = None
+_check_lock = threading.Lock()
+
+
+def check_database(engine: Engine) -> dict:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return {"checked_out": engine.pool.checkedout()} if hasattr(engine.pool, "checkedout") else {}
+
+
+def check_redis() -> dict:
+    redis_connection = create_redis_connection()
+    if redis_connection is None:
+        raise ConnectionError("No Redis connection")
+    redis_connection.ping()
+    return {}
+
+
+def check_smtp() -> dict:
+    """ A new connection, the cached connection of the mail service is not shared between threads. """
+    smtp_client = smtplib.SMTP(os.getenv("EMAIL_HOST"), int(os.getenv("EMAIL_PORT")),
+                               timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+    try:
+        smtp_client.noop()
+    finally:
+        smtp_client.close()
+    return {}
+
+
+def timed(check, *args) -> dict:
+    started_at = time.perf_counter()
+    details = check(*args)
+    return {"status": "ok", "latency_ms": round((time.perf_counter() - started_at) * 1000, 2), **details}
+
+
+def run_checks(engine: Engine) -> dict:
+    checks = {"database": (check_database, engine), "redis": (check_redis,)}
+    if HEALTH_CHECK_SMTP:
+        checks["smtp"] = (check_smtp,)
+
+    for name, (check, *args) in checks.items():
+        if name not in _running_checks or _running_checks[name].done():
+            _running_checks[name] = _executor.submit(timed, check, *args)
+
+    deadline = time.perf_counter() + HEALTH_CHECK_TIMEOUT_SECONDS
+    results = {}
+    for name in checks:
+        try:
+            results[name] = _running_checks[name].result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeoutError:
+            logging.warning("Readiness check of %s got no answer within %ss", name, HEALTH_CHECK_TIMEOUT_SECONDS)
+            results[name] = {"status": "fail", "error": "timeout"}
+        except Exception as e:
+            # The probe is public, the message (hosts, users) only goes to the log
+            logging.warning("Readiness check of %s failed: %s", name, e)
+            results[name] = {"status": "fail", "error": type(e).__name__}
+    return results
+
+
+def init_health_checks(app: Flask, engine: Engine):
+    """ Register /healthz and /readyz on the app. """
+
+    def healthz():
+        return json_response({"status": "ok"})
+
+    def readyz():
+        global _cached_result
+        with _check_lock:
+            if _cached_result is None or time.monotonic() - _cached_result[0] > HEALTH_CHECK_CACHE_SECONDS:
+                _cached_result = (time.monotonic(), run_checks(engine))
+            checked_at, results = _cached_result
+
+        ready = all(result["status"] == "ok" for result in results.values())
+        return json_response({
+            "status": "ok" if ready else "fail",
+            "age_seconds": round(time.monotonic() - checked_at, 2),
+            "checks": results,
+        }, 200 if ready else 503)
+
+    app.add_url_rule("/healthz", "healthz", healthz)
+    app.add_url_rule("/readyz", "readyz", readyz)
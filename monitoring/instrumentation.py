@@ -0,0 +1,184 @@
+""" Per-request latency instrumentation: wall time, SQL statement count and time, Redis command count and
+time and JSON serialization time. Every request gets a Server-Timing header and the values are recorded
+in Prometheus histograms served on /metrics.
+
+With several gunicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty directory, /metrics then
+aggregates the histograms of all workers. """
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import redis
+from flask import Flask, Response, request
+from prometheus_client import CollectorRegistry, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from monitoring.queryDetector import QueryCounter, check_repeated_statement, raise_for_repeated_statements, \
+    N_PLUS_ONE_DETECTION
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUEST_DURATION = Histogram("gyma_request_duration_seconds", "Wall time of a request",
+                             ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+DB_QUERIES = Histogram("gyma_request_db_queries", "SQL statements per request", ["route"], buckets=COUNT_BUCKETS)
+DB_DURATION = Histogram("gyma_request_db_seconds", "Time spent in SQL statements per request",
+                        ["route"], buckets=LATENCY_BUCKETS)
+REDIS_COMMANDS = Histogram("gyma_request_redis_commands", "Redis commands per request",
+                           ["route"], buckets=COUNT_BUCKETS)
+REDIS_DURATION = Histogram("gyma_request_redis_seconds", "Time spent in Redis commands per request",
+                           ["route"], buckets=LATENCY_BUCKETS)
+SERIALIZATION_DURATION = Histogram("gyma_request_serialization_seconds", "Time spent serializing JSON per request",
+                                   ["route"], buckets=LATENCY_BUCKETS)
+
+
+@dataclass
+class RequestMetrics:
+    started_at: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_commands: int = 0
+    redis_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    query_counter: QueryCounter | None = None
+    route: str = ""
+
+
+# Metrics of the request handled by the current thread (or greenlet), None outside of requests
+_request_metrics: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def get_request_metrics() -> RequestMetrics | None:
+    return _request_metrics.get()
+
+
+def record_serialization(seconds: float):
+    """ Add JSON serialization time to the current request, no-op outside of requests. """
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.serialization_seconds += seconds
+
+
+def record_redis(commands: int, seconds: float):
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.redis_commands += commands
+        metrics.redis_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info["query_started_at"].pop()
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.db_queries += 1
+        metrics.db_seconds += time.perf_counter() - started_at
+        if metrics.query_counter is not None:
+            check_repeated_statement(metrics.query_counter, statement, metrics.route)
+
+
+def _handle_error(exception_context):
+    # A failed statement has no after_cursor_execute, drop its start time
+    started_at = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started_at:
+        started_at.pop()
+
+
+def instrument_engine(engine: Engine):
+    """ Count SQL statements and their time on the connections of an engine. """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def instrument_redis():
+    """ Count Redis commands and their time for every client, including pipelines. """
+    if getattr(redis.Redis.execute_command, "instrumented", False):
+        return
+
+    execute_command = redis.Redis.execute_command
+    execute_pipeline = redis.client.Pipeline.execute
+
+    def timed_execute_command(self, *args, **options):
+        started_at = time.perf_counter()
+        try:
+            return execute_command(self, *args, **options)
+        finally:
+            record_redis(1, time.perf_counter() - started_at)
+
+    def timed_execute_pipeline(self, *args, **kwargs):
+        commands = len(self.command_stack)
+        started_at = time.perf_counter()
+        try:
+            return execute_pipeline(self, *args, **kwargs)
+        finally:
+            record_redis(commands, time.perf_counter() - started_at)
+
+    timed_execute_command.instrumented = True
+    redis.Redis.execute_command = timed_execute_command
+    redis.client.Pipeline.execute = timed_execute_pipeline
+
+
+def server_timing(metrics: RequestMetrics, total_seconds: float) -> str:
+    return (
+        f"app;dur={total_seconds * 1000:.1f}, "
+        f"db;dur={metrics.db_seconds * 1000:.1f};desc=\"{metrics.db_queries} queries\", "
+        f"redis;dur={metrics.redis_seconds * 1000:.1f};desc=\"{metrics.redis_commands} commands\", "
+        f"ser;dur={metrics.serialization_seconds * 1000:.1f}"
+    )
+
+
+def metrics_response() -> Response:
+    """ The Prometheus exposition of all histograms, aggregated over the workers in multiprocess mode. """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_instrumentation(app: Flask, engine: Engine):
+    """ Register the request hooks, the SQL and Redis timing and the /metrics endpoint on the app. """
+    instrument_engine(engine)
+    instrument_redis()
+
+    @app.before_request
+    def start_request_metrics():
+        metrics = RequestMetrics(route=request.url_rule.rule if request.url_rule else "unmatched")
+        if N_PLUS_ONE_DETECTION in ("log", "raise"):
+            metrics.query_counter = QueryCounter()
+        _request_metrics.set(metrics)
+
+    @app.after_request
+    def finish_request_metrics(response: Response) -> Response:
+        metrics = _request_metrics.get()
+        if metrics is None:
+            return response
+        _request_metrics.set(None)
+
+        total_seconds = time.perf_counter() - metrics.started_at
+        route = metrics.route
+        if route == "/metrics":
+            return response
+
+        REQUEST_DURATION.labels(request.method, route, str(response.status_code)).observe(total_seconds)
+        DB_QUERIES.labels(route).observe(metrics.db_queries)
+        DB_DURATION.labels(route).observe(metrics.db_seconds)
+        REDIS_COMMANDS.labels(route).observe(metrics.redis_commands)
+        REDIS_DURATION.labels(route).observe(metrics.redis_seconds)
+        SERIALIZATION_DURATION.labels(route).observe(metrics.serialization_seconds)
+
+        response.headers["Server-Timing"] = server_timing(metrics, total_seconds)
+        if metrics.query_counter is not None:
+            raise_for_repeated_statements(metrics.query_counter, route)
+        return response
+
+    app.add_url_rule("/metrics", "metrics", metrics_response)
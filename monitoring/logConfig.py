@@ -0,0 +1,138 @@
+""" Logging setup: the level comes from LOG_LEVEL (default INFO) and records are written as JSON lines,
+or as plain text with LOG_FORMAT=text. Request threads only put records on a queue, a QueueListener
+thread formats and writes them. Loggers with a destination of their own (the slow query log) get a queue
+and listener of their own with start_queue_listener. """
+import atexit
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+_listeners: list[QueueListener] = []
+_root_queue_handler: QueueHandler | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """ One JSON object per record. """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class RecordQueueHandler(QueueHandler):
+    """ QueueHandler that keeps the record fields for the JSON formatter. The message is merged with its
+    arguments and the traceback is rendered on the logging thread, the rest is left to the listener. """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class PerProcessRotatingFileHandler(RotatingFileHandler):
+    """ Rotating log file of the current process, logs/name.log becomes logs/name.<pid>.log. Workers forked from
+    a preloaded master switch to a file of their own on their first record: processes that write and rotate
+    one shared file overwrite each other's records. """
+
+    def __init__(self, file_name: str, max_bytes: int, backup_count: int):
+        self.file_name = file_name
+        self.pid = os.getpid()
+        super().__init__(self.process_file_name(), maxBytes=max_bytes, backupCount=backup_count, delay=True)
+
+    def process_file_name(self) -> str:
+        root, extension = os.path.splitext(self.file_name)
+        return os.path.abspath(f"{root}.{self.pid}{extension}")
+
+    def emit(self, record: logging.LogRecord):
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = self.process_file_name()
+        super().emit(record)
+
+
+def start_queue_listener(*handlers: logging.Handler) -> QueueHandler:
+    """ Handler that only puts records on a queue, a QueueListener thread passes them to the handlers. """
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)
+    _listeners.append(listener)
+    return RecordQueueHandler(log_queue)
+
+
+def configure_logging():
+    """ Send all records of the root logger through a queue to a background writer thread. """
+    global _root_queue_handler
+    if _root_queue_handler is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    _root_queue_handler = start_queue_listener(stream_handler)
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(_root_queue_handler)
+    root_logger.setLevel(LOG_LEVEL)
+
+    logging.getLogger('PIL').setLevel(logging.WARNING)
+
+
+def threads_are_greenlets() -> bool:
+    """ True in a gevent worker: monkey patching makes threading start greenlets on one OS thread. """
+    gevent_monkey = sys.modules.get("gevent.monkey")
+    return gevent_monkey is not None and gevent_monkey.is_module_patched("threading")
+
+
+def threads_survive_fork() -> bool:
+    """ Greenlets (the threads of a gevent worker) are copied into a forked process and keep running. """
+    return threads_are_greenlets()
+
+
+def _restart_listeners_after_fork():
+    # The writer threads are not copied into a forked worker (gunicorn preload_app), start them in the child
+    if threads_survive_fork():
+        return
+    for listener in _listeners:
+        listener._thread = None
+        listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_listeners_after_fork)
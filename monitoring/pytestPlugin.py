@@ -0,0 +1,35 @@
+""" Pytest plugin with a query budget fixture, load it with: pytest -p monitoring.pytestPlugin
+(pytest.ini loads it for the tests in tests/, whose conftest.py sets DATABASE_URL to a SQLite file).
+
+Point DATABASE_URL at a local stand-in (e.g. sqlite:///test.db or a throwaway MySQL database) before the
+app is imported, the fixtures count the statements executed on database.engine.
+
+    def test_gymbro_feed(client, query_budget):
+        with query_budget(4):
+            client.get("/api/v1/gymbro", headers=headers)
+"""
+from contextlib import contextmanager
+
+import pytest
+
+
+@pytest.fixture
+def query_budget():
+    """ Context manager that fails the test when the block runs more statements than max_queries,
+    or one statement shape more than max_repeats times. """
+    # Imported here, the plugin is loaded before conftest.py sets DATABASE_URL and N_PLUS_ONE_* variables
+    import database
+    from monitoring.queryDetector import count_queries, N_PLUS_ONE_THRESHOLD
+
+    @contextmanager
+    def budget(max_queries: int, max_repeats: int = N_PLUS_ONE_THRESHOLD):
+        with count_queries(database.engine) as query_counter:
+            yield query_counter
+
+        assert query_counter.count <= max_queries, \
+            f"{query_counter.count} statements, budget is {max_queries}:\n{query_counter.report()}"
+        repeated_shapes = query_counter.repeated_shapes(max_repeats)
+        assert not repeated_shapes, \
+            f"Statements repeated more than {max_repeats} times (N+1):\n{query_counter.report()}"
+
+    return budget
@@ -0,0 +1,92 @@
+""" N+1 query detection: statements are grouped by their normalized shape (literals and IN lists removed),
+a shape that repeats more than N_PLUS_ONE_THRESHOLD times in one request is logged or raised.
+
+Enable with N_PLUS_ONE_DETECTION=log or N_PLUS_ONE_DETECTION=raise, meant for development and tests. """
+import logging
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+N_PLUS_ONE_DETECTION = os.getenv("N_PLUS_ONE_DETECTION", "off")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r"\b\d+(?:\.\d+)?\b")
+_placeholder_list = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_expanded_in = re.compile(r"\(\s*__\[POSTCOMPILE_\w+\]\s*\)")
+_whitespace = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """ Raised when a statement shape repeats more often than allowed in one request. """
+
+
+def normalize_statement(statement: str) -> str:
+    """ Shape of a statement, the same query with different parameters or IN list lengths has the same shape. """
+    shape = _string_literal.sub("?", statement)
+    shape = _number_literal.sub("?", shape)
+    shape = _expanded_in.sub("(?)", shape)
+    shape = _placeholder_list.sub("(?)", shape)
+    return _whitespace.sub(" ", shape).strip()
+
+
+class QueryCounter:
+    """ Statements executed on an engine while the counter is active, grouped by shape. """
+
+    def __init__(self):
+        self.shapes = Counter()
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def add(self, statement: str) -> int:
+        """ Record a statement, returns how often its shape was seen so far. """
+        shape = normalize_statement(statement)
+        self.statements.append(statement)
+        self.shapes[shape] += 1
+        return self.shapes[shape]
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, times) for shape, times in self.shapes.most_common() if times > threshold]
+
+    def report(self) -> str:
+        return "\n".join(f"{times:4d} x {shape}" for shape, times in self.shapes.most_common())
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """ Count the statements executed on the engine inside the with block, from any session. """
+    query_counter = QueryCounter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_counter.add(statement)
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield query_counter
+    finally:
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def check_repeated_statement(query_counter: QueryCounter, statement: str, route: str):
+    """ Record a statement of a request and log when its shape crosses the threshold, with the stack
+    of the code that runs the query. """
+    times = query_counter.add(statement)
+    if times == N_PLUS_ONE_THRESHOLD + 1:
+        logging.warning("Possible N+1 in %s: statement executed more than %s times: %s",
+                        route, N_PLUS_ONE_THRESHOLD, normalize_statement(statement), stack_info=True)
+
+
+def raise_for_repeated_statements(query_counter: QueryCounter, route: str):
+    """ Fail the request at its end in raise mode, the services catch exceptions raised from inside a query. """
+    repeated_shapes = query_counter.repeated_shapes(N_PLUS_ONE_THRESHOLD)
+    if N_PLUS_ONE_DETECTION == "raise" and repeated_shapes:
+        raise NPlusOneError(f"Possible N+1 in {route}, statements repeated more than {N_PLUS_ONE_THRESHOLD} times:\n"
+                            f"{query_counter.report()}")
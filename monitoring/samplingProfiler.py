@@ -0,0 +1,137 @@
+""" Sampling profiler for a running worker: the stacks of the requests that are being handled are sampled
+at a fixed interval and counted as collapsed stacks, one "frame;frame;frame count" line per distinct stack,
+root first. The output is the input format of flamegraph.pl and speedscope.
+
+With thread workers (gthread, the Flask server) the stacks come from sys._current_frames(), which shows
+where each request thread is running or waiting: a wall clock profile. In a gevent worker the requests are
+greenlets on one OS thread, which sys._current_frames() does not see. There the frame each request
+greenlet was switched out at (greenlet.gr_frame) is sampled instead. A greenlet only switches out when it
+waits, so a gevent profile shows where the requests wait (database, Redis, pool checkout, locks), an
+off-CPU profile; the CPU time between two waits is not sampled. threads=all is not available there.
+
+Only one profile runs per process at a time. The sampling costs the time to walk the stacks once per
+interval and nothing when no profile is running. """
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import Flask, request
+
+from monitoring.logConfig import threads_are_greenlets
+
+PROFILER_MAX_SECONDS = 60
+PROFILER_MIN_INTERVAL_SECONDS = 0.001
+
+_repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_profile_lock = threading.Lock()
+# Thread ids (greenlet ids in a gevent worker) that are handling a request, with the route
+_request_threads: dict[int, str] = {}
+# The request greenlets of a gevent worker, by the same ids
+_request_greenlets: dict[int, object] = {}
+
+
+class ProfilerBusyError(Exception):
+    """ Raised when a profile is started while another one is running in the process. """
+
+
+def _track_request_thread():
+    thread_id = threading.get_ident()
+    _request_threads[thread_id] = request.url_rule.rule if request.url_rule else request.path
+    if threads_are_greenlets():
+        from greenlet import getcurrent
+        _request_greenlets[thread_id] = getcurrent()
+
+
+def _untrack_request_thread(exception=None):
+    thread_id = threading.get_ident()
+    _request_threads.pop(thread_id, None)
+    _request_greenlets.pop(thread_id, None)
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_repository_root):
+        filename = os.path.relpath(filename, _repository_root)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def collapse_stack(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def request_frames(own_thread_id: int) -> list[tuple[str, object]]:
+    """ Route and current frame of the other requests, the frame a greenlet was switched out at in a gevent
+    worker. A greenlet that is running has no gr_frame, the only running one is the profiler's own. """
+    if threads_are_greenlets():
+        frames = [(_request_threads.get(thread_id), request_greenlet.gr_frame)
+                  for thread_id, request_greenlet in list(_request_greenlets.items()) if thread_id != own_thread_id]
+    else:
+        current_frames = sys._current_frames()
+        frames = [(route, current_frames.get(thread_id))
+                  for thread_id, route in list(_request_threads.items()) if thread_id != own_thread_id]
+    return [(route, frame) for route, frame in frames if route is not None and frame is not None]
+
+
+def thread_frames(own_thread_id: int, thread_names: dict[int, str]) -> list[tuple[str, object]]:
+    """ Name and current frame of all other threads, thread_names is refreshed when a new thread shows up. """
+    frames = []
+    for thread_id, frame in sys._current_frames().items():
+        if thread_id == own_thread_id:
+            continue
+        if thread_id not in thread_names:
+            thread_names.clear()
+            thread_names.update((thread.ident, thread.name) for thread in threading.enumerate())
+        frames.append((thread_names.get(thread_id, str(thread_id)), frame))
+    return frames
+
+
+def sample_stacks(seconds: float, interval: float, all_threads: bool = False) -> tuple[Counter, int]:
+    """ Sample the stacks of the requests (or of all threads) for some seconds, returns the count per
+    collapsed stack and the number of samples taken. Raises ProfilerBusyError when a profile is running.
+    all_threads is for thread workers, a gevent worker has a single OS thread. """
+    if all_threads and threads_are_greenlets():
+        raise ValueError("Profiling all threads is not possible in a gevent worker")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running in this worker")
+
+    try:
+        own_thread_id = threading.get_ident()
+        thread_names = {}
+        stacks = Counter()
+        samples = 0
+        deadline = time.perf_counter() + min(seconds, PROFILER_MAX_SECONDS)
+        interval = max(interval, PROFILER_MIN_INTERVAL_SECONDS)
+
+        while time.perf_counter() < deadline:
+            if all_threads:
+                frames = thread_frames(own_thread_id, thread_names)
+            else:
+                frames = request_frames(own_thread_id)
+            for root, frame in frames:
+                stacks[f"{root};{collapse_stack(frame)}"] += 1
+            samples += 1
+            # Monkey patched in a gevent worker, the request greenlets run while the profiler sleeps
+            time.sleep(interval)
+
+        return stacks, samples
+    finally:
+        _profile_lock.release()
+
+
+def collapsed_stacks(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def init_sampling_profiler(app: Flask):
+    """ Track which threads (or greenlets) are handling a request, so a profile can leave out idle ones. """
+    app.before_request(_track_request_thread)
+    app.teardown_request(_untrack_request_thread)
@@ -0,0 +1,153 @@
+""" Slow query log: statements slower than SLOW_QUERY_THRESHOLD_MS are written to a rotating log file
+with their duration, the types of the bound parameters (never the values), the service or provider
+function that ran them and the EXPLAIN plan, which runs in a background thread.
+
+The request thread only puts the record on a queue, a listener thread writes it. Each process writes a file
+of its own, SLOW_QUERY_LOG_FILE=logs/slow_queries.log becomes logs/slow_queries.<pid>.log per gunicorn worker.
+
+Disabled when SLOW_QUERY_THRESHOLD_MS is not set. """
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from monitoring.logConfig import PerProcessRotatingFileHandler, start_queue_listener, threads_survive_fork
+from util.jsonProvider import dumps_bytes
+
+SLOW_QUERY_THRESHOLD_MS = os.getenv("SLOW_QUERY_THRESHOLD_MS")
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "logs/slow_queries.log")
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1"
+SLOW_QUERY_QUEUE_SIZE = 100
+
+# Directories whose functions are reported as the caller of a statement
+CALLER_DIRECTORIES = ("service", "provider", "router", "cache")
+_repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+slow_query_logger = logging.getLogger("slow_query")
+_explain_queue: queue.Queue = queue.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+_explain_thread: threading.Thread | None = None
+_explain_engine: Engine | None = None
+_threshold_ms = float(SLOW_QUERY_THRESHOLD_MS) if SLOW_QUERY_THRESHOLD_MS else None
+
+
+def parameter_shape(parameters, executemany: bool):
+    """ Types of the bound parameters, so the log shows how a statement was called without the values. """
+    if executemany:
+        return {"rows": len(parameters), "first": parameter_shape(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def find_caller() -> str | None:
+    """ module.function of the nearest service, provider, router or cache function on the stack. """
+    frame = sys._getframe(1)
+    while frame is not None:
+        file_name = frame.f_code.co_filename
+        relative_path = os.path.relpath(file_name, _repository_root) if file_name.startswith(_repository_root) else ""
+        directory, _, module_file = relative_path.partition(os.sep)
+        if directory in CALLER_DIRECTORIES and module_file.endswith(".py"):
+            return f"{module_file[:-3]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def explain_prefix(engine: Engine) -> str | None:
+    if engine.dialect.name == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    if engine.dialect.name in ("mysql", "mariadb", "postgresql"):
+        return "EXPLAIN "
+    return None
+
+
+def run_explain_worker(engine: Engine):
+    """ Explain queued statements on a connection of its own, its statements are skipped by the hook. """
+    prefix = explain_prefix(engine)
+    while True:
+        entry, statement, parameters = _explain_queue.get()
+        try:
+            with engine.connect() as connection:
+                result = connection.exec_driver_sql(prefix + statement, parameters)
+                entry["explain"] = [list(row) for row in result.all()]
+        except Exception as e:
+            entry["explain_error"] = str(e)
+        slow_query_logger.warning(dumps_bytes(entry).decode("utf-8"))
+
+
+def start_explain_worker(engine: Engine):
+    global _explain_thread, _explain_engine
+    _explain_engine = engine
+    _explain_thread = threading.Thread(target=run_explain_worker, args=(engine,), name="slow-query-explain",
+                                       daemon=True)
+    _explain_thread.start()
+
+
+def _restart_explain_worker_after_fork():
+    # The worker thread is not copied into a forked worker (gunicorn preload_app), start one in the child
+    if _explain_thread is not None and not threads_survive_fork():
+        start_explain_worker(_explain_engine)
+
+
+os.register_at_fork(after_in_child=_restart_explain_worker_after_fork)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info["slow_query_started_at"].pop()) * 1000
+    if duration_ms < _threshold_ms or threading.current_thread() is _explain_thread:
+        return
+
+    entry = {
+        "duration_ms": round(duration_ms, 2),
+        "caller": find_caller(),
+        "statement": statement,
+        "parameters": parameter_shape(parameters, executemany),
+    }
+
+    explainable = SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip()[:6].upper() == "SELECT"
+    if explainable and _explain_thread is not None:
+        try:
+            _explain_queue.put_nowait((entry, statement, parameters))
+            return
+        except queue.Full:
+            entry["explain_error"] = "explain queue full"
+    slow_query_logger.warning(dumps_bytes(entry).decode("utf-8"))
+
+
+def _handle_error(exception_context):
+    started_at = exception_context.connection.info.get("slow_query_started_at") if exception_context.connection else None
+    if started_at:
+        started_at.pop()
+
+
+def init_slow_query_log(engine: Engine):
+    """ Register the slow query hook on the engine when SLOW_QUERY_THRESHOLD_MS is set. """
+    if _threshold_ms is None or event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+
+    log_directory = os.path.dirname(SLOW_QUERY_LOG_FILE)
+    if log_directory:
+        os.makedirs(log_directory, exist_ok=True)
+    file_handler = PerProcessRotatingFileHandler(SLOW_QUERY_LOG_FILE, max_bytes=10 * 1024 * 1024, backup_count=5)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(start_queue_listener(file_handler))
+    slow_query_logger.setLevel(logging.WARNING)
+    slow_query_logger.propagate = False
+
+    if SLOW_QUERY_EXPLAIN and explain_prefix(engine) is not None:
+        start_explain_worker(engine)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    logging.info("Logging statements slower than %s ms to %s", SLOW_QUERY_THRESHOLD_MS, file_handler.baseFilename)
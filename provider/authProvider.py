@@ -23,12 +23,9 @@ def get_auth_key() -> str | None:
 
     if authorization:
         try:
-            logging.info(f"Authorization header received: {authorization}")
-            decoded_key = decode_str(authorization)
-            logging.info(f"Decoded key: {decoded_key}")
-            return decoded_key
+            return decode_str(authorization)
         except Exception as e:
-            logging.error(f"Error decoding authentication key: {e}")
+            logging.error("Error decoding authentication key: %s", e)
             return None
     logging.error("Authentication credentials were not provided.")
     return None
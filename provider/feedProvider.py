@@ -0,0 +1,36 @@
+import logging
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from cache.fragmentCache import get_cached_gyma_fragment, cache_gyma_fragment
+from model.Gyma import Gyma
+from service.exerciseService import get_exercises_of_gymas
+from util.serializer import gyma_to_fragment
+
+
+def get_gyma_fragments(db: Session, gymas: List[Gyma]) -> List[dict]:
+    """ Serialized gymas (without person) in the same order, from the fragment cache where possible.
+    Exercises of the gymas that are not cached are loaded together in one query. """
+    fragments = {}
+    missing_gymas = []
+    for gyma in gymas:
+        fragment = get_cached_gyma_fragment(gyma.gyma_id)
+        if fragment is None:
+            missing_gymas.append(gyma)
+        else:
+            fragments[gyma.gyma_id] = fragment
+
+    if missing_gymas:
+        logging.debug("Gyma fragment cache: %s hits, %s misses", len(fragments), len(missing_gymas))
+        exercises_by_gyma_id = get_exercises_of_gymas(db, [gyma.gyma_id for gyma in missing_gymas])
+
+        for gyma in missing_gymas:
+            fragment = gyma_to_fragment(gyma, exercises_by_gyma_id[gyma.gyma_id])
+            fragments[gyma.gyma_id] = fragment
+
+            # Only finished gymas are immutable, a running one still gets exercises
+            if gyma.time_of_leaving is not None:
+                cache_gyma_fragment(gyma.gyma_id, fragment)
+
+    return [fragments[gyma.gyma_id] for gyma in gymas]
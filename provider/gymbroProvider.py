@@ -1,48 +1,52 @@
 import logging
-from typing import List
+from typing import List, Set
 from sqlalchemy import select, desc, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
 from model.Friendship import Friendship
 from model.Gyma import Gyma
-from model.GymaExercise import GymaExercise
+
+
+def get_friend_ids_of_user(db: Session, user_id: int) -> Set[int]:
+    """ Get the user ids of the accepted friends of a user. """
+    # Fetch friend IDs of the user (ensure both person_id and friend_id are considered)
+    friends_query = (
+        select(Friendship.person_id, Friendship.friend_id)
+        .where(
+            or_(
+                Friendship.person_id == user_id,
+                Friendship.friend_id == user_id
+            )
+        )
+        .where(Friendship.status == "accepted")
+    )
+    friends_result = db.execute(friends_query)
+
+    # Collect friend IDs by checking which one is not the user_id
+    friend_ids = set()  # use a set to avoid duplicates
+    for row in friends_result.fetchall():
+        if row[0] != user_id:
+            friend_ids.add(row[0])  # person_id
+        if row[1] != user_id:
+            friend_ids.add(row[1])  # friend_id
+
+    return friend_ids
 
 
 def get_last_ten_gyma_entries_of_user_and_friends(db: Session, user_id: int, gyma_keys: str = None) -> List[Gyma]:
     """ Get last ten gyma entries of user and user's friends by time_of_leaving,
-    include associated exercises. """
+    exercises are not loaded, see provider.feedProvider.get_gyma_fragments. """
 
     try:
         gyma_keys_to_exclude = gyma_keys.split(",") if gyma_keys else []
 
-        # Fetch friend IDs of the user (ensure both person_id and friend_id are considered)
-        friends_query = (
-            select(Friendship.person_id, Friendship.friend_id)
-            .where(
-                or_(
-                    Friendship.person_id == user_id,
-                    Friendship.friend_id == user_id
-                )
-            )
-            .where(Friendship.status == "accepted")
-        )
-        friends_result = db.execute(friends_query)
-
-        # Collect friend IDs by checking which one is not the user_id
-        friend_ids = set()  # use a set to avoid duplicates
-        for row in friends_result.fetchall():
-            if row[0] != user_id:
-                friend_ids.add(row[0])  # person_id
-            if row[1] != user_id:
-                friend_ids.add(row[1])  # friend_id
-
+        friend_ids = get_friend_ids_of_user(db, user_id)
         if not friend_ids:
             return []
 
         # Fetch the last 10 gyma entries, excluding those with keys in `gyma_keys_to_exclude`
         query = (
             select(Gyma)
-            .options(joinedload(Gyma.exercises).joinedload(GymaExercise.exercise))
             .where(
                 or_(
                     Gyma.user_id == user_id,
@@ -56,10 +60,10 @@ def get_last_ten_gyma_entries_of_user_and_friends(db: Session, user_id: int, gym
         )
 
         result = db.execute(query)
-        ten_latest_gyma = result.scalars().unique().all()
+        ten_latest_gyma = result.scalars().all()
 
         return list(ten_latest_gyma)
 
     except Exception as e:
-        logging.error(f"Error fetching gyma entries: {e}")
+        logging.error("Error fetching gyma entries: %s", e)
         return []
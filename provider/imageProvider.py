@@ -14,10 +14,6 @@ LARGE_IMAGE_PATH = os.getenv("LARGE_IMAGE_PATH", "images/large")
 MEDIUM_IMAGE_PATH = os.getenv("MEDIUM_IMAGE_PATH", "images/medium")
 ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", "images/archive")
 
-# Ensure storage paths exist
-os.makedirs(LARGE_IMAGE_PATH, exist_ok=True)
-os.makedirs(MEDIUM_IMAGE_PATH, exist_ok=True)
-os.makedirs(ARCHIVE_PATH, exist_ok=True)
 
 
 def process_image(image_dto: ImageDTO) -> Optional[dict]:
@@ -36,7 +32,7 @@ def process_image(image_dto: ImageDTO) -> Optional[dict]:
 
         return {'pf_path_l': pf_path_l, 'pf_path_m': pf_path_m}
     except Exception as e:
-        logging.error(f"Error processing image: {e}")
+        logging.error("Error processing image: %s", e)
         return None
 
 
@@ -71,18 +67,20 @@ def resize_and_crop_image(image: Image, resolution: tuple[int, int], file_size_k
         buffer.seek(0)
         return Image.open(buffer)
     except Exception as e:
-        logging.error(f"Error resizing image: {e}")
+        logging.error("Error resizing image: %s", e)
         return None
 
 
 def store_image(image: Image, file_name: str, location: str) -> str | None:
     """Save the image to a specified location and return the file name."""
     try:
+        # Storage paths are created on the first upload, not at import
+        os.makedirs(location, exist_ok=True)
         file_path = os.path.join(location, file_name)
         image.save(file_path, format='JPEG')
         return file_name
     except Exception as e:
-        logging.error(f"Error storing image: {e}")
+        logging.error("Error storing image: %s", e)
         return None
 
 
@@ -104,12 +102,13 @@ def move_images_to_archive(pf_name_l: str, pf_name_m: str) -> bool:
         new_path_l = os.path.join(ARCHIVE_PATH, os.path.basename(pf_path_l))
         new_path_m = os.path.join(ARCHIVE_PATH, os.path.basename(pf_path_m))
 
+        os.makedirs(ARCHIVE_PATH, exist_ok=True)
         move(pf_path_l, new_path_l)
         move(pf_path_m, new_path_m)
 
-        logging.info(f"Moved {pf_path_l} to {new_path_l}")
-        logging.info(f"Moved {pf_path_m} to {new_path_m}")
+        logging.info("Moved %s to %s", pf_path_l, new_path_l)
+        logging.info("Moved %s to %s", pf_path_m, new_path_m)
         return True
     except Exception as e:
-        logging.error(f"Error moving images to archive: {e}")
+        logging.error("Error moving images to archive: %s", e)
         return False
@@ -16,10 +16,10 @@ def search_by_profile_url(db: Session, profile_url: str) -> Optional[List[Person
 
         return persons if persons else None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching persons by profile_url: {e}")
+        logging.error("Error fetching persons by profile_url: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error finding Persons with query in their profile_url: {e}")
+        logging.error("Exception: Error finding Persons with query in their profile_url: %s", e)
         return None
 
 
@@ -46,8 +46,8 @@ def search_by_first_and_last_name(db: Session, name: str) -> Optional[List[Perso
         return persons if persons else None
 
     except SQLAlchemyError as e:
-        print(f"Error fetching persons by first and last name: {e}")
+        logging.error("Error fetching persons by first and last name: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error finding Persons with query in their firstname and lastname: {e}")
+        logging.error("Exception: Error finding Persons with query in their firstname and lastname: %s", e)
         return None
\ No newline at end of file
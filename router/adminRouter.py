@@ -0,0 +1,51 @@
+import logging
+from flask import Blueprint, Response, request
+from sqlalchemy.orm import Session
+
+from database import get_db
+from monitoring.logConfig import threads_are_greenlets
+from monitoring.samplingProfiler import sample_stacks, collapsed_stacks, ProfilerBusyError, PROFILER_MAX_SECONDS
+from provider.authProvider import get_auth_key
+from service.userService import get_user_by_user_id
+from session.sessionService import get_user_id_from_session_data
+from util.response import detail_response
+
+admin = Blueprint('admin', __name__, url_prefix='/api/v1/admin')
+
+DEFAULT_PROFILE_SECONDS = 10
+DEFAULT_PROFILE_INTERVAL_MS = 10
+
+@admin.route("/profile", methods=['GET'])
+def profile_worker():
+    """ Sample the requests of this worker for some seconds, returns collapsed stacks for a flamegraph.
+    In a gevent worker the stacks show where the request greenlets wait, see monitoring.samplingProfiler. """
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    user = get_user_by_user_id(db, user_id)
+    if user is None or user.account_type != "admin":
+        return detail_response("Admin only", 403)
+    # The session is not needed while sampling, do not hold a connection for the whole profile
+    db.close()
+
+    seconds = request.args.get("seconds", DEFAULT_PROFILE_SECONDS, type=float)
+    interval_ms = request.args.get("interval_ms", DEFAULT_PROFILE_INTERVAL_MS, type=float)
+    if seconds <= 0 or seconds > PROFILER_MAX_SECONDS:
+        return detail_response(f"Seconds must be between 0 and {PROFILER_MAX_SECONDS}", 400)
+    all_threads = request.args.get("threads") == "all"
+    if all_threads and threads_are_greenlets():
+        return detail_response("threads=all is not available in a gevent worker, its requests are greenlets", 400)
+
+    logging.info("Profiling worker for %s seconds by user %s", seconds, user_id)
+    try:
+        stacks, samples = sample_stacks(seconds, interval_ms / 1000, all_threads)
+    except ProfilerBusyError as e:
+        return detail_response(str(e), 409)
+
+    response = Response(collapsed_stacks(stacks), status=200, mimetype="text/plain")
+    response.headers["X-Profile-Samples"] = str(samples)
+    return response
@@ -4,12 +4,9 @@ from sqlalchemy.orm import Session
 import logging
 
 from database import get_db
-from dto.exerciseDTO import ExerciseDTO
-from dto.gymaDTO import GymaDTO
-from dto.personDTO import PersonDTO, PersonSimpleDTO
-from dto.profileDTO import MyProfileDTO
 from mail.emailService import send_verification_email
 from provider.authProvider import check_user_credentials, encode_str, get_auth_key
+from provider.feedProvider import get_gyma_fragments
 from dto.loginDTO import LoginDTO, LoginResponseDTO
 from service.friendshipService import get_friends_by_person_id, get_pending_friendships_to_be_accepted, \
     get_blocked_friendships
@@ -19,7 +16,8 @@ from service.userService import get_user_by_email, get_user_by_user_id, set_emai
 from service.userVerificationService import get_user_id_by_verification_code, remove_user_verification, get_verification_code_by_user_id
 from session.sessionService import set_session, delete_session
 from session.sessionDataObject import SessionDataObject
-from util.response import detail_response
+from util.response import detail_response, json_response
+from util.serializer import gyma_list_to_dicts, person_simple_to_dict, person_to_dict
 
 API_URL = os.getenv("API_BASE_URL")
 auth = Blueprint('auth', __name__, url_prefix='/api/v1/auth')
@@ -33,7 +31,7 @@ def login():
     except Exception as e:
         return detail_response(f"Invalid data: {e}", 400)
 
-    logging.info(f"Attempting login for user with email: {login_dto.email}")
+    logging.info("Attempting login for user with email: %s", login_dto.email)
 
     user = get_user_by_email(db, login_dto.email)
     if user is None:
@@ -56,108 +54,25 @@ def login():
 
     if person is not None:
         friends = get_friends_by_person_id(db, person.person_id)
-        friend_list = [
-            PersonSimpleDTO(
-                profile_url=friend.profile_url,
-                first_name=friend.first_name,
-                last_name=friend.last_name,
-                sex=friend.sex,
-                pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-            ).model_dump(mode='json')
-            for friend in friends
-        ]
-
-        pf_path_l = f"{API_URL}/images/large/{person.pf_path_l}" if person.pf_path_l else None
-        pf_path_m = f"{API_URL}/images/medium/{person.pf_path_m}" if person.pf_path_m else None
-
-        person_dto = PersonDTO(
-            profile_url=person.profile_url,
-            first_name=person.first_name,
-            last_name=person.last_name,
-            date_of_birth=person.date_of_birth,
-            sex=person.sex,
-            city=person.city,
-            profile_text=person.profile_text,
-            pf_path_l=pf_path_l,
-            pf_path_m=pf_path_m,
-        ).model_dump(mode='json')
-
         pending_friends = get_pending_friendships_to_be_accepted(db, user_id_of_ok_credentials)
-        pending_friend_list = [
-            PersonSimpleDTO(
-                profile_url=friend.profile_url,
-                first_name=friend.first_name,
-                last_name=friend.last_name,
-                sex=friend.sex,
-                pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-            ).model_dump(mode='json')
-            for friend in pending_friends
-        ]
-
         blocked_friends = get_blocked_friendships(db, user_id_of_ok_credentials)
-        blocked_friend_list = [
-            PersonSimpleDTO(
-                profile_url=friend.profile_url,
-                first_name=friend.first_name,
-                last_name=friend.last_name,
-                sex=friend.sex,
-                pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-            ).model_dump(mode='json')
-            for friend in blocked_friends
-        ]
         five_latest_gyma = get_last_five_gyma_entry_of_user(db, user_id_of_ok_credentials)
 
-        my_person_simple_dto = PersonSimpleDTO(
-            profile_url=person.profile_url,
-            first_name=person.first_name,
-            last_name=person.last_name,
-            sex=person.sex,
-            pf_path_m=f"{API_URL}/images/medium/{person.pf_path_m}" if person.pf_path_m else None,
-        ).model_dump(mode='json')
-
-        mine_gyma_with_exercises = []
-        for gyma in five_latest_gyma:
-            exercise_dtos = [
-                ExerciseDTO(
-                    exercise_id=exercise.exercise_id,
-                    exercise_name=exercise.exercise.exercise_name,
-                    exercise_type=exercise.exercise.exercise_type,
-                    count=exercise.exercise.count,
-                    sets=exercise.exercise.sets,
-                    weight=exercise.exercise.weight,
-                    minutes=exercise.exercise.minutes,
-                    km=exercise.exercise.km,
-                    level=exercise.exercise.level,
-                    description=exercise.exercise.description,
-                ).model_dump(mode='json')
-                for exercise in gyma.exercises
-            ]
-
-            gyma_dto = GymaDTO(
-                gyma_id=gyma.gyma_id,
-                person=my_person_simple_dto,
-                time_of_arrival=gyma.time_of_arrival,
-                time_of_leaving=gyma.time_of_leaving,
-                exercises=exercise_dtos
-            ).model_dump(mode='json')
-
-            mine_gyma_with_exercises.append(gyma_dto)
-
-        my_profile_dto = MyProfileDTO(
-            personDTO=person_dto,
-            gyma_list=mine_gyma_with_exercises,
-            friend_list=friend_list,
-            pending_friend_list=pending_friend_list,
-            blocked_friend_list=blocked_friend_list,
-        ).model_dump(mode='json')
+        my_profile_dto = {
+            "personDTO": person_to_dict(person),
+            "gyma_list": gyma_list_to_dicts(get_gyma_fragments(db, five_latest_gyma), person_simple_to_dict(person)),
+            "friend_list": [person_simple_to_dict(friend) for friend in friends],
+            "pending_friend_list": [person_simple_to_dict(friend) for friend in pending_friends],
+            "blocked_friend_list": [person_simple_to_dict(friend) for friend in blocked_friends],
+        }
     else:
         my_profile_dto = None
 
-    return jsonify({
+    return json_response({
         "session_token": encoded_session_key,
         "myProfileDTO": my_profile_dto,
         "device_trusted": login_dto.trustDevice,
-    }), 200
+    })
 
 
 @auth.route("/logout", methods=['POST'])
@@ -176,12 +91,11 @@ def verify(verification_code: str):
     db: Session = next(get_db())
     logging.info("Attempting email verification with verification code")
     user_id = get_user_id_by_verification_code(db, verification_code)
-    logging.info(f"Verification code: {verification_code}")
     if user_id is None:
         return detail_response("Verification code does not exist", 404)
 
     else:
-        logging.info(f"Verifying user {user_id}")
+        logging.info("Verifying user %s", user_id)
         user = get_user_by_user_id(db, user_id)
         if user is None:
             return detail_response("User not found", 404)
@@ -200,7 +114,7 @@ def resend_verification():
     db: Session = next(get_db())
     login_dto = request.json
 
-    logging.info(f"Attempting email resend: {login_dto['email']}")
+    logging.info("Attempting email resend: %s", login_dto['email'])
     if login_dto['email'] is None:
         return detail_response("Please provide email", 404)
 
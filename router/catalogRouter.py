@@ -0,0 +1,25 @@
+from flask import Blueprint, request
+from sqlalchemy.orm import Session
+
+from database import get_db
+from provider.authProvider import get_auth_key
+from service.catalogService import autocomplete_exercise_names
+from session.sessionService import get_user_id_from_session_data
+from util.response import detail_response, json_response
+
+catalog = Blueprint('catalog', __name__, url_prefix='/api/v1/catalog')
+
+@catalog.route("/autocomplete", methods=['GET'])
+def autocomplete_exercise_name():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    prefix = request.args.get("q", "")
+    if len(prefix) > 64:
+        return detail_response("Query too long", 400)
+
+    return json_response(autocomplete_exercise_names(db, user_id, prefix))
@@ -0,0 +1,46 @@
+import logging
+from flask import Blueprint, request, Response, stream_with_context
+from sqlalchemy.orm import Session
+
+from database import get_db
+from provider.authProvider import get_auth_key
+from service.exportService import stream_export_ndjson, stream_export_csv
+from session.sessionService import get_user_id_from_session_data
+from util.response import detail_response
+
+export = Blueprint('export', __name__, url_prefix='/api/v1/export')
+
+EXPORT_FORMATS = {
+    "ndjson": (stream_export_ndjson, "application/x-ndjson"),
+    "csv": (stream_export_csv, "text/csv"),
+}
+
+@export.route("", methods=['GET'])
+def export_my_gymas():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        db.close()
+        return detail_response("Session invalid", 401)
+
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        db.close()
+        return detail_response(f"Format must be one of: {', '.join(EXPORT_FORMATS)}", 400)
+
+    logging.info("Exporting gymas as %s", export_format)
+    stream_export, mimetype = EXPORT_FORMATS[export_format]
+
+    def generate():
+        # The session stays open while the response is streamed and is closed when the stream ends
+        try:
+            yield from stream_export(db, user_id)
+        finally:
+            db.close()
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=gyma-export.{export_format}"
+    response.headers["Cache-Control"] = "no-store"
+    return response
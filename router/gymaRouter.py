@@ -1,21 +1,27 @@
 import os
 
 from flask import Blueprint, request, jsonify
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from database import get_db
 from dto.exerciseDTO import ExerciseDTO
-from dto.gymaDTO import GymaDTO
+from dto.gymaDTO import GymaDTO, GymaSyncDTO
 from dto.personDTO import PersonSimpleDTO
 from provider.authProvider import get_auth_key
-from service.exerciseService import add_exercise_db, remove_exercise_by_gyma_and_id
+from provider.feedProvider import get_gyma_fragments
+from service.exerciseService import add_exercise_db, add_exercises_db, remove_exercise_by_gyma_and_id
 from service.personService import get_person_by_user_id
 from session.sessionService import get_user_id_from_session_data, set_gyma_id_in_session, get_session_data, delete_gyma_id_from_session
-from service.gymaService import add_gyma, set_time_of_leaving, get_gyma_by_gyma_id, remove_gyma_and_exercises
-from util.response import detail_response
+from service.gymaService import add_gyma, set_time_of_leaving, get_gyma_by_gyma_id, remove_gyma_and_exercises, \
+    sync_gyma, remove_all_gymas_of_user
+from util.response import detail_response, json_response
+from util.serializer import gyma_from_fragment, person_simple_to_dict
 
 API_URL = os.getenv("API_BASE_URL")
 gyma = Blueprint('gyma', __name__, url_prefix='/api/v1/gyma')
 
+MAX_EXERCISES_PER_REQUEST = 100
+
 @gyma.route("/start", methods=['POST'])
 def start_gyma():
     db: Session = next(get_db())
@@ -87,12 +93,68 @@ def add_exercise_to_gyma():
     exercise_dto = request.json
     exercise_data = ExerciseDTO(**exercise_dto)
 
-    added_exercise_id = add_exercise_db(db, session_data.gyma_id, exercise_data)
-    if added_exercise_id is not None:
-        return {"exercise_id": added_exercise_id}, 201
+    added_exercise = add_exercise_db(db, session_data.gyma_id, exercise_data)
+    if added_exercise is not None:
+        added_exercise_id, new_records = added_exercise
+        return {"exercise_id": added_exercise_id, "new_records": new_records}, 201
     else:
         return detail_response("Failed to add exercise", 400)
 
+@gyma.route("/exercises", methods=['POST'])
+def add_exercises_to_gyma():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    session_data = get_session_data(auth_token)
+    if session_data is None or session_data.gyma_id is None:
+        return detail_response("Session invalid", 401)
+
+    exercise_dtos = request.json
+    if not isinstance(exercise_dtos, list) or not exercise_dtos:
+        return detail_response("Expected a list of exercises", 400)
+    if len(exercise_dtos) > MAX_EXERCISES_PER_REQUEST:
+        return detail_response(f"At most {MAX_EXERCISES_PER_REQUEST} exercises per request", 400)
+
+    try:
+        exercise_data = [ExerciseDTO(**exercise_dto) for exercise_dto in exercise_dtos]
+    except (ValidationError, TypeError) as e:
+        return detail_response(f"Invalid data: {e}", 400)
+
+    added_exercise_ids = add_exercises_db(db, session_data.gyma_id, exercise_data)
+    if added_exercise_ids is not None:
+        return {"exercise_ids": added_exercise_ids}, 201
+    else:
+        return detail_response("Failed to add exercises", 400)
+
+
+@gyma.route("/sync", methods=['POST'])
+def sync_whole_gyma():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    try:
+        gyma_sync_dto = GymaSyncDTO(**request.json)
+    except (ValidationError, TypeError) as e:
+        return detail_response(f"Invalid data: {e}", 400)
+
+    synced = sync_gyma(db, user_id, gyma_sync_dto)
+    if synced is None:
+        return detail_response("Gyma cannot be synced", 400)
+    synced_gyma, created = synced
+    if synced_gyma is None:
+        return detail_response("Gyma of this idempotency key was synced and deleted since", 410)
+
+    person_of_gyma = get_person_by_user_id(db, user_id)
+    person_simple_dto = person_simple_to_dict(person_of_gyma) if person_of_gyma else None
+    gyma_dto = gyma_from_fragment(get_gyma_fragments(db, [synced_gyma])[0], person_simple_dto)
+
+    return json_response(gyma_dto, 201 if created else 200)
+
+
 @gyma.route("/delete/<int:gyma_id>", methods=['DELETE'])
 def delete_gyma(gyma_id):
     db: Session = next(get_db())
@@ -122,6 +184,23 @@ def delete_gyma(gyma_id):
 
 
 
+@gyma.route("/delete_all", methods=['DELETE'])
+def delete_all_gyma():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    removed_gyma_count = remove_all_gymas_of_user(db, user_id)
+    if removed_gyma_count is None:
+        return detail_response("Failed to delete Gymas", 400)
+
+    delete_gyma_id_from_session(auth_token)
+    return {"deleted": removed_gyma_count}, 200
+
+
 @gyma.route("/delete_exercise/<int:gyma_id>/<int:exercise_id>", methods=['DELETE'])
 def delete_exercise(gyma_id: int, exercise_id: int):
     db: Session = next(get_db())
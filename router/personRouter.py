@@ -5,15 +5,16 @@ from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from database import get_db
-from dto.imageDTO import ImageDTO
-from dto.personDTO import PersonDTO, EnterPersonDTO, PersonSimpleDTO
+from dto.imageDTO import ImageDTO, MAX_CONTENT_LENGTH
+from dto.personDTO import PersonDTO, EnterPersonDTO
 from dto.profileDTO import MyProfileDTO
 from provider.authProvider import get_auth_key
 from provider.imageProvider import process_image, move_images_to_archive
 from provider.searchProvider import search_by_profile_url, search_by_first_and_last_name
 from service.personService import add_person, get_person_by_user_id, edit_person, set_pf_paths
 from session.sessionService import get_user_id_from_session_data
-from util.response import detail_response
+from util.response import detail_response, json_response
+from util.serializer import person_simple_to_dict
 
 person = Blueprint('person', __name__, url_prefix='/api/v1/person')
 API_URL = os.getenv("API_BASE_URL")
@@ -27,7 +28,7 @@ def add_or_edit_person():
     try:
         enter_person_dto = EnterPersonDTO(**request.json)
     except ValidationError as e:
-        logging.error(f"Validation Error: {e}")
+        logging.error("Validation Error: %s", e)
         return detail_response("Invalid data format", 400)
 
     logging.info("Creating or editing person object for user")
@@ -84,7 +85,6 @@ def add_or_edit_person():
                 friend_list=[],
                 pending_friend_list=[]
             ).model_dump(mode='json')
-            logging.info(my_profile_dto)
             return jsonify(my_profile_dto), 200
 
 
@@ -92,6 +92,16 @@ def add_or_edit_person():
 def upload_picture():
     db: Session = next(get_db())
     auth_token = get_auth_key()
+
+    # Everything below is checked before request.files is touched, so Werkzeug has not buffered the body yet.
+    # A chunked upload has no Content-Length, Werkzeug stops it at MAX_CONTENT_LENGTH while reading (see main.py)
+    if request.content_length is not None and request.content_length > MAX_CONTENT_LENGTH:
+        return detail_response("File size exceeds the maximum limit of 5 MB.", 413)
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
     file = request.files.get('file')
 
     if not file:
@@ -105,10 +115,6 @@ def upload_picture():
     except ValueError as e:
         return detail_response("Invalid data format", 400)
 
-    user_id = get_user_id_from_session_data(auth_token)
-    if user_id is None:
-        return detail_response("Session invalid", 401)
-
     person_obj = get_person_by_user_id(db, user_id)
     if person_obj is None:
         return detail_response("Picture cannot be added if there is no person", 404)
@@ -165,14 +171,6 @@ def search_person(query: str):
     if not possible_matches:
         return detail_response("No matches found", 400)
 
-    possible_matches_dto = [
-        PersonSimpleDTO(
-            profile_url=match_person.profile_url,
-            first_name=match_person.first_name,
-            last_name=match_person.last_name,
-            sex=match_person.sex,
-            pf_path_m=f"{API_URL}/images/medium/{match_person.pf_path_m}" if match_person.pf_path_m else None,
-        ).model_dump(mode='json')
-        for match_person in possible_matches]
-
-    return possible_matches_dto, 200
\ No newline at end of file
+    possible_matches_dto = [person_simple_to_dict(match_person) for match_person in possible_matches]
+
+    return json_response(possible_matches_dto)
\ No newline at end of file
@@ -1,23 +1,19 @@
 import logging
-import os
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request
 from sqlalchemy.orm import Session
 
 from database import get_db
-from dto.exerciseDTO import ExerciseDTO
-from dto.gymaDTO import GymaDTO
-from dto.personDTO import PersonDTO, PersonSimpleDTO
-from dto.profileDTO import ProfileDTO, MyProfileUpdateListsDTO
 from provider.authProvider import get_auth_key
+from provider.feedProvider import get_gyma_fragments
 from service.friendshipService import get_friends_by_person_id, get_friendship, add_friendship, remove_friendship, \
     get_friendship_of_requester, update_friendship_status, block_friendship, get_pending_friendships_to_be_accepted, \
     get_blocked_friendships
 from service.gymaService import get_last_five_gyma_entry_of_user
 from service.personService import get_person_by_profile_url, get_person_by_user_id
 from session.sessionService import get_user_id_from_session_data
-from util.response import detail_response
+from util.response import detail_response, json_response
+from util.serializer import gyma_list_to_dicts, person_simple_to_dict, person_to_dict
 
-API_URL = os.getenv("API_BASE_URL")
 profile = Blueprint('profile', __name__, url_prefix='/api/v1/profile')
 
 @profile.route("/<string:profile_url>", methods=["GET"])
@@ -55,79 +51,21 @@ def get_profile(profile_url):
         return detail_response("Profile for friends only", 403)
 
     friends = get_friends_by_person_id(db, person_by_profile_url.person_id)
+    friend_list = [person_simple_to_dict(friend) for friend in friends]
 
-    friend_list = [
-        PersonSimpleDTO(
-            profile_url=friend.profile_url,
-            first_name=friend.first_name,
-            last_name=friend.last_name,
-            sex=friend.sex,
-            pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-        ).model_dump(mode='json')
-        for friend in friends
-    ]
-
-    pf_path_l = f"{API_URL}/images/large/{person_by_profile_url.pf_path_l}" if person_by_profile_url.pf_path_l else None
-    pf_path_m = f"{API_URL}/images/medium/{person_by_profile_url.pf_path_m}" if person_by_profile_url.pf_path_m else None
-
-    person_dto = PersonDTO(
-        profile_url=person_by_profile_url.profile_url,
-        first_name=person_by_profile_url.first_name,
-        last_name=person_by_profile_url.last_name,
-        date_of_birth=person_by_profile_url.date_of_birth,
-        sex=person_by_profile_url.sex,
-        city=person_by_profile_url.city,
-        profile_text=person_by_profile_url.profile_text,
-        pf_path_l=pf_path_l,
-        pf_path_m=pf_path_m,
-    ).model_dump(mode='json')
+    person_dto = person_to_dict(person_by_profile_url)
 
     five_latest_gyma = get_last_five_gyma_entry_of_user(db, person_by_profile_url.person_id)
+    gyma_with_exercises = gyma_list_to_dicts(get_gyma_fragments(db, five_latest_gyma), person_simple_to_dict(person_by_profile_url))
 
-    person_simple_dto = PersonSimpleDTO(
-        profile_url=person_by_profile_url.profile_url,
-        first_name=person_by_profile_url.first_name,
-        last_name=person_by_profile_url.last_name,
-        sex=person_by_profile_url.sex,
-        pf_path_m=f"{API_URL}/images/medium/{person_by_profile_url.pf_path_m}" if person_by_profile_url.pf_path_m else None,
-    ).model_dump(mode='json')
-
-    gyma_with_exercises = []
-    for gyma in five_latest_gyma:
-        exercise_dtos = [
-            ExerciseDTO(
-                exercise_id=exercise.exercise_id,
-                exercise_name=exercise.exercise.exercise_name,
-                exercise_type=exercise.exercise.exercise_type,
-                count=exercise.exercise.count,
-                sets=exercise.exercise.sets,
-                weight=exercise.exercise.weight,
-                minutes=exercise.exercise.minutes,
-                km=exercise.exercise.km,
-                level=exercise.exercise.level,
-                description=exercise.exercise.description,
-            ).model_dump(mode='json')
-            for exercise in gyma.exercises
-        ]
-
-        gyma_dto = GymaDTO(
-            gyma_id=gyma.gyma_id,
-            person=person_simple_dto,
-            time_of_arrival=gyma.time_of_arrival,
-            time_of_leaving=gyma.time_of_leaving,
-            exercises=exercise_dtos
-        ).model_dump(mode='json')
-
-        gyma_with_exercises.append(gyma_dto)
-
-    profile_dto = ProfileDTO(
-        personDTO=person_dto,
-        gyma_list=gyma_with_exercises,
-        friend_list=friend_list,
-        friendship_status=friendship_status
-    ).model_dump(mode='json')
-
-    return jsonify(profile_dto), 200
+    profile_dto = {
+        "personDTO": person_dto,
+        "gyma_list": gyma_with_exercises,
+        "friend_list": friend_list,
+        "friendship_status": friendship_status,
+    }
+
+    return json_response(profile_dto)
 
 
 @profile.route("/update_lists", methods=["GET"])
@@ -147,48 +85,16 @@ def update_my_profile_lists():
         return detail_response("Create a profile first", 401)
 
     friends = get_friends_by_person_id(db, user_id)
-    friend_list = [
-        PersonSimpleDTO(
-            profile_url=friend.profile_url,
-            first_name=friend.first_name,
-            last_name=friend.last_name,
-            sex=friend.sex,
-            pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-        )
-        for friend in friends
-    ]
-
     pending_friends = get_pending_friendships_to_be_accepted(db, user_id)
-    pending_friend_list = [
-        PersonSimpleDTO(
-            profile_url=friend.profile_url,
-            first_name=friend.first_name,
-            last_name=friend.last_name,
-            sex=friend.sex,
-            pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-        )
-        for friend in pending_friends
-    ]
-
     blocked_friends = get_blocked_friendships(db, user_id)
-    blocked_friend_list = [
-        PersonSimpleDTO(
-            profile_url=friend.profile_url,
-            first_name=friend.first_name,
-            last_name=friend.last_name,
-            sex=friend.sex,
-            pf_path_m=f"{API_URL}/images/medium/{friend.pf_path_m}" if friend.pf_path_m else None,
-        )
-        for friend in blocked_friends
-    ]
-
-    profile_update_dto = MyProfileUpdateListsDTO(
-        friend_list=friend_list,
-        pending_friend_list=pending_friend_list,
-        blocked_friend_list=blocked_friend_list,
-    )
-
-    return jsonify(profile_update_dto.model_dump()), 200
+
+    profile_update_dto = {
+        "friend_list": [person_simple_to_dict(friend) for friend in friends],
+        "pending_friend_list": [person_simple_to_dict(friend) for friend in pending_friends],
+        "blocked_friend_list": [person_simple_to_dict(friend) for friend in blocked_friends],
+    }
+
+    return json_response(profile_update_dto)
 
 
 @profile.route("/<string:profile_url>/moregyma", methods=["POST"])
@@ -212,45 +118,9 @@ def get_five_more_gyma_of_profile(profile_url):
             user_id = user_id_from_session
 
             if user_id == person_by_profile_url.person_id:
-
-                person_simple_dto = PersonSimpleDTO(
-                    profile_url=person_by_profile_url.profile_url,
-                    first_name=person_by_profile_url.first_name,
-                    last_name=person_by_profile_url.last_name,
-                    sex=person_by_profile_url.sex,
-                    pf_path_m=f"{API_URL}/images/medium/{person_by_profile_url.pf_path_m}" if person_by_profile_url.pf_path_m else None,
-                ).model_dump(mode='json')
-
                 five_more_my_gyma = get_last_five_gyma_entry_of_user(db, user_id, gyma_keys)
-
-                gyma_with_exercises = []
-                for gyma in five_more_my_gyma:
-                    exercise_dtos = [
-                        ExerciseDTO(
-                            exercise_id=exercise.exercise.exercise_id,
-                            exercise_name=exercise.exercise.exercise_name,
-                            exercise_type=exercise.exercise.exercise_type,
-                            count=exercise.exercise.count,
-                            sets=exercise.exercise.sets,
-                            weight=exercise.exercise.weight,
-                            minutes=exercise.exercise.minutes,
-                            km=exercise.exercise.km,
-                            level=exercise.exercise.level,
-                            description=exercise.exercise.description,
-                        ).model_dump(mode='json')
-                        for exercise in gyma.exercises
-                    ]
-
-                    gyma_dto = GymaDTO(
-                        gyma_id=gyma.gyma_id,
-                        person=person_simple_dto,
-                        time_of_arrival=gyma.time_of_arrival,
-                        time_of_leaving=gyma.time_of_leaving,
-                        exercises=exercise_dtos
-                    ).model_dump(mode='json')
-
-                    gyma_with_exercises.append(gyma_dto)
-                return gyma_with_exercises, 200
+                gyma_with_exercises = gyma_list_to_dicts(get_gyma_fragments(db, five_more_my_gyma), person_simple_to_dict(person_by_profile_url))
+                return json_response(gyma_with_exercises)
 
 
             friendship = get_friendship(db, user_id, person_by_profile_url.person_id)
@@ -266,44 +136,9 @@ def get_five_more_gyma_of_profile(profile_url):
     if person_by_profile_url.gyma_share == "gymbros" and (user_id is None or friendship_status != "accepted"):
         return detail_response("Profile for friends only", 403)
 
-    person_simple_dto = PersonSimpleDTO(
-        profile_url=person_by_profile_url.profile_url,
-        first_name=person_by_profile_url.first_name,
-        last_name=person_by_profile_url.last_name,
-        sex=person_by_profile_url.sex,
-        pf_path_m=f"{API_URL}/images/medium/{person_by_profile_url.pf_path_m}" if person_by_profile_url.pf_path_m else None,
-    ).model_dump(mode='json')
-
     five_more_gyma = get_last_five_gyma_entry_of_user(db, person_by_profile_url.person_id, gyma_keys)
-
-    gyma_with_exercises = []
-    for gyma in five_more_gyma:
-        exercise_dtos = [
-            ExerciseDTO(
-                exercise_id=exercise.exercise.exercise_id,
-                exercise_name=exercise.exercise.exercise_name,
-                exercise_type=exercise.exercise.exercise_type,
-                count=exercise.exercise.count,
-                sets=exercise.exercise.sets,
-                weight=exercise.exercise.weight,
-                minutes=exercise.exercise.minutes,
-                km=exercise.exercise.km,
-                level=exercise.exercise.level,
-                description=exercise.exercise.description,
-            ).model_dump(mode='json')
-            for exercise in gyma.exercises
-        ]
-
-        gyma_dto = GymaDTO(
-            gyma_id=gyma.gyma_id,
-            person=person_simple_dto,
-            time_of_arrival=gyma.time_of_arrival,
-            time_of_leaving=gyma.time_of_leaving,
-            exercises=exercise_dtos
-        ).model_dump(mode='json')
-
-        gyma_with_exercises.append(gyma_dto)
-    return gyma_with_exercises, 200
+    gyma_with_exercises = gyma_list_to_dicts(get_gyma_fragments(db, five_more_gyma), person_simple_to_dict(person_by_profile_url))
+    return json_response(gyma_with_exercises)
 
 
 @profile.route("/request/<string:profile_url>", methods=["GET"])
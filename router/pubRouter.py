@@ -1,12 +1,14 @@
 import logging
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, Response
 from sqlalchemy.orm import Session
-from typing import List
 
+from cache.pubFeedCache import get_pub_feed, PUB_FEED_CACHE_SECONDS
 from database import get_db
-from dto.exerciseDTO import ExerciseDTO
-from dto.gymaDTO import GymaDTO
+from provider.feedProvider import get_gyma_fragments
 from provider.pubProvider import get_last_ten_gyma_entry
+from util.jsonProvider import dumps_bytes
+from util.response import detail_response, json_response
+from util.serializer import gyma_list_to_dicts
 
 pub = Blueprint('pub', __name__, url_prefix='/api/v1/pub')
 
@@ -16,36 +18,37 @@ def get_pub_ten_latest():
     db: Session = next(get_db())
     gyma_keys = request.headers.get('Gymakeys', None)
 
-    logging.info(f"Searching for the latest ten gyma entries {'excluding: ' + gyma_keys if gyma_keys is not None else ''}")
+    logging.info("Searching for the latest ten gyma entries %s", 'excluding: ' + gyma_keys if gyma_keys is not None else '')
 
-    pub_ten_latest_gyma = get_last_ten_gyma_entry(db, gyma_keys)
+    if gyma_keys is None:
+        return get_pub_ten_latest_shared(db)
 
-    pub_gyma_with_exercises = []
-    for gyma in pub_ten_latest_gyma:
-        exercise_dtos = [
-            ExerciseDTO(
-                exercise_id=exercise.exercise.exercise_id,
-                exercise_name=exercise.exercise.exercise_name,
-                exercise_type=exercise.exercise.exercise_type,
-                count=exercise.exercise.count,
-                sets=exercise.exercise.sets,
-                weight=exercise.exercise.weight,
-                minutes=exercise.exercise.minutes,
-                km=exercise.exercise.km,
-                level=exercise.exercise.level,
-                description=exercise.exercise.description,
-            ).model_dump(mode='json')
-            for exercise in gyma.exercises
-        ]
-
-        gyma_dto = GymaDTO(
-            gyma_id=gyma.gyma_id,
-            person=None,  # Replace with a PersonDTO object if needed
-            time_of_arrival=gyma.time_of_arrival,
-            time_of_leaving=gyma.time_of_leaving,
-            exercises=exercise_dtos
-        ).model_dump(mode='json')
-
-        pub_gyma_with_exercises.append(gyma_dto)
-
-    return jsonify(pub_gyma_with_exercises), 200
+    pub_ten_latest_gyma = get_last_ten_gyma_entry(db, gyma_keys)
+    if pub_ten_latest_gyma is None:
+        return detail_response("Pub feed is unavailable", 503)
+    pub_gyma_with_exercises = gyma_list_to_dicts(get_gyma_fragments(db, pub_ten_latest_gyma))
+
+    response = json_response(pub_gyma_with_exercises)
+    response.vary.add('Gymakeys')
+    return response
+
+
+def get_pub_ten_latest_shared(db: Session) -> Response:
+    """ The feed without excluded gymas is the same for every visitor, it is served from a shared cache.
+    A feed that cannot be read is not cached: the last good feed is served, or 503 without one. """
+    def build_feed() -> bytes | None:
+        pub_ten_latest_gyma = get_last_ten_gyma_entry(db, None)
+        if pub_ten_latest_gyma is None:
+            return None
+        return dumps_bytes(gyma_list_to_dicts(get_gyma_fragments(db, pub_ten_latest_gyma)))
+
+    cached_feed = get_pub_feed(build_feed)
+    if cached_feed is None:
+        return detail_response("Pub feed is unavailable", 503)
+
+    response = Response(cached_feed.body, status=200, mimetype="application/json")
+    response.set_etag(cached_feed.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max(0, int(PUB_FEED_CACHE_SECONDS - cached_feed.age()))
+    response.vary.add('Gymakeys')
+    return response.make_conditional(request)
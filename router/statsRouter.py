@@ -0,0 +1,101 @@
+import logging
+from datetime import datetime
+from flask import Blueprint, request
+from sqlalchemy.orm import Session
+
+from database import get_db
+from provider.authProvider import get_auth_key
+from provider.gymbroProvider import get_friend_ids_of_user
+from service.calendarService import get_calendar_of_user, get_calendar_of_users
+from service.historyService import get_progress_of_exercise, DEFAULT_ROLLING_WINDOW, MAX_ROLLING_WINDOW
+from service.personalRecordService import get_records_of_user, personal_record_to_dict
+from service.statsService import get_stats_of_user
+from session.sessionService import get_user_id_from_session_data
+from util.response import detail_response, json_response
+
+stats = Blueprint('stats', __name__, url_prefix='/api/v1/stats')
+
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 104
+MIN_CALENDAR_YEAR = 2000
+
+@stats.route("", methods=['GET'])
+def get_my_stats():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    weeks = request.args.get("weeks", DEFAULT_WEEKS, type=int)
+    if weeks < 1 or weeks > MAX_WEEKS:
+        return detail_response(f"Weeks must be between 1 and {MAX_WEEKS}", 400)
+
+    logging.info("Get stats of the last %s weeks", weeks)
+    return json_response(get_stats_of_user(db, user_id, weeks))
+
+
+@stats.route("/records", methods=['GET'])
+def get_my_records():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    return json_response([personal_record_to_dict(record) for record in get_records_of_user(db, user_id)])
+
+
+@stats.route("/history", methods=['GET'])
+def get_my_exercise_history():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    exercise_name = request.args.get("exercise_name")
+    if not exercise_name:
+        return detail_response("Exercise name is required", 400)
+
+    window = request.args.get("window", DEFAULT_ROLLING_WINDOW, type=int)
+    if window < 1 or window > MAX_ROLLING_WINDOW:
+        return detail_response(f"Window must be between 1 and {MAX_ROLLING_WINDOW}", 400)
+
+    return json_response(get_progress_of_exercise(db, user_id, exercise_name, window))
+
+
+@stats.route("/calendar", methods=['GET'])
+def get_my_calendar():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    year = request.args.get("year", datetime.now().year, type=int)
+    if year < MIN_CALENDAR_YEAR or year > datetime.now().year:
+        return detail_response("Invalid year", 400)
+
+    return json_response(get_calendar_of_user(db, user_id, year))
+
+
+@stats.route("/calendar/gymbros", methods=['GET'])
+def get_gymbros_calendar():
+    db: Session = next(get_db())
+    auth_token = get_auth_key()
+
+    user_id = get_user_id_from_session_data(auth_token)
+    if user_id is None:
+        return detail_response("Session invalid", 401)
+
+    year = request.args.get("year", datetime.now().year, type=int)
+    if year < MIN_CALENDAR_YEAR or year > datetime.now().year:
+        return detail_response("Invalid year", 400)
+
+    friend_ids = sorted(get_friend_ids_of_user(db, user_id))
+    return json_response(get_calendar_of_users(db, friend_ids, year))
@@ -17,7 +17,7 @@ def register():
     db: Session = next(get_db())
     register_dto = request.json
 
-    logging.info(f"Trying to register user with email: {register_dto['email']}")
+    logging.info("Trying to register user with email: %s", register_dto['email'])
 
     if not email_available(db, register_dto['email']):
         return detail_response("Email is not available", 400)
@@ -0,0 +1,179 @@
+""" Training calendar of a user: per year a bitmap of 366 bits in Redis, bit n is set when the user
+started a gyma on day n + 1 of the year. A missing bitmap is built from the gymas on first read,
+removing gymas drops the bitmap of their year so it is rebuilt.
+
+Every change of the gymas of a year increments a version key next to the bitmap, in the same Redis
+transaction. A bitmap that was built is only stored when the version is still the one read before the
+database query, so a build from a snapshot without a gyma committed in the meantime is not cached. """
+import logging
+import os
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterable, List, Set
+
+from redis import RedisError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from model.Gyma import Gyma
+from session.sessionService import create_binary_redis_connection
+
+CALENDAR_TTL_SECONDS = int(os.getenv("GYMA_CALENDAR_TTL_SECONDS", str(30 * 24 * 3600)))
+BITMAP_BYTES = 46  # 366 days rounded up to whole bytes
+
+
+def calendar_key(user_id: int, year: int) -> str:
+    return f"gyma:calendar:{user_id}:{year}"
+
+
+def calendar_version_key(user_id: int, year: int) -> str:
+    return f"gyma:calendar:version:{user_id}:{year}"
+
+
+def day_offset(moment: date) -> int:
+    """ Bit offset of a day in the bitmap of its year, 0 for the 1st of January. """
+    return moment.timetuple().tm_yday - 1
+
+
+def days_to_bitmap(day_offsets: Iterable[int]) -> bytes:
+    """ Bitmap in the bit order of Redis SETBIT, offset 0 is the most significant bit of the first byte. """
+    bitmap = bytearray(BITMAP_BYTES)
+    for offset in day_offsets:
+        bitmap[offset // 8] |= 0x80 >> (offset % 8)
+    return bytes(bitmap)
+
+
+def bitmap_to_dates(bitmap: bytes, year: int) -> List[date]:
+    first_day = date(year, 1, 1)
+    return [
+        first_day + timedelta(days=byte_index * 8 + bit)
+        for byte_index, byte in enumerate(bitmap) if byte
+        for bit in range(8) if byte & (0x80 >> bit)
+    ]
+
+
+def get_day_offsets_from_db(db: Session, user_ids: List[int], year: int) -> Dict[int, Set[int]]:
+    """ Days with a gyma per user in a year, with one query for all users. """
+    day_offsets = {user_id: set() for user_id in user_ids}
+    result = db.execute(
+        select(Gyma.user_id, Gyma.time_of_arrival)
+        .where(Gyma.user_id.in_(user_ids))
+        .where(Gyma.time_of_arrival >= datetime(year, 1, 1), Gyma.time_of_arrival < datetime(year + 1, 1, 1))
+    )
+    for user_id, time_of_arrival in result.all():
+        day_offsets[user_id].add(day_offset(time_of_arrival))
+    return day_offsets
+
+
+def get_calendar_bitmaps(db: Session, user_ids: List[int], year: int) -> Dict[int, bytes]:
+    """ Bitmaps of several users for a year with one Redis read, missing ones are built and stored.
+    Without Redis the bitmaps are built from the database on every call. """
+    if not user_ids:
+        return {}
+
+    keys = [calendar_key(user_id, year) for user_id in user_ids]
+    version_keys = [calendar_version_key(user_id, year) for user_id in user_ids]
+    redis_connection = create_binary_redis_connection()
+    try:
+        # One read for the bitmaps and the versions they are built at when missing
+        values = redis_connection.mget(keys + version_keys) if redis_connection else [None] * (2 * len(keys))
+    except RedisError as e:
+        logging.error("Error reading calendar bitmaps from Redis: %s", e)
+        redis_connection = None
+        values = [None] * (2 * len(keys))
+    cached_bitmaps, versions = values[:len(keys)], dict(zip(user_ids, values[len(keys):]))
+
+    bitmaps = {user_id: bitmap for user_id, bitmap in zip(user_ids, cached_bitmaps) if bitmap is not None}
+    missing_user_ids = [user_id for user_id in user_ids if user_id not in bitmaps]
+    if not missing_user_ids:
+        return bitmaps
+
+    built_bitmaps = {
+        user_id: days_to_bitmap(day_offsets)
+        for user_id, day_offsets in get_day_offsets_from_db(db, missing_user_ids, year).items()
+    }
+    bitmaps.update(built_bitmaps)
+
+    if redis_connection:
+        try:
+            store_built_bitmaps(redis_connection, year, built_bitmaps, versions)
+        except RedisError as e:
+            logging.error("Error storing calendar bitmaps in Redis: %s", e)
+
+    return bitmaps
+
+
+def store_built_bitmaps(redis_connection, year: int, built_bitmaps: Dict[int, bytes], versions: Dict[int, bytes]):
+    """ Store the bitmaps whose version did not change since they were read, in one transaction. The versions
+    are watched, a change between the check and the write makes redis-py run the check again. """
+    user_ids = list(built_bitmaps)
+    version_keys = [calendar_version_key(user_id, year) for user_id in user_ids]
+
+    def store(pipeline):
+        current_versions = pipeline.mget(version_keys)
+        pipeline.multi()
+        for user_id, current_version in zip(user_ids, current_versions):
+            if current_version == versions[user_id]:
+                # NX: a bitmap stored by another read in the meantime is as recent as this one
+                pipeline.set(calendar_key(user_id, year), built_bitmaps[user_id], ex=CALENDAR_TTL_SECONDS, nx=True)
+
+    redis_connection.transaction(store, *version_keys)
+
+
+def mark_gyma_day(user_id: int, time_of_arrival: datetime):
+    """ Set the day of a new gyma in the bitmap of its year, call after the gyma is committed.
+    Only an existing bitmap is updated, a missing one is built with the new gyma on the next read. The bitmap
+    is watched: SETBIT on a bitmap that expired or was dropped after the check would store a bitmap of only
+    this day, without a TTL. """
+    redis_connection = create_binary_redis_connection()
+    if not redis_connection:
+        return
+
+    key = calendar_key(user_id, time_of_arrival.year)
+    version_key = calendar_version_key(user_id, time_of_arrival.year)
+
+    def mark(pipeline):
+        bitmap_exists = pipeline.exists(key)
+        pipeline.multi()
+        if bitmap_exists:
+            pipeline.setbit(key, day_offset(time_of_arrival), 1)
+        pipeline.incr(version_key)
+        pipeline.expire(version_key, CALENDAR_TTL_SECONDS)
+
+    try:
+        redis_connection.transaction(mark, key)
+    except RedisError as e:
+        logging.error("Error updating calendar bitmap: %s", e)
+
+
+def invalidate_calendar(user_id: int, years: Iterable[int]):
+    """ Drop bitmaps of a user after gymas in those years were removed, they are rebuilt on the next read. """
+    years = set(years)
+    redis_connection = create_binary_redis_connection()
+    if not years or not redis_connection:
+        return
+
+    try:
+        pipeline = redis_connection.pipeline(transaction=True)
+        for year in years:
+            pipeline.delete(calendar_key(user_id, year))
+            pipeline.incr(calendar_version_key(user_id, year))
+            pipeline.expire(calendar_version_key(user_id, year), CALENDAR_TTL_SECONDS)
+        pipeline.execute()
+    except RedisError as e:
+        logging.error("Error invalidating calendar bitmaps: %s", e)
+
+
+def get_calendar_of_user(db: Session, user_id: int, year: int) -> dict:
+    """ Days of a year on which the user went to the gym. """
+    days = bitmap_to_dates(get_calendar_bitmaps(db, [user_id], year)[user_id], year)
+    return {"year": year, "days": days, "total_days": len(days)}
+
+
+def get_calendar_of_users(db: Session, user_ids: List[int], year: int) -> dict:
+    """ Days of a year on which at least one of the users went to the gym, the bitwise OR of their bitmaps. """
+    combined = 0
+    for bitmap in get_calendar_bitmaps(db, user_ids, year).values():
+        combined |= int.from_bytes(bitmap, "big")
+
+    days = bitmap_to_dates(combined.to_bytes(BITMAP_BYTES, "big"), year)
+    return {"year": year, "days": days, "total_days": len(days)}
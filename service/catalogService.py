@@ -0,0 +1,150 @@
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from model.Exercise import Exercise
+from model.ExerciseCatalog import ExerciseCatalog
+from model.Gyma import Gyma
+
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("EXERCISE_CATALOG_CACHE_MAX_ENTRIES", "10000"))
+AUTOCOMPLETE_LIMIT = 10
+BACKFILL_CHUNK_SIZE = 500
+
+_whitespace = re.compile(r"\s+")
+
+# Normalized name -> catalog_id of committed catalog rows, shared by the requests of this worker.
+# Catalog rows are never changed or deleted, so entries do not go stale.
+_catalog_id_cache: Dict[str, int] = {}
+_catalog_id_cache_lock = threading.Lock()
+
+
+def normalize_exercise_name(exercise_name: str) -> str:
+    """ Case and whitespace insensitive form of an exercise name, 'Bench  press ' -> 'bench press'. """
+    return _whitespace.sub(" ", exercise_name).strip().casefold()
+
+
+def cache_catalog_ids(catalog_ids: Dict[str, int]):
+    with _catalog_id_cache_lock:
+        if len(_catalog_id_cache) + len(catalog_ids) > CATALOG_CACHE_MAX_ENTRIES:
+            _catalog_id_cache.clear()
+        _catalog_id_cache.update(catalog_ids)
+
+
+class CatalogNameConflictError(SQLAlchemyError):
+    """ A new catalog name collided with a row that a locking read cannot find either. The callers handle it like
+    any other database error of the transaction. """
+
+
+def find_catalog_ids(db: Session, normalized_names: Iterable[str], locking_read: bool = False) -> Dict[str, int]:
+    """ Catalog ids of existing normalized names, from the cache or else with one query.
+    A locking read skips the cache and sees rows committed after the transaction's snapshot was taken. """
+    catalog_ids = {}
+    missing_names = []
+    for normalized_name in set(normalized_names):
+        catalog_id = None if locking_read else _catalog_id_cache.get(normalized_name)
+        if catalog_id is None:
+            missing_names.append(normalized_name)
+        else:
+            catalog_ids[normalized_name] = catalog_id
+
+    if missing_names:
+        query = (
+            select(ExerciseCatalog.normalized_name, ExerciseCatalog.catalog_id)
+            .where(ExerciseCatalog.normalized_name.in_(missing_names))
+        )
+        if locking_read:
+            query = query.with_for_update(read=True)
+        found_catalog_ids = dict(db.execute(query).tuples().all())
+        cache_catalog_ids(found_catalog_ids)
+        catalog_ids.update(found_catalog_ids)
+
+    return catalog_ids
+
+
+def get_catalog_ids(db: Session, exercise_names: Iterable[str]) -> Dict[str, int]:
+    """ Catalog id per exercise name, adds catalog rows for new names without committing.
+    New rows are only cached after a later request found them committed, so a rollback cannot leave
+    a catalog_id in the cache that does not exist. """
+    normalized_names = {exercise_name: normalize_exercise_name(exercise_name) for exercise_name in exercise_names}
+    catalog_ids = find_catalog_ids(db, normalized_names.values())
+
+    for exercise_name, normalized_name in normalized_names.items():
+        if normalized_name in catalog_ids:
+            continue
+
+        try:
+            # Savepoint, a concurrent request can add the same name first
+            with db.begin_nested():
+                new_catalog = ExerciseCatalog(normalized_name=normalized_name,
+                                              display_name=_whitespace.sub(" ", exercise_name).strip())
+                db.add(new_catalog)
+            catalog_ids[normalized_name] = new_catalog.catalog_id
+        except IntegrityError:
+            # The row of the other request is committed, but not in the REPEATABLE READ snapshot of this
+            # transaction, a plain select would not see it
+            catalog_ids.update(find_catalog_ids(db, [normalized_name], locking_read=True))
+            if normalized_name not in catalog_ids:
+                raise CatalogNameConflictError(f"Catalog name {normalized_name!r} exists but cannot be read")
+
+    return {exercise_name: catalog_ids[normalized_name] for exercise_name, normalized_name in normalized_names.items()}
+
+
+def get_catalog_id_by_name(db: Session, exercise_name: str) -> int | None:
+    """ Catalog id of an exercise name without adding it, None when the name was never logged. """
+    normalized_name = normalize_exercise_name(exercise_name)
+    return find_catalog_ids(db, [normalized_name]).get(normalized_name)
+
+
+def autocomplete_exercise_names(db: Session, user_id: int, prefix: str) -> List[str]:
+    """ Names of exercises the user logged before that start with the prefix, ignoring case. """
+    normalized_prefix = normalize_exercise_name(prefix)
+    if not normalized_prefix:
+        return []
+
+    result = db.execute(
+        select(ExerciseCatalog.display_name)
+        .where(ExerciseCatalog.normalized_name.startswith(normalized_prefix, autoescape=True))
+        .where(
+            select(Exercise.exercise_id)
+            .join(Gyma, Gyma.gyma_id == Exercise.gyma_id)
+            .where(Exercise.catalog_id == ExerciseCatalog.catalog_id, Gyma.user_id == user_id)
+            .exists()
+        )
+        .order_by(ExerciseCatalog.normalized_name)
+        .limit(AUTOCOMPLETE_LIMIT)
+    )
+    return list(result.scalars().all())
+
+
+def backfill_catalog_ids(db: Session) -> int | None:
+    """ Set catalog_id of exercises stored before the catalog existed, commits per chunk of names.
+    Returns the number of updated exercises. """
+    try:
+        exercise_names = list(db.scalars(
+            select(Exercise.exercise_name).where(Exercise.catalog_id.is_(None)).distinct()
+        ).all())
+
+        updated_exercises = 0
+        for start in range(0, len(exercise_names), BACKFILL_CHUNK_SIZE):
+            catalog_ids = get_catalog_ids(db, exercise_names[start:start + BACKFILL_CHUNK_SIZE])
+            result = db.connection().execute(
+                update(Exercise.__table__)
+                .where(Exercise.__table__.c.catalog_id.is_(None),
+                       Exercise.__table__.c.exercise_name == bindparam("name"))
+                .values(catalog_id=bindparam("id")),
+                [{"name": exercise_name, "id": catalog_id} for exercise_name, catalog_id in catalog_ids.items()]
+            )
+            updated_exercises += result.rowcount
+            db.commit()
+
+        return updated_exercises
+    except SQLAlchemyError as e:
+        logging.error("Error backfilling exercise catalog ids: %s", e)
+        db.rollback()
+        return None
@@ -1,16 +1,21 @@
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Dict
 
 from flask import abort
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.exc import NoResultFound, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from cache.fragmentCache import invalidate_gyma_fragment
+from cache.pubFeedCache import invalidate_pub_feed
 from database import get_db
 from dto.exerciseDTO import ExerciseDTO
 from model.Exercise import Exercise
-from model.GymaExercise import GymaExercise
+from model.Gyma import Gyma
+from service.catalogService import get_catalog_ids
+from service.personalRecordService import add_exercises_to_records, recompute_records
+from service.statsService import add_exercises_to_stats
 
 
 def get_exercise_by_exercise_id(db: Session, exercise_id: int) -> Exercise | None:
@@ -26,80 +31,148 @@ def get_exercise_by_exercise_id(db: Session, exercise_id: int) -> Exercise | Non
 def get_exercises_by_gyma_id(db: Session, gyma_id: int) -> List[Exercise] | None:
     """ Get list of Exercise objects by gyma id from database. """
     try:
-        result = db.execute(select(Exercise).filter_by(gyma_id=gyma_id))
+        result = db.execute(select(Exercise).filter_by(gyma_id=gyma_id).order_by(Exercise.exercise_id))
         exercises = result.scalars().all()
         return list(exercises)
     except NoResultFound:
         return None
 
 
-def add_exercise_db(db: Session, gyma_id: int, exercise_dto: ExerciseDTO) -> int | None:
-    """ Add a new exercise to a Gyma and create a record in GymaExercise table. """
+def get_exercises_of_gymas(db: Session, gyma_ids: List[int]) -> Dict[int, List[Exercise]]:
+    """ Get the exercises of several gymas in one query, grouped by gyma id. """
+    exercises_by_gyma_id = {gyma_id: [] for gyma_id in gyma_ids}
+    if not gyma_ids:
+        return exercises_by_gyma_id
+
+    result = db.execute(
+        select(Exercise)
+        .where(Exercise.gyma_id.in_(gyma_ids))
+        .order_by(Exercise.exercise_id)
+    )
+    for exercise in result.scalars().all():
+        exercises_by_gyma_id[exercise.gyma_id].append(exercise)
+
+    return exercises_by_gyma_id
+
+
+def exercise_values(gyma_id: int, exercise_dto: ExerciseDTO, created_at: datetime, catalog_id: int) -> dict:
+    """ Column values of a new Exercise row from its DTO. """
+    return {
+        "gyma_id": gyma_id,
+        "exercise_name": exercise_dto.exercise_name,
+        "catalog_id": catalog_id,
+        "exercise_type": exercise_dto.exercise_type,
+        "count": exercise_dto.count,
+        "sets": exercise_dto.sets,
+        "weight": exercise_dto.weight,
+        "minutes": exercise_dto.minutes,
+        "km": exercise_dto.km,
+        "level": exercise_dto.level,
+        "description": exercise_dto.description,
+        "created_at": created_at,
+    }
+
+
+def add_exercise_db(db: Session, gyma_id: int, exercise_dto: ExerciseDTO) -> tuple[int, List[str]] | None:
+    """ Add a new exercise to a Gyma, returns its id and the personal records it beat. """
     try:
-        new_exercise = Exercise(
-            exercise_name=exercise_dto.exercise_name,
-            exercise_type=exercise_dto.exercise_type,
-            count=exercise_dto.count,
-            sets=exercise_dto.sets,
-            weight=exercise_dto.weight,
-            minutes=exercise_dto.minutes,
-            km=exercise_dto.km,
-            level=exercise_dto.level,
-            description=exercise_dto.description,
-            created_at=datetime.now()
-        )
+        gyma = db.get(Gyma, gyma_id)
+        if gyma is None:
+            logging.error("Gyma cannot be found")
+            return None
+
+        catalog_id = get_catalog_ids(db, [exercise_dto.exercise_name])[exercise_dto.exercise_name]
+        new_exercise = Exercise(**exercise_values(gyma_id, exercise_dto, datetime.now(), catalog_id))
         db.add(new_exercise)
+        # Flush for the generated id, reading it after the commit would load the expired exercise again
+        db.flush()
+        new_exercise_id = new_exercise.exercise_id
+        add_exercises_to_stats(db, gyma, [exercise_dto])
+        new_records = add_exercises_to_records(db, gyma.user_id, [exercise_dto], [catalog_id])[0]
         db.commit()
-        db.refresh(new_exercise)
 
-        gyma_exercise = GymaExercise(gyma_id=gyma_id, exercise_id=new_exercise.exercise_id)
-        db.add(gyma_exercise)
-        db.commit()
+        invalidate_gyma_fragment(gyma_id)
+        return new_exercise_id, new_records
+    except SQLAlchemyError as e:
+        logging.error("Error adding exercise to gyma: %s", e)
+        db.rollback()
+        return None
 
-        if gyma_exercise and new_exercise:
-            return new_exercise.exercise_id
 
-        return None
+def insert_exercises(db: Session, gyma_id: int, exercise_dtos: List[ExerciseDTO]) -> List[int]:
+    """ Insert exercises of a Gyma without committing, returns the new exercise ids in the given order.
+    The caller commits, so the inserts can be part of a larger transaction. """
+    if not exercise_dtos:
+        return []
+
+    created_at = datetime.now()
+    catalog_ids = get_catalog_ids(db, (exercise_dto.exercise_name for exercise_dto in exercise_dtos))
+    exercise_rows = [
+        exercise_values(gyma_id, exercise_dto, created_at, catalog_ids[exercise_dto.exercise_name])
+        for exercise_dto in exercise_dtos
+    ]
+    gyma = db.get(Gyma, gyma_id)
+    add_exercises_to_stats(db, gyma, exercise_dtos)
+    add_exercises_to_records(db, gyma.user_id, exercise_dtos,
+                             [exercise_row["catalog_id"] for exercise_row in exercise_rows])
+
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        return list(db.scalars(
+            insert(Exercise).returning(Exercise.exercise_id, sort_by_parameter_order=True),
+            exercise_rows
+        ).all())
+
+    # MySQL has no INSERT .. RETURNING, the ORM flush fetches the generated ids inside the same transaction
+    new_exercises = [Exercise(**exercise_row) for exercise_row in exercise_rows]
+    db.add_all(new_exercises)
+    db.flush()
+    return [new_exercise.exercise_id for new_exercise in new_exercises]
+
+
+def add_exercises_db(db: Session, gyma_id: int, exercise_dtos: List[ExerciseDTO]) -> List[int] | None:
+    """ Add several exercises to a Gyma in one transaction, returns the new exercise ids in the given order. """
+    try:
+        if db.get(Gyma, gyma_id) is None:
+            logging.error("Gyma cannot be found")
+            return None
+
+        exercise_ids = insert_exercises(db, gyma_id, exercise_dtos)
+        db.commit()
+
+        invalidate_gyma_fragment(gyma_id)
+        return exercise_ids
     except SQLAlchemyError as e:
-        logging.error(f"Error adding exercise to gyma: {e}")
+        logging.error("Error adding exercises to gyma: %s", e)
         db.rollback()
         return None
 
 
 def remove_exercise_by_gyma_and_id(db: Session, gyma_id: int, exercise_id: int) -> bool:
-    """ Remove an Exercise and its related GymaExercise from the database based on gyma_id and exercise details. """
+    """ Remove an Exercise from the database based on gyma_id and exercise_id. """
     try:
-        exercise_query = (
-            select(Exercise)
-            .join(GymaExercise, GymaExercise.exercise_id == Exercise.exercise_id)
-            .filter(GymaExercise.gyma_id == gyma_id)
-            .filter(Exercise.exercise_id == exercise_id)
-        )
-
-        exercise = db.execute(exercise_query).scalar_one_or_none()
+        exercise = db.execute(
+            select(Exercise).where(Exercise.gyma_id == gyma_id, Exercise.exercise_id == exercise_id)
+        ).scalar_one_or_none()
 
         if exercise is None:
             logging.error("Exercise not found")
             return False
 
-        gyma_exercise_query = (
-            select(GymaExercise)
-            .filter(GymaExercise.gyma_id == gyma_id, GymaExercise.exercise_id == exercise.exercise_id)
-        )
-
-        gyma_exercise = db.execute(gyma_exercise_query).scalar_one_or_none()
-
-        db.delete(gyma_exercise)
+        gyma = db.get(Gyma, gyma_id)
+        add_exercises_to_stats(db, gyma, [exercise], sign=-1)
         db.delete(exercise)
-
+        db.flush()
+        recompute_records(db, gyma.user_id, [exercise.catalog_id] if exercise.catalog_id is not None else [])
         db.commit()
+        invalidate_gyma_fragment(gyma_id)
+        invalidate_pub_feed()
         return True
 
     except SQLAlchemyError as e:
-        logging.error(f"Error removing exercise and its related gyma_exercise: {e}")
+        logging.error("Error removing exercise: %s", e)
         db.rollback()
         return False
     except Exception as e:
-        logging.error(f"Exception: Error removing exercise: {e}")
+        logging.error("Exception: Error removing exercise: %s", e)
         db.rollback()
         return False
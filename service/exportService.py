@@ -0,0 +1,77 @@
+""" Full account export of gymas and exercises, streamed from a server-side cursor.
+Memory stays bounded by one chunk of EXPORT_CHUNK_ROWS rows, whatever the size of the account. """
+import csv
+import io
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from model.Exercise import Exercise
+from model.Gyma import Gyma
+from util.jsonProvider import dumps_bytes
+
+EXPORT_CHUNK_ROWS = 1000
+
+GYMA_COLUMNS = ["gyma_id", "time_of_arrival", "time_of_leaving"]
+EXERCISE_COLUMNS = ["exercise_id", "exercise_name", "exercise_type", "count", "sets", "weight", "minutes", "km",
+                    "level", "description"]
+
+
+def stream_export_rows(db: Session, user_id: int) -> Iterator[list]:
+    """ Yield chunks of rows of all gymas of a user joined with their exercises, ordered by gyma.
+    A gyma without exercises is one row with the exercise columns set to None. """
+    query = (
+        select(*(getattr(Gyma, column) for column in GYMA_COLUMNS),
+               *(getattr(Exercise, column) for column in EXERCISE_COLUMNS))
+        .outerjoin(Exercise, Exercise.gyma_id == Gyma.gyma_id)
+        .where(Gyma.user_id == user_id)
+        .order_by(Gyma.time_of_arrival, Gyma.gyma_id, Exercise.exercise_id)
+        .execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+    )
+
+    for partition in db.execute(query).partitions():
+        yield partition
+
+
+def stream_export_ndjson(db: Session, user_id: int) -> Iterator[bytes]:
+    """ One JSON object per gyma per line, with its exercises nested like GymaDTO (without the person). """
+    gyma_column_count = len(GYMA_COLUMNS)
+    current_gyma = None
+
+    for partition in stream_export_rows(db, user_id):
+        lines = []
+        for row in partition:
+            if current_gyma is None or current_gyma["gyma_id"] != row[0]:
+                if current_gyma is not None:
+                    lines.append(dumps_bytes(current_gyma))
+                current_gyma = dict(zip(GYMA_COLUMNS, row[:gyma_column_count]))
+                current_gyma["exercises"] = []
+
+            if row.exercise_id is not None:
+                current_gyma["exercises"].append(dict(zip(EXERCISE_COLUMNS, row[gyma_column_count:])))
+
+        # The last gyma of a chunk can continue in the next chunk, it is written once it is complete
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    if current_gyma is not None:
+        yield dumps_bytes(current_gyma) + b"\n"
+
+
+def stream_export_csv(db: Session, user_id: int) -> Iterator[bytes]:
+    """ One CSV row per exercise with the columns of its gyma, after a header row. """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(GYMA_COLUMNS + EXERCISE_COLUMNS)
+    for partition in stream_export_rows(db, user_id):
+        writer.writerows(
+            [value.isoformat() if hasattr(value, "isoformat") else value for value in row] for row in partition
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -2,7 +2,7 @@ import logging
 from datetime import date
 
 from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import joinedload, Session
+from sqlalchemy.orm import Session
 
 from model.Friendship import Friendship
 from model.Person import Person
@@ -19,7 +19,7 @@ def get_friends_by_person_id(db: Session, person_id: int) -> list[Person]:
                 ),
                 Person.person_id != person_id
             )
-        ).options(joinedload(Person.friends)).distinct()
+        ).distinct()
     )
     return list(result.scalars().unique().all())
 
@@ -31,7 +31,7 @@ def get_friendship(db: Session, person_id: int, friend_id: int) -> Friendship |
             logging.error("Cannot have friendship connection with oneself")
             return None
 
-        logging.info(f"Getting friendship for {person_id} and {friend_id}")
+        logging.info("Getting friendship for %s and %s", person_id, friend_id)
         result = db.execute(
             select(Friendship).where(
                 or_(
@@ -43,7 +43,7 @@ def get_friendship(db: Session, person_id: int, friend_id: int) -> Friendship |
         friendship = result.scalar_one_or_none()
         return friendship
     except Exception as e:
-        logging.error(f"Failed to get friendship: {e}")
+        logging.error("Failed to get friendship: %s", e)
         return None
 
 
@@ -58,7 +58,7 @@ def get_friendship_of_requester(db: Session, person_id: int, friend_id: int) ->
         friendship = result.scalar_one_or_none()
         return friendship
     except Exception as e:
-        logging.error(f"Failed to get friendship of requester: {e}")
+        logging.error("Failed to get friendship of requester: %s", e)
         return None
 
 
@@ -77,7 +77,7 @@ def add_friendship(db: Session, person_id: int, friend_id: int) -> bool:
         return True
     except Exception as e:
         db.rollback()
-        logging.error(f"Failed to add friendship: {e}")
+        logging.error("Failed to add friendship: %s", e)
         return False
 
 
@@ -89,7 +89,7 @@ def update_friendship_status(db: Session, friendship: Friendship, status: str) -
         return True
     except Exception as e:
         db.rollback()
-        logging.error(f"Failed to update friendship status: {e}")
+        logging.error("Failed to update friendship status: %s", e)
         return False
 
 def block_friendship(db: Session, friendship: Friendship, person_id: int) -> bool:
@@ -103,7 +103,7 @@ def block_friendship(db: Session, friendship: Friendship, person_id: int) -> boo
         return True
     except Exception as e:
         db.rollback()
-        logging.error(f"Error blocking friendship: {e}")
+        logging.error("Error blocking friendship: %s", e)
         return False
 
 
@@ -115,7 +115,7 @@ def remove_friendship(db: Session, friendship: Friendship) -> bool:
         return True
     except Exception as e:
         db.rollback()
-        logging.error(f"Failed to remove friendship: {e}")
+        logging.error("Failed to remove friendship: %s", e)
         return False
 
 
@@ -127,7 +127,7 @@ def get_pending_friendships_to_be_accepted(db: Session, person_id: int) -> list[
                 Friendship.friend_id == person_id,
                 Friendship.status == 'pending'
             )
-        ).options(joinedload(Person.friends)).distinct()
+        ).distinct()
     )
     return list(result.scalars().unique().all())
 
@@ -141,6 +141,6 @@ def get_blocked_friendships(db: Session, person_id: int) -> list[Person]:
                 Friendship.status == 'blocked',
                 Person.person_id != person_id
             ),
-        ).options(joinedload(Person.friends)).distinct()
+        ).distinct()
     )
     return list(result.scalars().unique().all())
@@ -2,12 +2,22 @@ import logging
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import select, desc
-from sqlalchemy.exc import NoResultFound, SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
-
+from sqlalchemy import select, desc, delete, update
+from sqlalchemy.exc import NoResultFound, SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import Session
+
+from cache.fragmentCache import invalidate_gyma_fragment
+from cache.pubFeedCache import invalidate_pub_feed
+from dto.gymaDTO import GymaSyncDTO
+from model.Exercise import Exercise
 from model.Gyma import Gyma
-from model.GymaExercise import GymaExercise
+from model.GymaSync import GymaSync
+from service.calendarService import mark_gyma_day, invalidate_calendar
+from service.exerciseService import insert_exercises
+from service.personalRecordService import get_record_catalog_ids_of_gymas, recompute_records
+from service.statsService import add_session_to_stats, remove_gymas_from_stats
+
+DELETE_CHUNK_SIZE = 1000
 
 
 def get_gyma_by_gyma_id(db: Session, gyma_id: int) -> Optional[Gyma]:
@@ -19,7 +29,7 @@ def get_gyma_by_gyma_id(db: Session, gyma_id: int) -> Optional[Gyma]:
     except NoResultFound:
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching gyma by ID: {e}")
+        logging.error("Error fetching gyma by ID: %s", e)
         return None
 
 
@@ -33,9 +43,64 @@ def add_gyma(db: Session, user_id: int) -> Optional[Gyma]:
         db.add(new_gyma)
         db.commit()
         db.refresh(new_gyma)
+        mark_gyma_day(user_id, new_gyma.time_of_arrival)
         return new_gyma
     except SQLAlchemyError as e:
-        logging.error(f"Error adding gyma: {e}")
+        logging.error("Error adding gyma: %s", e)
+        db.rollback()
+        return None
+
+
+def get_gyma_sync_by_idempotency_key(db: Session, user_id: int, idempotency_key: str) -> Optional[GymaSync]:
+    """ Get the GymaSync of an earlier sync with the same idempotency key, its gyma_id is None when the gyma
+    was deleted since. """
+    try:
+        result = db.execute(
+            select(GymaSync).where(GymaSync.user_id == user_id, GymaSync.idempotency_key == idempotency_key)
+        )
+        return result.scalar_one_or_none()
+    except SQLAlchemyError as e:
+        logging.error("Error fetching gyma sync by idempotency key: %s", e)
+        return None
+
+
+def gyma_of_sync(db: Session, gyma_sync: GymaSync) -> Optional[Gyma]:
+    """ The Gyma stored by a sync, None when it was deleted. """
+    return db.get(Gyma, gyma_sync.gyma_id) if gyma_sync.gyma_id is not None else None
+
+
+def sync_gyma(db: Session, user_id: int, gyma_sync_dto: GymaSyncDTO) -> Optional[tuple[Optional[Gyma], bool]]:
+    """ Store a whole gyma session with its exercises in one transaction, returns the Gyma and whether it was
+    created. A retry with the same idempotency key returns the Gyma stored the first time and False, or None
+    and False when that gyma was deleted since: the sync is handled, the gyma is not stored again. """
+    existing_sync = get_gyma_sync_by_idempotency_key(db, user_id, gyma_sync_dto.idempotency_key)
+    if existing_sync is not None:
+        return gyma_of_sync(db, existing_sync), False
+
+    try:
+        new_gyma = Gyma(
+            user_id=user_id,
+            time_of_arrival=gyma_sync_dto.time_of_arrival,
+            time_of_leaving=gyma_sync_dto.time_of_leaving
+        )
+        db.add(new_gyma)
+        db.flush()
+
+        insert_exercises(db, new_gyma.gyma_id, gyma_sync_dto.exercises)
+        add_session_to_stats(db, new_gyma)
+        db.add(GymaSync(user_id=user_id, idempotency_key=gyma_sync_dto.idempotency_key, gyma_id=new_gyma.gyma_id))
+        db.commit()
+
+        mark_gyma_day(user_id, gyma_sync_dto.time_of_arrival)
+        invalidate_pub_feed()
+        return new_gyma, True
+    except IntegrityError:
+        # A concurrent retry stored the same idempotency key first
+        db.rollback()
+        existing_sync = get_gyma_sync_by_idempotency_key(db, user_id, gyma_sync_dto.idempotency_key)
+        return (gyma_of_sync(db, existing_sync), False) if existing_sync is not None else None
+    except SQLAlchemyError as e:
+        logging.error("Error syncing gyma: %s", e)
         db.rollback()
         return None
 
@@ -56,25 +121,27 @@ def set_time_of_leaving(db: Session, user_id: int, gyma: Gyma) -> Optional[datet
             return None
 
         gyma.time_of_leaving = datetime.now()
+        add_session_to_stats(db, gyma)
         db.commit()
         db.refresh(gyma)
+        invalidate_pub_feed()
         return gyma.time_of_leaving
 
     except SQLAlchemyError as e:
-        logging.error(f"Error setting time of leaving: {e}")
+        logging.error("Error setting time of leaving: %s", e)
         db.rollback()
         return None
 
 
 def get_last_five_gyma_entry_of_user(db: Session, user_id: int, gyma_keys: str = None) -> List[Gyma]:
-    """ Get last three gyma entries of a user by time_of_leaving, include associated exercises. """
+    """ Get last three gyma entries of a user by time_of_leaving, exercises are not loaded,
+    see provider.feedProvider.get_gyma_fragments. """
 
     try:
         gyma_keys_to_exclude = gyma_keys.split(",") if gyma_keys else []
 
         query = (
             select(Gyma)
-            .options(joinedload(Gyma.exercises).joinedload(GymaExercise.exercise))
             .order_by(desc(Gyma.time_of_leaving))
             .limit(5)
             .where(Gyma.user_id == user_id)
@@ -83,39 +150,78 @@ def get_last_five_gyma_entry_of_user(db: Session, user_id: int, gyma_keys: str =
         )
 
         result = db.execute(query)
-        three_latest_gyma = result.scalars().unique().all()
+        three_latest_gyma = result.scalars().all()
 
         return list(three_latest_gyma)
 
     except Exception as e:
-        logging.error(f"Error fetching gyma entries: {e}")
+        logging.error("Error fetching gyma entries: %s", e)
         return []
 
 
 def remove_gyma_and_exercises(db: Session, gyma: Gyma) -> bool:
-    """ Remove a Gyma and all its associated exercises from the database. """
+    """ Remove a Gyma and all its associated exercises from the database, with one DELETE per table. """
     try:
         if gyma is None:
             logging.error("Gyma object is None")
             return False
 
-        gyma_exercises = db.execute(select(GymaExercise).filter_by(gyma_id=gyma.gyma_id)).scalars().all()
-        for gyma_exercise in gyma_exercises:
-            db.delete(gyma_exercise)
-
-        for exercise in gyma.exercises:
-            db.delete(exercise)
-
-        db.delete(gyma)
-
+        gyma_id, user_id, year = gyma.gyma_id, gyma.user_id, gyma.time_of_arrival.year
+        delete_gymas_with_exercises(db, [gyma_id])
         db.commit()
+        db.expunge(gyma)
+
+        invalidate_gyma_fragment(gyma_id)
+        invalidate_calendar(user_id, [year])
+        invalidate_pub_feed()
         return True
 
     except SQLAlchemyError as e:
-        logging.error(f"Error removing gyma and its exercises: {e}")
+        logging.error("Error removing gyma and its exercises: %s", e)
         db.rollback()
         return False
     except Exception as e:
-        logging.error(f"Exception: Error remove gyma and its exercises: {e}")
+        logging.error("Exception: Error remove gyma and its exercises: %s", e)
+        db.rollback()
+        return False
+
+
+def remove_all_gymas_of_user(db: Session, user_id: int) -> int | None:
+    """ Remove all gymas of a user with their exercises, returns the number of removed gymas. """
+    try:
+        gymas = db.execute(select(Gyma.gyma_id, Gyma.time_of_arrival).where(Gyma.user_id == user_id)).all()
+        gyma_ids = [gyma_id for gyma_id, _ in gymas]
+
+        for start in range(0, len(gyma_ids), DELETE_CHUNK_SIZE):
+            delete_gymas_with_exercises(db, gyma_ids[start:start + DELETE_CHUNK_SIZE])
+        db.commit()
+
+        for gyma_id in gyma_ids:
+            invalidate_gyma_fragment(gyma_id)
+        invalidate_calendar(user_id, (time_of_arrival.year for _, time_of_arrival in gymas))
+        invalidate_pub_feed()
+        return len(gyma_ids)
+
+    except SQLAlchemyError as e:
+        logging.error("Error removing all gymas of user: %s", e)
         db.rollback()
-        return False
\ No newline at end of file
+        return None
+
+
+def delete_gymas_with_exercises(db: Session, gyma_ids: List[int]):
+    """ Set-based delete of gymas, their exercises and the rows referring to them, without committing. """
+    if not gyma_ids:
+        return
+
+    remove_gymas_from_stats(db, gyma_ids)
+    record_catalog_ids_by_user_id = get_record_catalog_ids_of_gymas(db, gyma_ids)
+
+    no_sync = {"synchronize_session": False}
+    db.execute(delete(Exercise).where(Exercise.gyma_id.in_(gyma_ids)), execution_options=no_sync)
+    # The idempotency keys stay, a retried sync of a deleted gyma must not store it again
+    db.execute(update(GymaSync).where(GymaSync.gyma_id.in_(gyma_ids)).values(gyma_id=None),
+               execution_options=no_sync)
+    db.execute(delete(Gyma).where(Gyma.gyma_id.in_(gyma_ids)), execution_options=no_sync)
+
+    for user_id, catalog_ids in record_catalog_ids_by_user_id.items():
+        recompute_records(db, user_id, catalog_ids)
@@ -0,0 +1,78 @@
+""" Exercise history of a user as columnar NumPy arrays, for progress charts. """
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from model.Exercise import Exercise
+from model.Gyma import Gyma
+from service.catalogService import get_catalog_id_by_name
+
+HISTORY_CHUNK_ROWS = 2000
+DEFAULT_ROLLING_WINDOW = 5
+MAX_ROLLING_WINDOW = 100
+
+
+def get_exercise_history(db: Session, user_id: int, catalog_id: int | None) -> Dict[str, np.ndarray]:
+    """ All logged sets of one catalog exercise of a user, oldest first, as one array per column.
+    The rows are streamed in chunks of HISTORY_CHUNK_ROWS and appended to plain lists,
+    missing values become NaN in the float arrays. """
+    query = (
+        select(Gyma.time_of_arrival, Exercise.weight, Exercise.sets, Exercise.count)
+        .join(Gyma, Gyma.gyma_id == Exercise.gyma_id)
+        .where(Gyma.user_id == user_id, Exercise.catalog_id == catalog_id)
+        .order_by(Gyma.time_of_arrival, Exercise.exercise_id)
+        .execution_options(yield_per=HISTORY_CHUNK_ROWS)
+    )
+
+    timestamps, weights, sets, counts = [], [], [], []
+    partitions = db.execute(query).partitions() if catalog_id is not None else []
+    for partition in partitions:
+        for time_of_arrival, weight, exercise_sets, count in partition:
+            timestamps.append(time_of_arrival)
+            weights.append(weight)
+            sets.append(exercise_sets)
+            counts.append(count)
+
+    return {
+        # Seconds since the epoch of the stored (local) time of arrival
+        "timestamps": np.array(timestamps, dtype="datetime64[s]").astype(np.int64),
+        "weight": np.array(weights, dtype=np.float64),
+        "sets": np.array(sets, dtype=np.float64),
+        "count": np.array(counts, dtype=np.float64),
+    }
+
+
+def estimated_one_rep_max(weight: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """ Epley formula, weight x (1 + count / 30), a single repetition is the one rep max itself. """
+    return np.where(count == 1, weight, weight * (1 + count / 30))
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """ Mean of the last window values at each position, NaN values are left out of the mean.
+    Positions without any value in their window are NaN. """
+    present = ~np.isnan(values)
+    value_sums = np.cumsum(np.where(present, values, 0.0))
+    value_counts = np.cumsum(present)
+
+    value_sums[window:] = value_sums[window:] - value_sums[:-window]
+    value_counts[window:] = value_counts[window:] - value_counts[:-window]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(value_counts > 0, value_sums / value_counts, np.nan)
+
+
+def get_progress_of_exercise(db: Session, user_id: int, exercise_name: str, window: int) -> dict:
+    """ Exercise history with the estimated one rep max and its rolling mean over the last window sets.
+    The exercise name is matched through the catalog, so differences in case and spacing are ignored. """
+    history = get_exercise_history(db, user_id, get_catalog_id_by_name(db, exercise_name))
+    one_rep_max = estimated_one_rep_max(history["weight"], history["count"])
+
+    return {
+        "exercise_name": exercise_name,
+        "window": window,
+        **history,
+        "estimated_1rm": np.round(one_rep_max, 2),
+        "rolling_1rm": np.round(rolling_mean(one_rep_max, window), 2),
+    }
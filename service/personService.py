@@ -1,4 +1,5 @@
 import logging
+from typing import Dict, Iterable
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import NoResultFound, SQLAlchemyError
@@ -16,13 +17,27 @@ def get_person_by_user_id(db: Session, user_id: int) -> Person | None:
     except NoResultFound:
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching person by user_id: {e}")
+        logging.error("Error fetching person by user_id: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error fetching person by user_id: {e}")
+        logging.error("Exception: Error fetching person by user_id: %s", e)
         return None
 
 
+def get_persons_by_user_ids(db: Session, user_ids: Iterable[int]) -> Dict[int, Person]:
+    """ Get Person objects of several users in one query, by user id. """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+
+    try:
+        result = db.execute(select(Person).where(Person.person_id.in_(user_ids)))
+        return {person.person_id: person for person in result.scalars().all()}
+    except SQLAlchemyError as e:
+        logging.error("Error fetching persons by user_ids: %s", e)
+        return {}
+
+
 def get_person_by_profile_url(db: Session, profile_url: str) -> Person | None:
     """ Get Person object by profile url. """
     try:
@@ -32,10 +47,10 @@ def get_person_by_profile_url(db: Session, profile_url: str) -> Person | None:
     except NoResultFound:
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching person by profile_url: {e}")
+        logging.error("Error fetching person by profile_url: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error fetching person by profile_url: {e}")
+        logging.error("Exception: Error fetching person by profile_url: %s", e)
         return None
 
 
@@ -65,11 +80,11 @@ def add_person(db: Session, user_id: int, enter_person_dto: EnterPersonDTO) -> P
         return new_person
     except SQLAlchemyError as e:
         db.rollback()
-        logging.error(f"Error adding person: {e}")
+        logging.error("Error adding person: %s", e)
         return None
     except Exception as e:
         db.rollback()
-        logging.error(f"Exception: Error adding person: {e}")
+        logging.error("Exception: Error adding person: %s", e)
         return None
 
 
@@ -91,11 +106,11 @@ def edit_person(db: Session, user_id: int, person: Person, enter_person_dto: Ent
         return person
     except SQLAlchemyError as e:
         db.rollback()
-        logging.error(f"Failed to update person: {e}")
+        logging.error("Failed to update person: %s", e)
         return None
     except Exception as e:
         db.rollback()
-        logging.error(f"Exception: Failed to update person: {e}")
+        logging.error("Exception: Failed to update person: %s", e)
         return None
 
 
@@ -110,11 +125,11 @@ def set_pf_paths(db: Session, person: Person, pf_path_l: str, pf_path_m: str) ->
         return person
     except SQLAlchemyError as e:
         db.rollback()
-        logging.error(f"Failed to set or change pf_paths: {e}")
+        logging.error("Failed to set or change pf_paths: %s", e)
         return None
     except Exception as e:
         db.rollback()
-        logging.error(f"Exception: Failed to set or change pf_paths: {e}")
+        logging.error("Exception: Failed to set or change pf_paths: %s", e)
         return None
 
 
@@ -144,9 +159,9 @@ def check_profile_url_available(db: Session, profile_url: str) -> bool:
         return not bool(result.scalar_one_or_none())
     except SQLAlchemyError as e:
         db.rollback()
-        logging.error(f"Error checking profile URL availability: {e}")
+        logging.error("Error checking profile URL availability: %s", e)
         return False
     except Exception as e:
         db.rollback()
-        logging.error(f"Exception: Error checking profile URL availability: {e}")
+        logging.error("Exception: Error checking profile URL availability: %s", e)
         return False
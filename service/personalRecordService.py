@@ -0,0 +1,181 @@
+import logging
+from typing import List, Iterable, Dict, Set
+
+from sqlalchemy import select, func, delete
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, contains_eager
+
+from model.Exercise import Exercise
+from model.ExerciseCatalog import ExerciseCatalog
+from model.Gyma import Gyma
+from model.PersonalRecord import PersonalRecord
+
+# Record column and the exercise attribute it is the maximum of
+RECORD_FIELDS = {"max_weight": "weight", "max_count": "count", "max_km": "km"}
+
+
+def get_best_values_by_catalog_id(db: Session, user_id: int, catalog_ids: Iterable[int]) -> Dict[int, dict]:
+    """ Record values of a user for the given catalog ids, as plain values: the records are raised with an
+    upsert, loaded PersonalRecord objects would not see it. """
+    catalog_ids = set(catalog_ids)
+    if not catalog_ids:
+        return {}
+
+    result = db.execute(
+        select(PersonalRecord.catalog_id, *(getattr(PersonalRecord, field) for field in RECORD_FIELDS))
+        .where(PersonalRecord.user_id == user_id, PersonalRecord.catalog_id.in_(catalog_ids))
+    )
+    return {row.catalog_id: {field: getattr(row, field) for field in RECORD_FIELDS} for row in result.all()}
+
+
+def greatest(dialect_name: str, column, new_value):
+    """ The larger of two values where a NULL counts as no value. GREATEST of MySQL and max() of SQLite are
+    NULL when one argument is, PostgreSQL skips NULLs. """
+    larger = func.max(column, new_value) if dialect_name == "sqlite" else func.greatest(column, new_value)
+    return func.coalesce(larger, column, new_value)
+
+
+def raise_records(db: Session, user_id: int, best_values: Dict[int, dict]):
+    """ Raise the records of a user to the given values per catalog id with one upsert, without committing.
+    The maximum is taken in the database, so concurrent requests for the same record neither lose the larger
+    value nor collide on the first insert of a record. """
+    rows = [{"user_id": user_id, "catalog_id": catalog_id, **values} for catalog_id, values in best_values.items()]
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("mysql", "mariadb"):
+        statement = mysql.insert(PersonalRecord).values(rows)
+        statement = statement.on_duplicate_key_update(**{
+            field: greatest(dialect_name, getattr(PersonalRecord, field), getattr(statement.inserted, field))
+            for field in RECORD_FIELDS
+        })
+    else:
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        statement = dialect_insert(PersonalRecord).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[PersonalRecord.user_id, PersonalRecord.catalog_id],
+            set_={field: greatest(dialect_name, getattr(PersonalRecord, field), getattr(statement.excluded, field))
+                  for field in RECORD_FIELDS}
+        )
+    db.execute(statement)
+
+
+def add_exercises_to_records(db: Session, user_id: int, exercises: List, catalog_ids: List[int]) -> List[List[str]]:
+    """ Raise the records of a user with new exercises (Exercise or ExerciseDTO) and their catalog ids, without
+    committing. Returns per exercise the attributes ('weight', 'count', 'km') that beat an earlier record,
+    the first value logged for a catalog exercise sets the record but is not reported as a new one.
+    The report compares with the records read before the upsert, a concurrent request can report the same
+    record; the stored records are always the maximum. """
+    records = get_best_values_by_catalog_id(db, user_id, catalog_ids)
+
+    new_records = []
+    best_values = {}
+    for exercise, catalog_id in zip(exercises, catalog_ids):
+        if catalog_id not in records:
+            # A first exercise has a record even without values, like a recomputed one
+            records[catalog_id] = dict.fromkeys(RECORD_FIELDS)
+            best_values[catalog_id] = dict.fromkeys(RECORD_FIELDS)
+        record = records[catalog_id]
+        beaten = []
+        for record_field, exercise_field in RECORD_FIELDS.items():
+            value = getattr(exercise, exercise_field)
+            best = record[record_field]
+            if value is None or (best is not None and value <= best):
+                continue
+            if best is not None:
+                beaten.append(exercise_field)
+            record[record_field] = value
+            best_values.setdefault(catalog_id, dict.fromkeys(RECORD_FIELDS))[record_field] = value
+        new_records.append(beaten)
+
+    # One row per catalog id, PostgreSQL does not update a row twice in one upsert
+    if best_values:
+        raise_records(db, user_id, best_values)
+    return new_records
+
+
+def get_record_catalog_ids_of_gymas(db: Session, gyma_ids: List[int]) -> Dict[int, Set[int]]:
+    """ Catalog ids of the exercises per user in the given gymas, to recompute after the gymas are deleted. """
+    result = db.execute(
+        select(Gyma.user_id, Exercise.catalog_id)
+        .join(Exercise, Exercise.gyma_id == Gyma.gyma_id)
+        .where(Gyma.gyma_id.in_(gyma_ids), Exercise.catalog_id.isnot(None))
+        .distinct()
+    )
+
+    catalog_ids_by_user_id = {}
+    for user_id, catalog_id in result.all():
+        catalog_ids_by_user_id.setdefault(user_id, set()).add(catalog_id)
+    return catalog_ids_by_user_id
+
+
+def recompute_records(db: Session, user_id: int, catalog_ids: Iterable[int] = None):
+    """ Recompute records of a user from the exercise table after exercises were removed, without committing.
+    Recomputes all records of the user when catalog_ids is None. Pending deletes must be flushed first.
+    Exercises without a catalog_id (before backfill-catalog ran) have no record. """
+    query = (
+        select(
+            Exercise.catalog_id,
+            func.max(Exercise.weight).label("max_weight"),
+            func.max(Exercise.count).label("max_count"),
+            func.max(Exercise.km).label("max_km"),
+        )
+        .join(Gyma, Gyma.gyma_id == Exercise.gyma_id)
+        .where(Gyma.user_id == user_id, Exercise.catalog_id.isnot(None))
+        .group_by(Exercise.catalog_id)
+    )
+    record_query = select(PersonalRecord).where(PersonalRecord.user_id == user_id)
+
+    if catalog_ids is not None:
+        catalog_ids = set(catalog_ids)
+        if not catalog_ids:
+            return
+        query = query.where(Exercise.catalog_id.in_(catalog_ids))
+        record_query = record_query.where(PersonalRecord.catalog_id.in_(catalog_ids))
+
+    records = {record.catalog_id: record for record in db.execute(record_query).scalars().all()}
+    for row in db.execute(query).all():
+        record = records.pop(row.catalog_id, None)
+        if record is None:
+            record = PersonalRecord(user_id=user_id, catalog_id=row.catalog_id)
+            db.add(record)
+        record.max_weight = row.max_weight
+        record.max_count = row.max_count
+        record.max_km = row.max_km
+
+    # Catalog exercises that are no longer logged at all
+    for record in records.values():
+        db.delete(record)
+
+
+def rebuild_records_of_user(db: Session, user_id: int) -> bool:
+    """ Recompute all personal records of a user from the gymas and exercises. """
+    try:
+        db.execute(delete(PersonalRecord).where(PersonalRecord.user_id == user_id))
+        recompute_records(db, user_id)
+        db.commit()
+        return True
+    except SQLAlchemyError as e:
+        logging.error("Error rebuilding personal records of user %s: %s", user_id, e)
+        db.rollback()
+        return False
+
+
+def get_records_of_user(db: Session, user_id: int) -> List[PersonalRecord]:
+    """ Get all personal records of a user with their catalog exercise, sorted by exercise name. """
+    result = db.execute(
+        select(PersonalRecord)
+        .join(PersonalRecord.catalog)
+        .options(contains_eager(PersonalRecord.catalog))
+        .where(PersonalRecord.user_id == user_id)
+        .order_by(ExerciseCatalog.normalized_name)
+    )
+    return list(result.scalars().all())
+
+
+def personal_record_to_dict(record: PersonalRecord) -> dict:
+    return {
+        "exercise_name": record.catalog.display_name,
+        "max_weight": record.max_weight,
+        "max_count": record.max_count,
+        "max_km": record.max_km,
+    }
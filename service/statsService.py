@@ -0,0 +1,209 @@
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Iterable
+
+from sqlalchemy import select, func, case, delete, desc
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from model.Exercise import Exercise
+from model.Gyma import Gyma
+from model.WeeklyStats import WeeklyStats
+
+# Volume of an exercise is sets x count x weight, a missing sets counts as one set
+EXERCISE_VOLUME = func.coalesce(Exercise.sets, 1) * func.coalesce(Exercise.count, 0) * func.coalesce(Exercise.weight, 0)
+IS_CARDIO = Exercise.exercise_type == "cardio"
+
+
+def week_start_of(moment: datetime) -> date:
+    """ Monday of the week the moment is in. """
+    return moment.date() - timedelta(days=moment.weekday())
+
+
+def exercise_volume(exercise) -> float:
+    """ Volume of an Exercise or ExerciseDTO, same definition as EXERCISE_VOLUME. """
+    return (exercise.sets if exercise.sets is not None else 1) * (exercise.count or 0) * (exercise.weight or 0)
+
+
+def add_to_week(db: Session, user_id: int, week_start: date, sessions: int = 0, duration_seconds: int = 0,
+                volume: float = 0.0, cardio_km: float = 0.0, cardio_minutes: int = 0):
+    """ Add the values to the WeeklyStats row of a user and week, without committing. One upsert that increments
+    the columns in the database, so concurrent requests for the same week neither lose updates nor collide on
+    the first insert of the week. """
+    increments = {"sessions": sessions, "duration_seconds": duration_seconds, "volume": volume,
+                  "cardio_km": cardio_km, "cardio_minutes": cardio_minutes}
+    incremented_columns = {name: getattr(WeeklyStats, name) + value for name, value in increments.items()}
+
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("mysql", "mariadb"):
+        statement = (
+            mysql.insert(WeeklyStats)
+            .values(user_id=user_id, week_start=week_start, **increments)
+            .on_duplicate_key_update(**incremented_columns)
+        )
+    else:
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        statement = (
+            dialect_insert(WeeklyStats)
+            .values(user_id=user_id, week_start=week_start, **increments)
+            .on_conflict_do_update(index_elements=[WeeklyStats.user_id, WeeklyStats.week_start],
+                                   set_=incremented_columns)
+        )
+    db.execute(statement)
+
+
+def add_exercises_to_stats(db: Session, gyma: Gyma, exercises: Iterable, sign: int = 1):
+    """ Add (sign 1) or subtract (sign -1) exercises of a gyma to the week of the gyma, without committing. """
+    exercises = list(exercises)
+    if not exercises:
+        return
+
+    cardio_exercises = [exercise for exercise in exercises if exercise.exercise_type == "cardio"]
+    add_to_week(
+        db, gyma.user_id, week_start_of(gyma.time_of_arrival),
+        volume=sign * sum(exercise_volume(exercise) for exercise in exercises),
+        cardio_km=sign * sum(exercise.km or 0 for exercise in cardio_exercises),
+        cardio_minutes=sign * sum(exercise.minutes or 0 for exercise in cardio_exercises),
+    )
+
+
+def add_session_to_stats(db: Session, gyma: Gyma, sign: int = 1):
+    """ Add (sign 1) or subtract (sign -1) a finished gyma session to its week, without committing. """
+    if gyma.time_of_leaving is None:
+        return
+
+    add_to_week(db, gyma.user_id, week_start_of(gyma.time_of_arrival), sessions=sign,
+                duration_seconds=sign * int((gyma.time_of_leaving - gyma.time_of_arrival).total_seconds()))
+
+
+def get_gyma_totals(db: Session, where_clause) -> list:
+    """ Per gyma: user, arrival, leaving and the summed exercise values, for the gymas matching where_clause. """
+    return db.execute(
+        select(
+            Gyma.gyma_id,
+            Gyma.user_id,
+            Gyma.time_of_arrival,
+            Gyma.time_of_leaving,
+            func.coalesce(func.sum(EXERCISE_VOLUME), 0).label("volume"),
+            func.coalesce(func.sum(case((IS_CARDIO, func.coalesce(Exercise.km, 0)), else_=0)), 0).label("cardio_km"),
+            func.coalesce(func.sum(case((IS_CARDIO, func.coalesce(Exercise.minutes, 0)), else_=0)), 0)
+            .label("cardio_minutes"),
+        )
+        .outerjoin(Exercise, Exercise.gyma_id == Gyma.gyma_id)
+        .where(where_clause)
+        .group_by(Gyma.gyma_id, Gyma.user_id, Gyma.time_of_arrival, Gyma.time_of_leaving)
+    ).all()
+
+
+def apply_gyma_totals(db: Session, gyma_totals: list, sign: int = 1):
+    """ Add or subtract rows of get_gyma_totals to the weekly stats, without committing.
+    The rows are summed per user and week first, one upsert per week. """
+    week_totals = defaultdict(Counter)
+    for row in gyma_totals:
+        totals = week_totals[row.user_id, week_start_of(row.time_of_arrival)]
+        totals["volume"] += sign * float(row.volume)
+        totals["cardio_km"] += sign * float(row.cardio_km)
+        totals["cardio_minutes"] += sign * int(row.cardio_minutes)
+        if row.time_of_leaving is not None:
+            totals["sessions"] += sign
+            totals["duration_seconds"] += sign * int((row.time_of_leaving - row.time_of_arrival).total_seconds())
+
+    for (user_id, week_start), totals in week_totals.items():
+        add_to_week(db, user_id, week_start, **totals)
+
+
+def remove_gymas_from_stats(db: Session, gyma_ids: List[int]):
+    """ Subtract gymas that are about to be deleted from the weekly stats, without committing. """
+    if gyma_ids:
+        apply_gyma_totals(db, get_gyma_totals(db, Gyma.gyma_id.in_(gyma_ids)), sign=-1)
+
+
+def rebuild_stats_of_user(db: Session, user_id: int) -> bool:
+    """ Recompute all weekly stats of a user from the gymas and exercises. """
+    try:
+        db.execute(delete(WeeklyStats).where(WeeklyStats.user_id == user_id))
+        db.flush()
+        apply_gyma_totals(db, get_gyma_totals(db, Gyma.user_id == user_id))
+        db.commit()
+        return True
+    except SQLAlchemyError as e:
+        logging.error("Error rebuilding stats of user %s: %s", user_id, e)
+        db.rollback()
+        return False
+
+
+def get_stats_of_user(db: Session, user_id: int, weeks: int) -> dict:
+    """ Weekly stats of the last weeks, all time totals and the weekly streaks of a user. """
+    first_week = week_start_of(datetime.now()) - timedelta(weeks=weeks - 1)
+    recent_weeks = db.execute(
+        select(WeeklyStats)
+        .where(WeeklyStats.user_id == user_id, WeeklyStats.week_start >= first_week)
+        .order_by(desc(WeeklyStats.week_start))
+    ).scalars().all()
+
+    totals = db.execute(
+        select(
+            func.coalesce(func.sum(WeeklyStats.sessions), 0).label("sessions"),
+            func.coalesce(func.sum(WeeklyStats.duration_seconds), 0).label("duration_seconds"),
+            func.coalesce(func.sum(WeeklyStats.volume), 0).label("volume"),
+            func.coalesce(func.sum(WeeklyStats.cardio_km), 0).label("cardio_km"),
+            func.coalesce(func.sum(WeeklyStats.cardio_minutes), 0).label("cardio_minutes"),
+        ).where(WeeklyStats.user_id == user_id)
+    ).one()
+
+    active_weeks = db.execute(
+        select(WeeklyStats.week_start)
+        .where(WeeklyStats.user_id == user_id, WeeklyStats.sessions > 0)
+        .order_by(desc(WeeklyStats.week_start))
+    ).scalars().all()
+    current_streak, longest_streak = get_week_streaks(list(active_weeks))
+
+    return {
+        "weeks": [weekly_stats_to_dict(weekly_stats) for weekly_stats in recent_weeks],
+        "totals": {
+            "sessions": int(totals.sessions),
+            "duration_minutes": int(totals.duration_seconds) // 60,
+            "volume": round(float(totals.volume), 2),
+            "cardio_km": round(float(totals.cardio_km), 2),
+            "cardio_minutes": int(totals.cardio_minutes),
+        },
+        "current_streak_weeks": current_streak,
+        "longest_streak_weeks": longest_streak,
+    }
+
+
+def get_week_streaks(active_weeks: List[date]) -> tuple[int, int]:
+    """ Current and longest run of consecutive weeks with a session, active_weeks is sorted newest first.
+    The current streak is still running when the last session was this week or last week. """
+    if not active_weeks:
+        return 0, 0
+
+    longest_streak = streak = 1
+    for newer_week, older_week in zip(active_weeks, active_weeks[1:]):
+        streak = streak + 1 if newer_week - older_week == timedelta(weeks=1) else 1
+        longest_streak = max(longest_streak, streak)
+
+    current_streak = 0
+    expected_week = week_start_of(datetime.now())
+    if active_weeks[0] != expected_week:
+        expected_week -= timedelta(weeks=1)
+    for week in active_weeks:
+        if week != expected_week:
+            break
+        current_streak += 1
+        expected_week -= timedelta(weeks=1)
+
+    return current_streak, longest_streak
+
+
+def weekly_stats_to_dict(weekly_stats: WeeklyStats) -> dict:
+    return {
+        "week_start": weekly_stats.week_start,
+        "sessions": weekly_stats.sessions,
+        "duration_minutes": weekly_stats.duration_seconds // 60,
+        "volume": round(weekly_stats.volume, 2),
+        "cardio_km": round(weekly_stats.cardio_km, 2),
+        "cardio_minutes": weekly_stats.cardio_minutes,
+    }
@@ -22,11 +22,11 @@ def add_user(db: Session, email: str, password: str) -> User | None:
         return new_user
 
     except SQLAlchemyError as e:
-        logging.error(f"Error adding user: {e}")
+        logging.error("Error adding user: %s", e)
         db.rollback()
         return None
     except Exception as e:
-        logging.error(f"Exception: Error adding user: {e}")
+        logging.error("Exception: Error adding user: %s", e)
         db.rollback()
         return None
 
@@ -38,13 +38,13 @@ def get_user_by_user_id(db: Session, user_id: int) -> User | None:
         user = result.scalar_one_or_none()
         return user
     except NoResultFound:
-        logging.error(f"No user found with user_id: {user_id}")
+        logging.error("No user found with user_id: %s", user_id)
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching user by ID: {e}")
+        logging.error("Error fetching user by ID: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error fetching user by ID: {e}")
+        logging.error("Exception: Error fetching user by ID: %s", e)
         return None
 
 
@@ -57,10 +57,10 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     except NoResultFound:
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching user by email: {e}")
+        logging.error("Error fetching user by email: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error fetching user by email: {e}")
+        logging.error("Exception: Error fetching user by email: %s", e)
         return None
 
 
@@ -71,10 +71,10 @@ def email_available(db: Session, email: str) -> bool:
         user_exists = result.scalar_one_or_none()
         return user_exists is None
     except SQLAlchemyError as e:
-        logging.error(f"Error checking email availability: {e}")
+        logging.error("Error checking email availability: %s", e)
         return False
     except Exception as e:
-        logging.error(f"Exception: Error checking email availability: {e}")
+        logging.error("Exception: Error checking email availability: %s", e)
         return False
 
 
@@ -92,10 +92,10 @@ def set_email_verification(db: Session, user: User, verified: bool = True) -> bo
         db.commit()
         return True
     except SQLAlchemyError as e:
-        logging.error(f"Error setting email verification: {e}")
+        logging.error("Error setting email verification: %s", e)
         db.rollback()
         return False
     except Exception as e:
-        logging.error(f"Exception: Error setting email verification: {e}")
+        logging.error("Exception: Error setting email verification: %s", e)
         db.rollback()
         return False
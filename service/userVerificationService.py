@@ -18,10 +18,10 @@ def get_user_id_by_verification_code(db: Session, verification_code: str) -> int
             return user_verification.user_id
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching user by verification code: {e}")
+        logging.error("Error fetching user by verification code: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error fetching user by verification code: {e}")
+        logging.error("Exception: Error fetching user by verification code: %s", e)
         return None
 
 
@@ -34,10 +34,10 @@ def get_verification_code_by_user_id(db: Session, user_id: int) -> str | None:
             return user_verification.verification_code
         return None
     except SQLAlchemyError as e:
-        logging.error(f"Error fetching verification code by user ID: {e}")
+        logging.error("Error fetching verification code by user ID: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Exception: Error fetching verification code by user ID: {e}")
+        logging.error("Exception: Error fetching verification code by user ID: %s", e)
         return None
 
 
@@ -49,11 +49,11 @@ def add_user_verification(db: Session, user_id: int, verification_code: str) ->
         db.commit()
         return True
     except SQLAlchemyError as e:
-        logging.error(f"Error adding user verification: {e}")
+        logging.error("Error adding user verification: %s", e)
         db.rollback()
         return False
     except Exception as e:
-        logging.error(f"Exception: Error adding user verification: {e}")
+        logging.error("Exception: Error adding user verification: %s", e)
         db.rollback()
         return False
 
@@ -69,14 +69,14 @@ def remove_user_verification(db: Session, user_id: int) -> bool:
             db.commit()
             return True
         else:
-            logging.error(f"No user verification found for user_id: {user_id}")
+            logging.error("No user verification found for user_id: %s", user_id)
             return False
     except SQLAlchemyError as e:
-        logging.error(f"Error removing user verification: {e}")
+        logging.error("Error removing user verification: %s", e)
         db.rollback()
         return False
     except Exception as e:
-        logging.error(f"Exception: Error removing user verification: {e}")
+        logging.error("Exception: Error removing user verification: %s", e)
         db.rollback()
         return False
 
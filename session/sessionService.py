@@ -6,51 +6,74 @@ import pydantic
 import os
 
 from redis import RedisError
-from dotenv import load_dotenv
 from session.sessionDataObject import SessionDataObject
 
-load_dotenv()
-
-expire_time_default = int(os.getenv("SESSION_EXPIRE_TIME_SECONDS"))
-expire_time_trust_device = int(os.getenv("SESSION_EXPIRE_TIME_SECONDS_TRUST_DEVICE"))
 _redis_connection = None  # Cached Redis connection object
+_redis_binary_connection = None  # Cached Redis connection object without response decoding
+
+
+def create_redis_client(decode_responses: bool) -> redis.Redis:
+    """ Redis client from the environment. With REDIS_MAX_CONNECTIONS set, the client waits up to
+    REDIS_POOL_TIMEOUT_SECONDS for a free connection instead of opening more. REDIS_MAX_CONNECTIONS is the
+    budget of the process, the decoding and the binary client each have a pool of half of it. """
+    connection_options = {
+        "host": os.getenv("REDIS_HOST"),
+        "port": os.getenv("REDIS_PORT"),
+        "db": os.getenv("REDIS_DB", "0"),
+        "password": os.getenv("REDIS_PASSWORD") or None,
+        "decode_responses": decode_responses,
+    }
+    max_connections = os.getenv("REDIS_MAX_CONNECTIONS")
+    if max_connections:
+        binary_max_connections = max(1, int(max_connections) // 2)
+        return redis.Redis(connection_pool=redis.BlockingConnectionPool(
+            max_connections=max(1, int(max_connections) - binary_max_connections) if decode_responses
+            else binary_max_connections,
+            timeout=float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", "5")),
+            **connection_options
+        ))
+    return redis.Redis(**connection_options)
 
 
 def create_redis_connection():
     """ Create and return a synchronous Redis connection object. """
     global _redis_connection
     if _redis_connection is None:
-        redis_host = os.getenv("REDIS_HOST")
-        redis_port = os.getenv("REDIS_PORT")
-        redis_db = os.getenv("REDIS_DB", "0")
-        redis_password = os.getenv("REDIS_PASSWORD")
-
         try:
-            if redis_password:
-                _redis_connection = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    db=redis_db,
-                    password=redis_password,
-                    decode_responses=True
-                )
-            else:
-                _redis_connection = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    db=redis_db,
-                    decode_responses=True
-                )
+            _redis_connection = create_redis_client(decode_responses=True)
         except RedisError as e:
-            logging.error(f"Error connecting to Redis: {e}")
+            logging.error("Error connecting to Redis: %s", e)
             return None
         except Exception as e:
-            logging.error(f"Other Exception while creating Redis connection: {e}")
+            logging.error("Other Exception while creating Redis connection: %s", e)
             return None
 
     return _redis_connection
 
 
+def create_binary_redis_connection():
+    """ Create and return a synchronous Redis connection object that returns bytes, for binary values like bitmaps. """
+    global _redis_binary_connection
+    if _redis_binary_connection is None:
+        try:
+            _redis_binary_connection = create_redis_client(decode_responses=False)
+        except RedisError as e:
+            logging.error("Error connecting to Redis: %s", e)
+            return None
+        except Exception as e:
+            logging.error("Other Exception while creating Redis connection: %s", e)
+            return None
+
+    return _redis_binary_connection
+
+
+def session_expire_time(trust_device: bool) -> int:
+    """ Session lifetime in seconds from the environment, longer on a trusted device. """
+    if trust_device:
+        return int(os.getenv("SESSION_EXPIRE_TIME_SECONDS_TRUST_DEVICE"))
+    return int(os.getenv("SESSION_EXPIRE_TIME_SECONDS"))
+
+
 def get_session_data(key: str) -> SessionDataObject | None:
     """ Retrieve the session data as a SessionDataObject from Redis. """
     try:
@@ -63,23 +86,23 @@ def get_session_data(key: str) -> SessionDataObject | None:
             try:
                 session_data['trustDevice'] = session_data.get('trustDevice') == '1'
                 session_data_object = SessionDataObject(**session_data)
-                expire_time = expire_time_trust_device if session_data_object.trustDevice else expire_time_default
+                expire_time = session_expire_time(session_data_object.trustDevice)
 
                 redis_connection.expire(key, expire_time)
                 return session_data_object
             except pydantic.ValidationError as e:
-                logging.error(f"Invalid session data format: {e}")
+                logging.error("Invalid session data format: %s", e)
                 return None
             except Exception as e:
-                logging.error(f"Other Exception while getting session data: {e}")
+                logging.error("Other Exception while getting session data: %s", e)
                 return None
         else:
             return None
     except RedisError as e:
-        logging.error(f"RedisError while getting session data: {e}")
+        logging.error("RedisError while getting session data: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Other Exception while getting session data: {e}")
+        logging.error("Other Exception while getting session data: %s", e)
         return None
 
 
@@ -91,13 +114,13 @@ def get_user_id_from_session_data(key: str) -> int | None:
             return session_data_object.user_id
         return None
     except pydantic.ValidationError as e:
-        logging.error(f"Invalid session data format: {e}")
+        logging.error("Invalid session data format: %s", e)
         return None
     except RedisError as e:
-        logging.error(f"RedisError while getting user ID from session data: {e}")
+        logging.error("RedisError while getting user ID from session data: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Other Exception while getting user ID from session data: {e}")
+        logging.error("Other Exception while getting user ID from session data: %s", e)
         return None
 
 
@@ -109,10 +132,10 @@ def get_gyma_id_from_session_data(key: str) -> int | None:
             return session_data_object.gyma_id
         return None
     except pydantic.ValidationError as e:
-        logging.error(f"Invalid session data format: {e}")
+        logging.error("Invalid session data format: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Other Exception while getting gyma ID from session data: {e}")
+        logging.error("Other Exception while getting gyma ID from session data: %s", e)
         return False
 
 
@@ -121,24 +144,24 @@ def set_session(session_data: SessionDataObject, key: str | None = None) -> str
     try:
         redis_connection = create_redis_connection()
         if redis_connection is None:
-            logging.error(f"Redis connection failed")
+            logging.error("Redis connection failed")
             return None
 
         if key is None:
             key = generate_random_key()
 
         data_dict = {k: (int(v) if isinstance(v, bool) else v) for k, v in session_data.dict().items() if v is not None}
-        expire_time = expire_time_trust_device if session_data.trustDevice else expire_time_default
+        expire_time = session_expire_time(session_data.trustDevice)
 
         redis_connection.hmset(key, data_dict)
         redis_connection.expire(key, expire_time)
 
         return key
     except RedisError as e:
-        logging.error(f"Error setting session data in Redis: {e}")
+        logging.error("Error setting session data in Redis: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Other Exception while setting session data: {e}")
+        logging.error("Other Exception while setting session data: %s", e)
         return None
 
 
@@ -168,14 +191,14 @@ def delete_gyma_id_from_session(key: str) -> bool:
             return False
 
         redis_connection.hdel(key, "gyma_id")
-        expire_time = expire_time_trust_device if session_data.trustDevice else expire_time_default
+        expire_time = session_expire_time(session_data.trustDevice)
         redis_connection.expire(key, expire_time)
         return True
     except RedisError as e:
-        logging.error(f"Error deleting gyma_id from session data: {e}")
+        logging.error("Error deleting gyma_id from session data: %s", e)
         return False
     except Exception as e:
-        logging.error(f"Other Exception while deleting gyma_id from session: {e}")
+        logging.error("Other Exception while deleting gyma_id from session: %s", e)
         return False
 
 
@@ -184,19 +207,19 @@ def delete_session(key: str) -> bool:
     try:
         redis_connection = create_redis_connection()
         if redis_connection is None:
-            logging.error(f"Redis connection failed")
+            logging.error("Redis connection failed")
             return False
 
         if key and get_session_data(key):
             redis_connection.delete(key)
-            logging.info(f"Deleted session data from Redis: {key}")
+            logging.info("Deleted session data from Redis")
             return True
 
     except RedisError as e:
-        logging.error(f"Error deleting session data in Redis (key: {key}): {e}")
+        logging.error("Error deleting session data in Redis: %s", e)
         return False
     except Exception as e:
-        logging.error(f"Other Exception while deleting session: {e}")
+        logging.error("Other Exception while deleting session: %s", e)
         return False
 
 
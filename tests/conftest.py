@@ -0,0 +1,116 @@
+""" Fixtures for the tests: the app on a SQLite database in a temporary directory and an in-memory Redis
+(fakeredis), so the tests need neither MySQL nor a Redis server.
+
+Run from the repository root, with the packages of requirements-dev.txt installed: python -m pytest
+The environment is set before the app is imported, its modules read their settings at import. """
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='gyma-tests-'), 'test.db')}"
+os.environ.setdefault("SESSION_EXPIRE_TIME_SECONDS", "3600")
+os.environ.setdefault("SESSION_EXPIRE_TIME_SECONDS_TRUST_DEVICE", "86400")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+
+import database  # noqa: E402
+import session.sessionService as sessionService  # noqa: E402
+from cache.fragmentCache import _gyma_fragment_cache  # noqa: E402
+from cache.pubFeedCache import invalidate_pub_feed  # noqa: E402
+from service.catalogService import _catalog_id_cache  # noqa: E402
+from main import create_app  # noqa: E402
+from model.Person import Person  # noqa: E402
+from model.User import User  # noqa: E402
+from service.userService import password_hasher  # noqa: E402
+
+PASSWORD = "Passw0rd!test"
+
+
+@pytest.fixture(scope="session")
+def app():
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def password_hash() -> tuple[bytes, bytes]:
+    """ bcrypt is slow on purpose, all test users share one hash. """
+    return password_hasher(PASSWORD)
+
+
+@pytest.fixture(scope="session")
+def redis_server() -> fakeredis.FakeServer:
+    redis_server = fakeredis.FakeServer()
+    sessionService._redis_connection = fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+    sessionService._redis_binary_connection = fakeredis.FakeRedis(server=redis_server)
+    return redis_server
+
+
+@pytest.fixture
+def client(app, redis_server):
+    """ Test client on empty tables, an empty Redis and empty in-process caches, the ids start at 1 again. """
+    database.Base.metadata.create_all(bind=database.engine)
+    sessionService._redis_connection.flushall()
+    _gyma_fragment_cache.clear()
+    _catalog_id_cache.clear()
+    invalidate_pub_feed()
+    yield app.test_client()
+    database.Base.metadata.drop_all(bind=database.engine)
+
+
+@pytest.fixture
+def db(client):
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_user(db, password_hash):
+    """ Insert a verified user with a person, returns the user id. It logs in as <profile_url>@example.com. """
+
+    def make(profile_url: str, gyma_share: str = "pub", first_name: str = "Test") -> int:
+        salt, hashed_password = password_hash
+        user = User(email=f"{profile_url}@example.com", password_hash=hashed_password, salt=salt,
+                    email_verified=True)
+        db.add(user)
+        db.flush()
+        db.add(Person(person_id=user.user_id, profile_url=profile_url, first_name=first_name,
+                      last_name=profile_url.capitalize(), date_of_birth=date(1990, 1, 1), sex="o",
+                      gyma_share=gyma_share))
+        db.commit()
+        return user.user_id
+
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """ Log in as a user made by make_user, returns the request headers with the session token. """
+
+    def log_in(profile_url: str) -> dict:
+        response = client.post("/api/v1/auth/login", json={"email": f"{profile_url}@example.com",
+                                                           "password": PASSWORD})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return {"Authorization": response.json["session_token"]}
+
+    return log_in
+
+
+@pytest.fixture
+def sync_gyma(client):
+    """ Sync a finished gyma of the logged in user, days_ago days before now. """
+
+    def sync(headers: dict, days_ago: int, exercises: list[dict] | None = None) -> dict:
+        time_of_arrival = datetime.now().replace(microsecond=0) - timedelta(days=days_ago, hours=2)
+        response = client.post("/api/v1/gyma/sync", headers=headers, json={
+            "idempotency_key": f"gyma-{days_ago:04d}",
+            "time_of_arrival": time_of_arrival.isoformat(),
+            "time_of_leaving": (time_of_arrival + timedelta(hours=1)).isoformat(),
+            "exercises": exercises or [],
+        })
+        assert response.status_code in (200, 201), response.get_data(as_text=True)
+        return response.json
+
+    return sync
@@ -0,0 +1,68 @@
+""" The calendar bitmaps in Redis stay in step with the gymas. """
+from datetime import datetime
+
+import service.calendarService as calendarService
+import session.sessionService as sessionService
+from model.Gyma import Gyma
+from service.calendarService import (bitmap_to_dates, calendar_key, get_calendar_bitmaps, get_calendar_of_user,
+                                     invalidate_calendar, mark_gyma_day)
+
+NEW_YEAR = datetime(2026, 1, 1, 18, 0)
+SPRING = datetime(2026, 3, 1, 18, 0)
+
+
+def add_gyma(db, user_id: int, time_of_arrival: datetime):
+    db.add(Gyma(user_id=user_id, time_of_arrival=time_of_arrival))
+    db.commit()
+
+
+def test_marking_a_missing_bitmap_does_not_create_it(client, db, make_user):
+    user_id = make_user("me")
+    add_gyma(db, user_id, NEW_YEAR)
+
+    mark_gyma_day(user_id, NEW_YEAR)
+
+    assert not sessionService._redis_binary_connection.exists(calendar_key(user_id, 2026))
+    assert get_calendar_of_user(db, user_id, 2026)["days"] == [NEW_YEAR.date()]
+
+
+def test_marking_updates_a_cached_bitmap(client, db, make_user):
+    user_id = make_user("me")
+    add_gyma(db, user_id, NEW_YEAR)
+    get_calendar_bitmaps(db, [user_id], 2026)
+
+    add_gyma(db, user_id, SPRING)
+    mark_gyma_day(user_id, SPRING)
+
+    assert get_calendar_of_user(db, user_id, 2026)["days"] == [NEW_YEAR.date(), SPRING.date()]
+    assert sessionService._redis_binary_connection.ttl(calendar_key(user_id, 2026)) > 0
+
+
+def test_a_bitmap_built_before_a_concurrent_gyma_is_not_cached(client, db, make_user, monkeypatch):
+    user_id = make_user("me")
+    add_gyma(db, user_id, NEW_YEAR)
+    get_day_offsets_from_db = calendarService.get_day_offsets_from_db
+
+    def read_then_commit_a_gyma(*args):
+        # The snapshot of this read misses the gyma that is committed and marked right after it
+        day_offsets = get_day_offsets_from_db(*args)
+        add_gyma(db, user_id, SPRING)
+        mark_gyma_day(user_id, SPRING)
+        return day_offsets
+
+    monkeypatch.setattr(calendarService, "get_day_offsets_from_db", read_then_commit_a_gyma)
+    assert bitmap_to_dates(get_calendar_bitmaps(db, [user_id], 2026)[user_id], 2026) == \
+        [NEW_YEAR.date()]
+    monkeypatch.setattr(calendarService, "get_day_offsets_from_db", get_day_offsets_from_db)
+
+    assert get_calendar_of_user(db, user_id, 2026)["days"] == [NEW_YEAR.date(), SPRING.date()]
+
+
+def test_invalidating_drops_the_bitmap(client, db, make_user):
+    user_id = make_user("me")
+    add_gyma(db, user_id, NEW_YEAR)
+    get_calendar_bitmaps(db, [user_id], 2026)
+
+    invalidate_calendar(user_id, [2026])
+
+    assert not sessionService._redis_binary_connection.exists(calendar_key(user_id, 2026))
@@ -0,0 +1,56 @@
+""" Catalog ids of exercise names, also when a concurrent request adds the same name. """
+import pytest
+
+import database
+import service.catalogService as catalogService
+from model.ExerciseCatalog import ExerciseCatalog
+from service.catalogService import CatalogNameConflictError, get_catalog_ids
+
+
+@pytest.fixture
+def name_added_concurrently(db, monkeypatch):
+    """ Another request commits 'squat' after this transaction's snapshot, plain reads do not see it. """
+    other_session = database.SessionLocal()
+    other_catalog = ExerciseCatalog(normalized_name="squat", display_name="Squat")
+    other_session.add(other_catalog)
+    other_session.commit()
+    catalog_id = other_catalog.catalog_id
+    other_session.close()
+
+    find_catalog_ids = catalogService.find_catalog_ids
+    locking_reads = []
+
+    def find_in_snapshot(session, normalized_names, locking_read=False):
+        if not locking_read:
+            return {}
+        locking_reads.append(set(normalized_names))
+        return find_catalog_ids(session, normalized_names, locking_read)
+
+    monkeypatch.setattr(catalogService, "find_catalog_ids", find_in_snapshot)
+    return catalog_id, locking_reads
+
+
+def test_spellings_share_a_catalog_id(db):
+    catalog_ids = get_catalog_ids(db, ["Bench press", "bench  press ", "Squat"])
+    assert catalog_ids["Bench press"] == catalog_ids["bench  press "] != catalog_ids["Squat"]
+
+
+def test_name_added_concurrently_is_read_with_a_locking_read(db, name_added_concurrently):
+    catalog_id, locking_reads = name_added_concurrently
+    assert get_catalog_ids(db, ["Squat", "Deadlift"])["Squat"] == catalog_id
+    assert locking_reads == [{"squat"}]
+
+
+def test_conflicting_name_that_cannot_be_read_is_a_handled_error(client, db, make_user, login, monkeypatch,
+                                                                  name_added_concurrently):
+    monkeypatch.setattr(catalogService, "find_catalog_ids", lambda *args, **kwargs: {})
+    with pytest.raises(CatalogNameConflictError):
+        get_catalog_ids(db, ["Squat"])
+    db.rollback()
+
+    make_user("me")
+    headers = login("me")
+    assert client.post("/api/v1/gyma/start", headers=headers).status_code == 201
+    response = client.post("/api/v1/gyma/exercise", headers=headers,
+                           json={"exercise_name": "Squat", "exercise_type": "gains", "count": 5, "weight": 100.0})
+    assert response.status_code == 400
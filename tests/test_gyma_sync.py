@@ -0,0 +1,57 @@
+""" Idempotent sync of a gyma recorded offline. """
+from datetime import datetime, timedelta
+
+import service.gymaService as gymaService
+
+TIME_OF_ARRIVAL = datetime.now().replace(microsecond=0) - timedelta(hours=3)
+GYMA_SYNC = {
+    "idempotency_key": "offline-0001",
+    "time_of_arrival": TIME_OF_ARRIVAL.isoformat(),
+    "time_of_leaving": (TIME_OF_ARRIVAL + timedelta(hours=1)).isoformat(),
+    "exercises": [{"exercise_name": "Squat", "exercise_type": "gains", "count": 5, "sets": 5, "weight": 100.0}],
+}
+
+
+def test_retry_returns_the_stored_gyma(client, make_user, login):
+    make_user("me")
+    headers = login("me")
+
+    created = client.post("/api/v1/gyma/sync", headers=headers, json=GYMA_SYNC)
+    retried = client.post("/api/v1/gyma/sync", headers=headers, json=GYMA_SYNC)
+
+    assert created.status_code == 201
+    assert retried.status_code == 200
+    assert retried.json["gyma_id"] == created.json["gyma_id"]
+
+
+def test_lost_race_returns_the_stored_gyma(client, make_user, login, monkeypatch):
+    make_user("me")
+    headers = login("me")
+    created = client.post("/api/v1/gyma/sync", headers=headers, json=GYMA_SYNC)
+
+    # The concurrent request checked the key before the first one committed, its insert hits the unique key
+    lookups = []
+    get_gyma_sync_by_idempotency_key = gymaService.get_gyma_sync_by_idempotency_key
+
+    def lookup_before_the_commit(*args):
+        lookups.append(args)
+        return None if len(lookups) == 1 else get_gyma_sync_by_idempotency_key(*args)
+
+    monkeypatch.setattr(gymaService, "get_gyma_sync_by_idempotency_key", lookup_before_the_commit)
+    raced = client.post("/api/v1/gyma/sync", headers=headers, json=GYMA_SYNC)
+
+    assert raced.status_code == 200
+    assert raced.json["gyma_id"] == created.json["gyma_id"]
+    assert len(lookups) == 2
+
+
+def test_retry_after_the_gyma_was_deleted_does_not_store_it_again(client, make_user, login):
+    make_user("me")
+    headers = login("me")
+    created = client.post("/api/v1/gyma/sync", headers=headers, json=GYMA_SYNC)
+    assert client.delete(f"/api/v1/gyma/delete/{created.json['gyma_id']}", headers=headers).status_code == 200
+
+    retried = client.post("/api/v1/gyma/sync", headers=headers, json=GYMA_SYNC)
+
+    assert retried.status_code == 410
+    assert client.get("/api/v1/stats/records", headers=headers).json == []
@@ -0,0 +1,46 @@
+""" Queued log handlers and the per-process slow query log files. """
+import logging
+import os
+import threading
+
+from monitoring.logConfig import PerProcessRotatingFileHandler, start_queue_listener
+
+
+class ThreadRecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.emitted = threading.Event()
+        self.thread = None
+
+    def emit(self, record: logging.LogRecord):
+        self.thread = threading.current_thread()
+        self.emitted.set()
+
+
+def test_queued_records_are_written_by_the_listener_thread():
+    handler = ThreadRecordingHandler()
+    logger = logging.getLogger("tests.queued")
+    logger.addHandler(start_queue_listener(handler))
+    logger.propagate = False
+
+    logger.warning("slow")
+
+    assert handler.emitted.wait(timeout=5)
+    assert handler.thread is not threading.current_thread()
+
+
+def test_forked_process_writes_a_file_of_its_own(tmp_path):
+    handler = PerProcessRotatingFileHandler(str(tmp_path / "slow_queries.log"), max_bytes=1024 * 1024, backup_count=1)
+    record = logging.makeLogRecord({"msg": "from pid %s", "args": (os.getpid(),)})
+    handler.emit(record)
+
+    child_pid = os.fork()
+    if child_pid == 0:
+        handler.emit(logging.makeLogRecord({"msg": "from the child"}))
+        handler.close()
+        os._exit(0)
+    os.waitpid(child_pid, 0)
+    handler.close()
+
+    assert (tmp_path / f"slow_queries.{os.getpid()}.log").read_text() == f"from pid {os.getpid()}\n"
+    assert (tmp_path / f"slow_queries.{child_pid}.log").read_text() == "from the child\n"
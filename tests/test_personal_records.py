@@ -0,0 +1,91 @@
+""" Personal records, kept per catalog exercise. """
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import select, update
+
+import database
+from model.Exercise import Exercise
+from model.Gyma import Gyma
+from model.PersonalRecord import PersonalRecord
+from service.catalogService import get_catalog_ids
+from service.personalRecordService import add_exercises_to_records
+
+
+def bench_press(exercise_name: str, weight: float) -> dict:
+    return {"exercise_name": exercise_name, "exercise_type": "gains", "count": 5, "sets": 3, "weight": weight}
+
+
+def test_spellings_of_an_exercise_share_one_record(client, make_user, login):
+    make_user("me")
+    headers = login("me")
+    assert client.post("/api/v1/gyma/start", headers=headers).status_code == 201
+
+    first = client.post("/api/v1/gyma/exercise", headers=headers, json=bench_press("Bench press", 80.0))
+    heavier = client.post("/api/v1/gyma/exercise", headers=headers, json=bench_press("bench  press", 90.0))
+    lighter = client.post("/api/v1/gyma/exercise", headers=headers, json=bench_press("BENCH PRESS", 85.0))
+
+    assert first.json["new_records"] == []
+    assert heavier.json["new_records"] == ["weight"]
+    assert lighter.json["new_records"] == []
+    records = client.get("/api/v1/stats/records", headers=headers).json
+    assert records == [{"exercise_name": "Bench press", "max_weight": 90.0, "max_count": 5, "max_km": None}]
+
+
+def test_records_are_recomputed_when_an_exercise_is_deleted(client, make_user, login, sync_gyma):
+    make_user("me")
+    headers = login("me")
+    gyma = sync_gyma(headers, 1, [bench_press("Bench press", 80.0), bench_press("bench press", 100.0)])
+
+    heaviest = next(exercise for exercise in gyma["exercises"] if exercise["weight"] == 100.0)
+    response = client.delete(f"/api/v1/gyma/delete_exercise/{gyma['gyma_id']}/{heaviest['exercise_id']}",
+                             headers=headers)
+
+    assert response.status_code == 200
+    assert client.get("/api/v1/stats/records", headers=headers).json[0]["max_weight"] == 80.0
+
+
+def test_backfill_catalog_rebuilds_the_records(app, client, db, make_user):
+    user_id = make_user("me")
+    gyma = Gyma(user_id=user_id, time_of_arrival=datetime(2026, 1, 5, 18), time_of_leaving=datetime(2026, 1, 5, 19))
+    db.add(gyma)
+    db.flush()
+    # Exercises stored before the catalog existed
+    for exercise_name, weight in (("Squat", 100.0), ("squat ", 120.0), ("Deadlift", 140.0)):
+        db.add(Exercise(gyma_id=gyma.gyma_id, exercise_name=exercise_name, exercise_type="gains", count=5,
+                        weight=weight, created_at=gyma.time_of_arrival))
+    db.commit()
+
+    result = app.test_cli_runner().invoke(args=["backfill-catalog"])
+
+    assert result.exit_code == 0, result.output
+    assert "Set the catalog id of 3 exercises" in result.output
+    assert sorted(db.scalars(select(PersonalRecord.max_weight))) == [120.0, 140.0]
+
+    db.execute(update(PersonalRecord).values(max_weight=1.0))
+    db.commit()
+    result = app.test_cli_runner().invoke(args=["rebuild-records", "--user-id", str(user_id)])
+    assert result.exit_code == 0, result.output
+    assert sorted(db.scalars(select(PersonalRecord.max_weight))) == [120.0, 140.0]
+
+
+def test_concurrent_first_records_keep_the_maximum(client, db, make_user):
+    user_id = make_user("me")
+    catalog_id = get_catalog_ids(db, ["Bench press"])["Bench press"]
+    db.commit()
+
+    def add_bench_press(weight):
+        session = database.SessionLocal()
+        try:
+            add_exercises_to_records(session, user_id, [SimpleNamespace(weight=weight, count=5, km=None)],
+                                     [catalog_id])
+            session.commit()
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add_bench_press, [float(weight) for weight in range(1, 41)]))
+
+    record = db.execute(select(PersonalRecord).where(PersonalRecord.user_id == user_id)).scalar_one()
+    assert (record.catalog_id, record.max_weight, record.max_count, record.max_km) == (catalog_id, 40.0, 5, None)
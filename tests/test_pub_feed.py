@@ -0,0 +1,33 @@
+""" The shared pub feed and its cache when the database fails. """
+from sqlalchemy.exc import OperationalError
+
+import provider.pubProvider as pubProvider
+from cache.pubFeedCache import invalidate_pub_feed
+
+
+def fail_to_query(*args):
+    raise OperationalError("SELECT", {}, Exception("MySQL server has gone away"))
+
+
+def test_a_failed_feed_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(pubProvider, "select", fail_to_query)
+    failed = client.get("/api/v1/pub")
+    monkeypatch.undo()
+
+    assert failed.status_code == 503
+    assert "public" not in failed.headers.get("Cache-Control", "")
+    assert client.get("/api/v1/pub").status_code == 200
+
+
+def test_the_last_feed_is_served_while_the_database_fails(client, make_user, login, sync_gyma, monkeypatch):
+    make_user("me")
+    sync_gyma(login("me"), 1)
+    feed = client.get("/api/v1/pub")
+    assert len(feed.json) == 1
+
+    invalidate_pub_feed()
+    monkeypatch.setattr(pubProvider, "select", fail_to_query)
+    stale = client.get("/api/v1/pub")
+
+    assert stale.status_code == 200
+    assert stale.json == feed.json
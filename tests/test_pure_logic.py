@@ -0,0 +1,71 @@
+""" Tests of the logic that needs neither the database nor Redis. """
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from monitoring.queryDetector import normalize_statement
+from service.calendarService import bitmap_to_dates, day_offset, days_to_bitmap
+from service.historyService import rolling_mean
+from service.statsService import get_week_streaks, week_start_of
+
+
+def test_rolling_mean_skips_missing_values():
+    values = np.array([1.0, np.nan, 3.0, 5.0, np.nan, np.nan, np.nan])
+    np.testing.assert_allclose(rolling_mean(values, 2), [1.0, 1.0, 3.0, 4.0, 5.0, np.nan, np.nan])
+
+
+def test_rolling_mean_window_larger_than_values():
+    np.testing.assert_allclose(rolling_mean(np.array([2.0, 4.0, 6.0]), 10), [2.0, 3.0, 4.0])
+
+
+def test_rolling_mean_without_values():
+    assert rolling_mean(np.array([]), 3).size == 0
+
+
+def weeks_before_this_week(*weeks_ago: int) -> list[date]:
+    this_week = week_start_of(datetime.now())
+    return [this_week - timedelta(weeks=weeks) for weeks in weeks_ago]
+
+
+@pytest.mark.parametrize("weeks_ago, streaks", [
+    ((), (0, 0)),
+    ((0,), (1, 1)),
+    ((1, 2, 3), (3, 3)),
+    ((0, 1, 3, 4, 5, 6), (2, 4)),
+    ((2, 3), (0, 2)),
+])
+def test_week_streaks(weeks_ago, streaks):
+    assert get_week_streaks(weeks_before_this_week(*weeks_ago)) == streaks
+
+
+def test_normalize_statement_ignores_literals_and_in_list_length():
+    assert normalize_statement("SELECT a FROM t WHERE id IN (?, ?, ?) AND x = 'o''k' AND y = 12") == \
+        normalize_statement("SELECT a FROM t WHERE id IN (?) AND x = 'z' AND y = 3")
+    assert normalize_statement("SELECT a\n  FROM t WHERE id IN (__[POSTCOMPILE_id_1])") == \
+        "SELECT a FROM t WHERE id IN (?)"
+
+
+def test_normalize_statement_keeps_the_structure():
+    assert normalize_statement("SELECT a FROM t WHERE id = ?") != normalize_statement("SELECT b FROM t WHERE id = ?")
+
+
+@pytest.mark.parametrize("day, offset", [
+    (date(2026, 1, 1), 0),
+    (date(2026, 1, 9), 8),
+    (date(2026, 12, 31), 364),
+    (date(2024, 12, 31), 365),
+])
+def test_day_offset(day, offset):
+    assert day_offset(day) == offset
+
+
+def test_bitmap_uses_the_bit_order_of_setbit():
+    bitmap = days_to_bitmap([0, 9])
+    assert bitmap[:2] == bytes([0b10000000, 0b01000000])
+    assert not any(bitmap[2:])
+
+
+def test_bitmap_round_trip():
+    days = [date(2024, 1, 1), date(2024, 2, 29), date(2024, 7, 4), date(2024, 12, 31)]
+    assert bitmap_to_dates(days_to_bitmap(day_offset(day) for day in days), 2024) == days
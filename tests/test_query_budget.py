@@ -0,0 +1,107 @@
+""" Statement budgets of the endpoints that used to run a query per row, see monitoring.pytestPlugin. """
+from datetime import date
+
+from model.Friendship import Friendship
+
+GYMBROS = 6
+EXERCISES = [
+    {"exercise_name": "Bench press", "exercise_type": "gains", "count": 5, "sets": 3, "weight": 80.0},
+    {"exercise_name": "Running", "exercise_type": "cardio", "minutes": 20, "km": 4.0},
+]
+
+
+def make_gymbros(db, make_user, login, sync_gyma, user_id: int) -> list[str]:
+    """ Accepted gymbros of a user, each with two gymas with exercises. """
+    profile_urls = [f"bro{number}" for number in range(GYMBROS)]
+    for profile_url in profile_urls:
+        friend_id = make_user(profile_url)
+        db.add(Friendship(person_id=user_id, friend_id=friend_id, status="accepted", since=date(2026, 1, 1)))
+        db.commit()
+        headers = login(profile_url)
+        for days_ago in (1, 2):
+            sync_gyma(headers, days_ago, EXERCISES)
+    return profile_urls
+
+
+def test_pub_feed(client, make_user, login, sync_gyma, query_budget):
+    for profile_url in [f"pub{number}" for number in range(GYMBROS)]:
+        make_user(profile_url)
+        sync_gyma(login(profile_url), 1, EXERCISES)
+    headers = login("pub0")
+
+    with query_budget(2):
+        response = client.get("/api/v1/pub", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json) == GYMBROS
+    assert all(len(gyma["exercises"]) == len(EXERCISES) for gyma in response.json)
+
+
+def test_gymbro_feed(client, db, make_user, login, sync_gyma, query_budget):
+    user_id = make_user("me")
+    make_gymbros(db, make_user, login, sync_gyma, user_id)
+    headers = login("me")
+
+    with query_budget(3):
+        response = client.get("/api/v1/gymbro", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json) == 10
+    assert all(gyma["person"] for gyma in response.json)
+
+
+def test_profile(client, make_user, login, sync_gyma, query_budget):
+    make_user("me")
+    make_user("lifter")
+    for days_ago in range(1, 8):
+        sync_gyma(login("lifter"), days_ago, EXERCISES)
+    headers = login("me")
+
+    with query_budget(4):
+        response = client.get("/api/v1/profile/lifter", headers=headers)
+
+    assert response.status_code == 200
+
+
+def test_more_gymas_of_profile(client, make_user, login, sync_gyma, query_budget):
+    make_user("me")
+    make_user("lifter")
+    lifter_headers = login("lifter")
+    gyma_ids = [sync_gyma(lifter_headers, days_ago, EXERCISES)["gyma_id"] for days_ago in range(1, 9)]
+    headers = login("me")
+
+    with query_budget(3):
+        response = client.post("/api/v1/profile/lifter/moregyma", headers=headers,
+                               json=",".join(str(gyma_id) for gyma_id in gyma_ids[:5]))
+
+    assert response.status_code == 200
+    assert len(response.json) == 3
+
+
+def test_person_search(client, make_user, query_budget):
+    for number in range(GYMBROS):
+        make_user(f"searched{number}", first_name="Emma")
+
+    with query_budget(2):
+        response = client.get("/api/v1/person/search/Emma Searched1")
+
+    assert response.status_code == 200
+    assert [person["profile_url"] for person in response.json] == ["searched1"]
+
+
+def test_exercise_logging(client, make_user, login, query_budget):
+    make_user("me")
+    headers = login("me")
+    assert client.post("/api/v1/gyma/start", headers=headers).status_code == 201
+
+    with query_budget(9):
+        response = client.post("/api/v1/gyma/exercise", headers=headers, json=EXERCISES[0])
+    assert response.status_code == 201
+
+    # The generated ids come back one INSERT per exercise (no executemany RETURNING in request order on SQLite
+    # and MySQL), everything else is the same for any number of exercises
+    exercises = EXERCISES * 10
+    with query_budget(len(exercises) + 9, max_repeats=len(exercises)):
+        response = client.post("/api/v1/gyma/exercises", headers=headers, json=exercises)
+    assert response.status_code == 201
+    assert len(response.json["exercise_ids"]) == len(exercises)
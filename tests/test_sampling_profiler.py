@@ -0,0 +1,75 @@
+""" The sampling profiler finds the requests in thread workers and in gevent workers. """
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+import monitoring.samplingProfiler as samplingProfiler
+from monitoring.samplingProfiler import sample_stacks
+
+GEVENT_PROFILE = textwrap.dedent("""
+    from gevent import monkey
+    monkey.patch_all()
+
+    import threading
+    import time
+
+    from greenlet import getcurrent
+
+    import monitoring.samplingProfiler as samplingProfiler
+    from monitoring.samplingProfiler import sample_stacks, collapsed_stacks
+
+
+    def wait_for_database():
+        time.sleep(0.5)
+
+
+    def handle_request():
+        samplingProfiler._request_threads[threading.get_ident()] = "/api/v1/gyma"
+        samplingProfiler._request_greenlets[threading.get_ident()] = getcurrent()
+        wait_for_database()
+
+
+    requests = [threading.Thread(target=handle_request) for _ in range(3)]
+    for request_thread in requests:
+        request_thread.start()
+    stacks, samples = sample_stacks(0.2, 0.01)
+    print(collapsed_stacks(stacks))
+""")
+
+
+def wait_for_database(started: threading.Event, done: threading.Event):
+    samplingProfiler._request_threads[threading.get_ident()] = "/api/v1/gyma"
+    started.set()
+    done.wait(timeout=5)
+
+
+def test_request_threads_are_sampled():
+    started, done = threading.Event(), threading.Event()
+    request_thread = threading.Thread(target=wait_for_database, args=(started, done))
+    request_thread.start()
+    started.wait(timeout=5)
+    try:
+        stacks, samples = sample_stacks(0.05, 0.01)
+    finally:
+        done.set()
+        request_thread.join()
+        samplingProfiler._request_threads.pop(request_thread.ident, None)
+
+    assert samples > 0
+    assert stacks
+    assert all(stack.startswith("/api/v1/gyma;") and "wait_for_database" in stack for stack in stacks)
+
+
+def test_request_greenlets_are_sampled_in_a_gevent_worker():
+    # gevent is only needed for gevent workers, it is in requirements-dev.txt but not in requirements.txt
+    pytest.importorskip("gevent")
+    # Monkey patching cannot be undone, so the gevent worker runs in a process of its own
+    completed = subprocess.run([sys.executable, "-c", GEVENT_PROFILE], capture_output=True, text=True, timeout=30)
+
+    assert completed.returncode == 0, completed.stderr
+    lines = completed.stdout.splitlines()
+    assert lines
+    assert all(line.startswith("/api/v1/gyma;") and "wait_for_database" in line for line in lines if line)
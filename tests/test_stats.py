@@ -0,0 +1,58 @@
+""" Weekly stats maintained by the gyma and exercise endpoints. """
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from sqlalchemy import select
+
+import database
+from model.WeeklyStats import WeeklyStats
+from service.statsService import add_to_week, get_stats_of_user, rebuild_stats_of_user
+
+SQUAT = {"exercise_name": "Squat", "exercise_type": "gains", "count": 5, "sets": 3, "weight": 100.0}
+RUN = {"exercise_name": "Running", "exercise_type": "cardio", "minutes": 30, "km": 6.0}
+
+
+def test_stats_follow_synced_and_deleted_gymas(client, db, make_user, login, sync_gyma):
+    user_id = make_user("me")
+    headers = login("me")
+    gyma = sync_gyma(headers, 0, [SQUAT, RUN])
+    totals = get_stats_of_user(db, user_id, 4)["totals"]
+    assert totals == {"sessions": 1, "duration_minutes": 60, "volume": 1500.0, "cardio_km": 6.0,
+                      "cardio_minutes": 30}
+
+    assert client.delete(f"/api/v1/gyma/delete/{gyma['gyma_id']}", headers=headers).status_code == 200
+    db.expire_all()
+    assert get_stats_of_user(db, user_id, 4)["totals"] == {"sessions": 0, "duration_minutes": 0, "volume": 0.0,
+                                                           "cardio_km": 0.0, "cardio_minutes": 0}
+
+
+def test_rebuild_matches_the_maintained_stats(client, db, make_user, login, sync_gyma):
+    user_id = make_user("me")
+    headers = login("me")
+    for days_ago in (0, 3, 10, 30):
+        sync_gyma(headers, days_ago, [SQUAT, RUN])
+    maintained_stats = get_stats_of_user(db, user_id, 8)
+
+    assert rebuild_stats_of_user(db, user_id)
+    assert get_stats_of_user(db, user_id, 8) == maintained_stats
+
+
+def test_concurrent_increments_of_a_new_week_are_not_lost(client, make_user):
+    user_id = make_user("me")
+    week_start = date(2026, 1, 5)
+
+    def add_one_session(_):
+        session = database.SessionLocal()
+        try:
+            add_to_week(session, user_id, week_start, sessions=1, volume=10.0)
+            session.commit()
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add_one_session, range(40)))
+
+    session = database.SessionLocal()
+    weekly_stats = session.execute(select(WeeklyStats).where(WeeklyStats.user_id == user_id)).scalar_one()
+    session.close()
+    assert (weekly_stats.week_start, weekly_stats.sessions, weekly_stats.volume) == (week_start, 40, 400.0)
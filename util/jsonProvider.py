@@ -0,0 +1,53 @@
+import dataclasses
+import decimal
+import time
+import uuid
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import JSONProvider
+
+from monitoring.instrumentation import record_serialization
+
+# Dict keys are not always strings (e.g. ids), orjson only accepts them with this option.
+# NumPy arrays are written as JSON arrays without converting them to lists first, NaN becomes null.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def orjson_default(obj: Any) -> Any:
+    """ Types orjson does not serialize natively, datetime and date are handled by orjson itself. """
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """ Serialize to JSON bytes, without the str round trip. """
+    return orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """ JSON provider for jsonify and returned dicts/lists, serializes with orjson into compact bytes.
+    Datetimes are written as ISO 8601 strings, the same as model_dump(mode='json'). """
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        started_at = time.perf_counter()
+        body = dumps_bytes(obj)
+        record_serialization(time.perf_counter() - started_at)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,85 @@
+""" Plain mapping functions from ORM rows to JSON-ready dicts, with the same keys and values as the
+model_dump(mode='json') output of the matching DTOs. The DTOs stay the source of truth for incoming data,
+these functions are used on outgoing data that is already valid because it comes from the database.
+Dates and datetimes are left as objects, the orjson provider (util.jsonProvider) writes them as ISO 8601. """
+import os
+from typing import List, Optional
+
+from model.Exercise import Exercise
+from model.Gyma import Gyma
+from model.Person import Person
+
+API_URL = os.getenv("API_BASE_URL")
+
+
+def image_url(size: str, file_name: Optional[str]) -> Optional[str]:
+    """ Public url of a stored profile picture, size is 'large' or 'medium'. """
+    return f"{API_URL}/images/{size}/{file_name}" if file_name else None
+
+
+def person_simple_to_dict(person: Person) -> dict:
+    """ Same output as PersonSimpleDTO. """
+    return {
+        "profile_url": person.profile_url,
+        "first_name": person.first_name,
+        "last_name": person.last_name,
+        "sex": person.sex,
+        "pf_path_m": image_url("medium", person.pf_path_m),
+    }
+
+
+def person_to_dict(person: Person) -> dict:
+    """ Same output as PersonDTO. """
+    return {
+        "profile_url": person.profile_url,
+        "first_name": person.first_name,
+        "last_name": person.last_name,
+        "date_of_birth": person.date_of_birth,
+        "sex": person.sex,
+        "city": person.city,
+        "profile_text": person.profile_text,
+        "pf_path_l": image_url("large", person.pf_path_l),
+        "pf_path_m": image_url("medium", person.pf_path_m),
+    }
+
+
+def exercise_to_dict(exercise: Exercise) -> dict:
+    """ Same output as ExerciseDTO. """
+    return {
+        "exercise_id": exercise.exercise_id,
+        "exercise_name": exercise.exercise_name,
+        "exercise_type": exercise.exercise_type,
+        "count": exercise.count,
+        "sets": exercise.sets,
+        "weight": exercise.weight,
+        "minutes": exercise.minutes,
+        "km": exercise.km,
+        "level": exercise.level,
+        "description": exercise.description,
+    }
+
+
+def gyma_to_fragment(gyma: Gyma, exercises: List[Exercise]) -> dict:
+    """ GymaDTO output without the person, which is the part that can be cached per gyma. """
+    return {
+        "gyma_id": gyma.gyma_id,
+        "time_of_arrival": gyma.time_of_arrival,
+        "time_of_leaving": gyma.time_of_leaving,
+        "exercises": [exercise_to_dict(exercise) for exercise in exercises],
+    }
+
+
+def gyma_from_fragment(fragment: dict, person: Optional[dict] = None) -> dict:
+    """ Same output as GymaDTO, person is an already serialized PersonSimpleDTO dict. """
+    return {
+        "gyma_id": fragment["gyma_id"],
+        "person": person,
+        "time_of_arrival": fragment["time_of_arrival"],
+        "time_of_leaving": fragment["time_of_leaving"],
+        "exercises": fragment["exercises"],
+    }
+
+
+def gyma_list_to_dicts(fragments: List[dict], person: Optional[dict] = None) -> List[dict]:
+    """ Serialize a list of gyma fragments that share the same (or no) person. """
+    return [gyma_from_fragment(fragment, person) for fragment in fragments]
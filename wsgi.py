@@ -0,0 +1,7 @@
+""" WSGI entry point for production servers, e.g. gunicorn with gunicorn.conf.py:
+
+    gunicorn wsgi:app
+"""
+from main import create_app
+
+app = create_app()